@@ -0,0 +1,37 @@
+# pylint: disable=missing-docstring, invalid-name
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+# Helpers shared by the benchmarks. Run a benchmark from the root folder with:
+# `python -m bench.<name>`
+#
+
+import os
+import sys
+import time
+
+from contextlib import contextmanager
+
+
+# The examples log a lot to stdout, this would dominate the measurements
+@contextmanager
+def silenced():
+    with open(os.devnull, 'w') as devnull:
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            yield
+        finally:
+            sys.stdout = stdout
+
+# Returns the mean time in seconds of `func(i)` over `n` calls
+def time_per_call(func, n):
+    start = time.perf_counter()
+    for i in range(0, n):
+        func(i)
+    return (time.perf_counter() - start) / n
+
+def report(name, *columns):
+    print('{:<28}'.format(name) + ''.join('{:>16}'.format(col) for col in columns))
+
+def usec(seconds):
+    return '{:.2f} us'.format(seconds * 1e6)
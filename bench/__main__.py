@@ -0,0 +1,12 @@
+# pylint: disable=missing-docstring
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+# Run the step rate benchmark with: `python -m bench`
+#
+
+import sys
+
+from bench.suite import main
+
+sys.exit(main())
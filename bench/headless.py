@@ -0,0 +1,55 @@
+# pylint: disable=missing-docstring, invalid-name
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+# Time per call of `execute_action` for `Sea`, `Grid` and `Park` with and
+# without the `quiet` option. Run with: `python -m bench.headless [calls]`
+#
+
+import sys
+
+from animatai.agents import Agent, Direction
+from gzutils.gzutils import DotDict
+
+import blind_dog
+import grid
+import random_mom_and_calf_config
+from sea import Sea
+
+from bench import report, silenced, time_per_call, usec
+
+
+def sea_step(quiet):
+    env = Sea({**random_mom_and_calf_config.OPTIONS, 'wss': None, 'quiet': quiet})
+    agent = Agent(None, 'mom')
+    env.add_thing(agent, random_mom_and_calf_config.mom_start_pos)
+    return lambda time: env.execute_action(agent, 'forward', time)
+
+def grid_step(quiet):
+    env = grid.Grid(DotDict({**grid.OPTIONS, 'wss': None, 'quiet': quiet}))
+    agent = Agent(None, 'grid_agent')
+    env.add_thing(agent, grid.agent_start_pos)
+    actions = ['>', '<']
+    return lambda time: env.execute_action(agent, actions[time % 2], time)
+
+def park_step(quiet):
+    env = blind_dog.Park({**blind_dog.OPTIONS, 'wss': None, 'quiet': quiet})
+    agent = blind_dog.BlindDog(blind_dog.program, 'fido')
+    agent.direction = Direction(Direction.D)
+    env.add_thing(agent, blind_dog.fido_start_pos)
+
+    def step(time):
+        agent.location = blind_dog.fido_start_pos
+        env.execute_action(agent, 'Forward', time)
+    return step
+
+def main(calls=20000):
+    report('environment', 'messages', 'quiet', 'saved/step')
+    for name, setup in [('Sea', sea_step), ('Grid', grid_step), ('Park', park_step)]:
+        with silenced():
+            loud = time_per_call(setup(False), calls)
+            quiet = time_per_call(setup(True), calls)
+        report(name, usec(loud), usec(quiet), usec(loud - quiet))
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,68 @@
+# pylint: disable=missing-docstring, invalid-name
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+# Memory used by the things in `Sea` (objects) and `CompactSea` (grids, see
+# `compact.py`). The seas have obstacles at the top and the bottom and squid in
+# 2% of the squares (sparse) or in all squares (dense). The memory is measured
+# with `tracemalloc` while the sea is filled. Run with:
+# `python -m bench.memory [width height]`
+#
+
+import random
+import sys
+import tracemalloc
+
+from animatai.agents import Obstacle
+
+from sea import CompactSea, Sea, Squid
+
+from bench import report, silenced
+
+
+SIZES = [(500, 70), (1000, 140)]
+
+# the things are appended directly, `add_thing` checks for duplicates in all things
+def fill(cls, width, height, density):
+    sea = cls({'width': width, 'height': height})
+    append = getattr(sea, 'append_thing', sea.things.append)
+    random.seed(width)
+    for x in range(0, width):
+        for y in range(0, height):
+            if y in (0, height - 1):
+                thing = Obstacle(str(len(sea.things)))
+            elif random.random() < density:
+                thing = Squid(str(len(sea.things)))
+            else:
+                continue
+            thing.location = (x, y)
+            append(thing)
+    return sea
+
+def measure(cls, width, height, density):
+    tracemalloc.start()
+    try:
+        with silenced():
+            sea = fill(cls, width, height, density)
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return sea, size
+
+def main(*size):
+    report('sea', 'things', 'Sea', 'CompactSea', 'bytes/square', 'ratio')
+    for width, height in [size] if size else SIZES:
+        for name, density in [('sparse', 0.02), ('dense', 1.0)]:
+            sea, objects = measure(Sea, width, height, density)
+            things = len(sea.things)
+            del sea
+            compact_sea, compact = measure(CompactSea, width, height, density)
+            assert compact_sea.count_things(Squid) + compact_sea.count_things(Obstacle) == things
+            squares = width * height
+            report('{}x{} {}'.format(width, height, name), str(things),
+                   '{:.1f} MB'.format(objects / 1e6), '{:.1f} MB'.format(compact / 1e6),
+                   '{:.1f} / {:.1f}'.format(objects / squares, compact / squares),
+                   '{:.0f}x'.format(objects / compact))
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:3]])
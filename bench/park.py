@@ -0,0 +1,42 @@
+# pylint: disable=missing-docstring, invalid-name
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+# Cost of `Park.is_done` when the park is filled with `Dirt`, `Food` and `Water`.
+# The edibles are placed last, which is the worst case for scanning all things.
+# Run with: `python -m bench.park [size ...]`
+#
+
+import sys
+
+from blind_dog import BlindDog, Dirt, Food, Park, Water, program
+
+from bench import report, silenced, time_per_call, usec
+
+
+def fill(size):
+    park = Park({'terrain': ['G' * size] * size})
+    park.add_thing(BlindDog(program, 'fido'), (0, 0))
+    for i in range(0, size * size):
+        x, y = i % size, i // size
+        cls = Dirt if i < size * size - 2 else (Food if i % 2 else Water)
+        park.add_thing(cls(str(i)), (x, y))
+    return park
+
+def scan(park):
+    no_edibles = not any(isinstance(thing, (Food, Water)) for thing in park.things)
+    dead_agents = not any(agent.is_alive() for agent in park.agents)
+    return dead_agents or no_edibles
+
+def main(*sizes):
+    report('things', 'scan', 'counters')
+    for size in sizes or (16, 32, 64):
+        with silenced():
+            park = fill(size)
+        assert scan(park) == park.is_done()
+        report(str(len(park.things)),
+               usec(time_per_call(lambda _: scan(park), 200)),
+               usec(time_per_call(lambda _: park.is_done(), 200)))
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
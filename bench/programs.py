@@ -0,0 +1,71 @@
+# pylint: disable=missing-docstring, invalid-name
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+# Per step cost of the agent programs with the debug taps (debug on) and with
+# the taps dropped (debug off). The number of function calls and string
+# formatting calls (`__repr__`, `__str__`, `format`) per step are counted with
+# `cProfile`. Run with: `python -m bench.programs [steps]`
+#
+
+import cProfile
+import pstats
+import sys
+
+import grid
+import mom_and_calf
+import random_mom_and_calf2
+from sea import Song, Squid
+
+from bench import report, silenced, time_per_call, usec
+
+
+FORMATS = ['__repr__', '__str__', 'format']
+
+def agents():
+    return [('mom_and_calf.Mom', mom_and_calf, lambda: mom_and_calf.Mom({'energy': 1.0})),
+            ('mom_and_calf.Calf', mom_and_calf, lambda: mom_and_calf.Calf({'energy': 1.0})),
+            ('random_mom_and_calf2.Mom', random_mom_and_calf2, random_mom_and_calf2.Mom),
+            ('random_mom_and_calf2.Calf', random_mom_and_calf2, random_mom_and_calf2.Calf),
+            ('grid.GridAgent', grid, lambda: grid.GridAgent({'energy': 1.0, 'water': 1.0},
+                                                            ['7', '8']))]
+
+def percept(agent):
+    rewards = {objective: 0.0 for objective in agent.status}
+    return ([(Squid('s'), 0), (Song('song'), None)], rewards)
+
+def calls_per_step(program, p, steps):
+    profile = cProfile.Profile()
+    profile.enable()
+    for _ in range(0, steps):
+        program(p)
+    profile.disable()
+
+    stats = pstats.Stats(profile).stats
+    calls = sum(stat[1] for stat in stats.values()) / steps
+    formats = sum(stat[1] for key, stat in stats.items()
+                  if any(fmt in key[2] for fmt in FORMATS)) / steps
+    return calls, formats
+
+def measure(module, create, debug, steps):
+    module.DEBUG_MODE = debug
+    agent = create()
+    p = percept(agent)
+    seconds = time_per_call(lambda _: agent.program(p), steps)
+    calls, formats = calls_per_step(create().program, p, min(steps, 200))
+    return seconds, calls, formats
+
+def main(steps=2000):
+    report('program', 'debug on', 'debug off', 'calls on/off', 'formats on/off')
+    for name, module, create in agents():
+        debug_mode = module.DEBUG_MODE
+        with silenced():
+            on = measure(module, create, True, steps)
+            off = measure(module, create, False, steps)
+        module.DEBUG_MODE = debug_mode
+        report(name, usec(on[0]), usec(off[0]),
+               '{:.0f}/{:.0f}'.format(on[1], off[1]),
+               '{:.0f}/{:.0f}'.format(on[2], off[2]))
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,42 @@
+# pylint: disable=missing-docstring, invalid-name
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+# Steps per second of `random_mom_and_calf` (one sea per run) and of batches of
+# seas with `sea_batch.SeaBatch`, counted as the number of seas times the number
+# of steps. Run with: `python -m bench.sea_batch [steps]`
+#
+
+import sys
+import time
+
+import random_mom_and_calf
+import random_mom_and_calf_config
+import sea_batch
+
+from bench import report, silenced
+
+
+SIZES = [1, 100, 1000, 10000]
+
+def steps_per_sec(func, seas, steps):
+    start = time.perf_counter()
+    func()
+    return '{:.0f}'.format(seas * steps / (time.perf_counter() - start))
+
+def main(steps=200):
+    options = random_mom_and_calf_config.OPTIONS
+    quiet, options.quiet = options.quiet, True
+
+    report('world', 'seas', 'steps/sec')
+    with silenced():
+        rate = steps_per_sec(lambda: random_mom_and_calf.run(None, steps, 1), 1, steps)
+    report('random_mom_and_calf', '1', rate)
+    for size in SIZES:
+        rate = steps_per_sec(lambda: sea_batch.random_mom_and_calf(size, steps, 1), size, steps)
+        report('sea_batch', str(size), rate)
+
+    options.quiet = quiet
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,52 @@
+# pylint: disable=missing-docstring, invalid-name
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+# Cost of looking up `Squid` at a location in `Sea` and `IndexedSea` when the
+# sea grows from 50x7 to 5000x700. The seas have obstacles at the top and the
+# bottom and squid in 2% of the squares. Run with: `python -m bench.spatial`
+#
+
+import random
+import sys
+
+from animatai.agents import Obstacle
+
+from sea import IndexedSea, Sea, Squid
+
+from bench import report, silenced, time_per_call, usec
+
+
+SIZES = [(50, 7), (500, 70), (5000, 700)]
+
+# the things are appended directly, `add_thing` checks for duplicates in all things
+def fill(cls, width, height):
+    sea = cls({'width': width, 'height': height})
+    random.seed(width)
+    for x in range(0, width):
+        for y in [0, height - 1]:
+            sea.things.append(Obstacle(str(len(sea.things))))
+            sea.things[-1].location = (x, y)
+        for y in range(1, height - 1):
+            if random.random() < 0.02:
+                sea.things.append(Squid(str(len(sea.things))))
+                sea.things[-1].location = (x, y)
+    if hasattr(sea, 'rebuild_index'):
+        sea.rebuild_index()
+    return sea
+
+def lookups(sea, width, height):
+    locations = [(random.randrange(width), random.randrange(height)) for _ in range(0, 100)]
+    return lambda i: sea.list_things_at(locations[i % 100], Squid)
+
+def main(calls=200):
+    report('sea', 'things', 'Sea', 'IndexedSea')
+    for width, height in SIZES:
+        with silenced():
+            sea, indexed = fill(Sea, width, height), fill(IndexedSea, width, height)
+        report('{}x{}'.format(width, height), str(len(sea.things)),
+               usec(time_per_call(lookups(sea, width, height), calls)),
+               usec(time_per_call(lookups(indexed, width, height), calls)))
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,159 @@
+# pylint: disable=missing-docstring, invalid-name
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+# Step rate benchmark for the example worlds. Each world's `run()` is executed
+# headless with a fixed seed and number of steps. The steps/sec, the latency
+# percentiles of the steps and the peak memory (using `tracemalloc`, in a
+# separate run) are reported. Run with: `python -m bench`
+#
+# Save the results and compare later runs with them to catch regressions:
+#
+#```
+# python -m bench --save baseline.json
+# python -m bench --baseline baseline.json --tolerance 0.2
+#```
+#
+# The exit code is 1 when a world is slower or uses more memory than the baseline
+# (more than `tolerance`).
+#
+
+import argparse
+import importlib
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from contextlib import contextmanager
+
+from animatai.agents import Environment
+
+from bench import report, silenced
+
+
+# world: (steps, extra arguments to run)
+WORLDS = {
+    'blind_dog': (50, ()),
+    'random_agents': (2000, ()),
+    'random_mom_and_calf': (200, ()),
+    'random_mom_and_calf2': (200, ()),
+    'mom_and_calf': (200, (1,)),
+    'grid': (200, ()),
+}
+
+# The function that is called once per step in each world
+def step_function(world, module):
+    if world == 'random_agents':
+        return module, 'move_agents'
+    return Environment, 'step'
+
+# Replace `obj.name` with a wrapper that saves the duration of each call
+@contextmanager
+def timed(obj, name):
+    func, durations = getattr(obj, name), []
+
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            durations.append(time.perf_counter() - start)
+
+    setattr(obj, name, wrapper)
+    try:
+        yield durations
+    finally:
+        setattr(obj, name, func)
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100 * len(values)))]
+
+def run_world(world, steps, seed):
+    module = importlib.import_module(world)
+    args = (None, steps, seed) + WORLDS[world][1]
+
+    with silenced(), timed(*step_function(world, module)) as durations:
+        start = time.perf_counter()
+        module.run(*args)
+        seconds = time.perf_counter() - start
+
+    with silenced():
+        tracemalloc.start()
+        module.run(*args)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {
+        'steps': len(durations),
+        'seconds': seconds,
+        'steps_per_sec': len(durations) / seconds,
+        'p50_us': percentile(durations, 50) * 1e6,
+        'p90_us': percentile(durations, 90) * 1e6,
+        'p99_us': percentile(durations, 99) * 1e6,
+        'peak_kib': peak / 1024,
+    }
+
+# Keep the fastest of `repeat` runs
+def benchmark(worlds, steps=None, seed=1, repeat=1):
+    results = {}
+    for world in worlds:
+        runs = [run_world(world, steps or WORLDS[world][0], seed) for _ in range(0, repeat)]
+        results[world] = max(runs, key=lambda res: res['steps_per_sec'])
+        res = results[world]
+        report(world, str(res['steps']), '{:.0f}'.format(res['steps_per_sec']),
+               '{:.0f}'.format(res['p50_us']), '{:.0f}'.format(res['p90_us']),
+               '{:.0f}'.format(res['p99_us']), '{:.0f}'.format(res['peak_kib']))
+    return results
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for world, res in results.items():
+        base = baseline['results'].get(world)
+        if not base:
+            continue
+        if res['steps_per_sec'] < base['steps_per_sec'] * (1 - tolerance):
+            regressions.append('{}: {:.0f} steps/sec, baseline {:.0f}'.format(
+                world, res['steps_per_sec'], base['steps_per_sec']))
+        if res['peak_kib'] > base['peak_kib'] * (1 + tolerance):
+            regressions.append('{}: {:.0f} KiB peak memory, baseline {:.0f}'.format(
+                world, res['peak_kib'], base['peak_kib']))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m bench',
+                                     description='Step rate benchmark for the example worlds')
+    parser.add_argument('worlds', nargs='*', metavar='world',
+                        help='worlds to run (default: all): ' + ', '.join(WORLDS))
+    parser.add_argument('--steps', type=int, help='number of steps (default: set per world)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=1, help='keep the fastest of the runs')
+    parser.add_argument('--save', help='save the results as JSON')
+    parser.add_argument('--baseline', help='compare with results saved with --save')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args(argv)
+    for world in args.worlds:
+        if world not in WORLDS:
+            parser.error('unknown world ' + world)
+
+    report('world', 'steps', 'steps/sec', 'p50 (us)', 'p90 (us)', 'p99 (us)', 'peak (KiB)')
+    results = benchmark(args.worlds or list(WORLDS), args.steps, args.seed, args.repeat)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'python': platform.python_version(), 'seed': args.seed,
+                       'results': results}, f, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print('REGRESSION:', regression)
+        return 1 if regressions else 0
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
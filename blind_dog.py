@@ -11,6 +11,11 @@ from gzutils.gzutils import DotDict, Logging
 from animatai.agents import Agent, Thing, Direction, NonSpatial, XYEnvironment
 from animatai.utils import vector_add
 
+from compact import CompactThings
+from render import DeltaRender
+from simulation import complete, complete_async, iter_steps, run_options
+from spatial import LocationIndex
+
 
 # Setup logging
 # =============
@@ -69,65 +74,92 @@ class Bark(NonSpatial):
     def __hash__(self):
         return hash(self.__name__)
 
-class Park(XYEnvironment):
+# Set the option `render_deltas` to render with binary deltas, see `render.py`
+class Park(DeltaRender, XYEnvironment):
     def __init__(self, options):
         self.ENV_ENCODING = [('F', Food), ('W', Water), ('D', Dirt)]
+        # number of things of each class, updated in add_thing and delete_thing
+        self.counts = {Food: 0, Water: 0}
         #options['width'] = len(options.terrain[0])
         #options['height'] = len(options.terrain)
         super().__init__(options)
 
+    def count(self, thing, inc):
+        for cls in self.counts:
+            if isinstance(thing, cls):
+                self.counts[cls] += inc
+
+    def add_thing(self, thing, location=(1, 1), exclude_duplicate_class_items=False):
+        n = len(self.things)
+        super().add_thing(thing, location, exclude_duplicate_class_items)
+        if len(self.things) > n:
+            self.count(thing, 1)
+
+    def delete_thing(self, thing):
+        n = len(self.things)
+        super().delete_thing(thing)
+        if len(self.things) < n:
+            self.count(thing, -1)
+
     def calc_performance(self, _, _2):
         pass
 
-    # changes the state of the environment based on what the agent does
+    # changes the state of the environment based on what the agent does.
+    # No messages are built when the option `quiet` is set.
     def execute_action(self, agent, action, time):
         super().execute_action(agent, action, time)
+        quiet = self.options.quiet
 
         if action == 'Forward':
             # the super class moves the agent for us, just print a status
-            msg = '{} decided to {} at location {} and time {}'.format(str(agent)[1:-1],
-                                                                       action,
-                                                                       agent.location,
-                                                                       time)
-            self.show_message(msg)
+            if not quiet:
+                msg = '{} decided to {} at location {} and time {}'.format(str(agent)[1:-1],
+                                                                           action,
+                                                                           agent.location,
+                                                                           time)
+                self.show_message(msg)
 
         elif action == 'eat':
             items = self.list_things_at(agent.location, tclass=Food)
             if items:
                 if agent.eat(items[0]): #Have the dog eat the first item
-                    msg = '{} ate {} at location {} and time {}'.format(str(agent)[1:-1],
-                                                                        str(items[0])[1:-1],
-                                                                        agent.location,
-                                                                        time)
-                    self.show_message(msg)
+                    if not quiet:
+                        msg = '{} ate {} at location {} and time {}'.format(str(agent)[1:-1],
+                                                                            str(items[0])[1:-1],
+                                                                            agent.location,
+                                                                            time)
+                        self.show_message(msg)
                     self.delete_thing(items[0]) #Delete it from the Park after.
 
         elif action == 'drink':
             items = self.list_things_at(agent.location, tclass=Water)
             if items:
                 if agent.drink(items[0]): #Have the dog drink the first item
-                    msg = '{} drank {} at location {} and time {}'.format(str(agent)[1:-1],
-                                                                          str(items[0])[1:-1],
-                                                                          agent.location,
-                                                                          time)
-                    self.show_message(msg)
+                    if not quiet:
+                        msg = '{} drank {} at location {} and time {}'.format(str(agent)[1:-1],
+                                                                              str(items[0])[1:-1],
+                                                                              agent.location,
+                                                                              time)
+                        self.show_message(msg)
                     self.delete_thing(items[0]) #Delete it from the Park after.
 
         elif action == 'watch':
-            items = self.list_things_at(agent.location, tclass=Thing)
-            msg = '{} decided to {} {} at location {} and time {}'.format(str(agent)[1:-1],
-                                                                          action,
-                                                                          items,
-                                                                          agent.location,
-                                                                          time)
-            self.show_message(msg)
+            if not quiet:
+                items = self.list_things_at(agent.location, tclass=Thing)
+                msg = '{} decided to {} {} at location {} and time {}'.format(str(agent)[1:-1],
+                                                                              action,
+                                                                              items,
+                                                                              agent.location,
+                                                                              time)
+                self.show_message(msg)
 
         elif action == 'bark':
-            msg = '{} decided to {} at location {} and time {}'.format(str(agent)[1:-1],
-                                                                       action,
-                                                                       agent.location,
-                                                                       time)
-            self.show_message(msg)
+            if not quiet:
+                msg = '{} decided to {} at location {} and time {}'.format(str(agent)[1:-1],
+                                                                           action,
+                                                                           agent.location,
+                                                                           time)
+                self.show_message(msg)
             agent.bark(time)
             self.add_non_spatial(Bark('vov'), time)
 
@@ -136,10 +168,30 @@ class Park(XYEnvironment):
     # but to prevent killing our cute dog, we will stop before itself -
     # when there is no more food or water
     def is_done(self):
-        no_edibles = not any(isinstance(thing, (Food, Water)) for thing in self.things)
+        no_edibles = self.counts[Food] + self.counts[Water] == 0
         dead_agents = not any(agent.is_alive() for agent in self.agents)
         return dead_agents or no_edibles
 
+# Park with the things indexed by location, see `spatial.py`
+class IndexedPark(LocationIndex, Park):
+    pass
+
+# Park with the food, water and dirt in grids, see `compact.py`
+class CompactPark(CompactThings, Park):
+    COMPACT = (Food, Water, Dirt)
+
+    def thing_added(self, thing):
+        self.count(thing, 1)
+
+    def thing_deleted(self, thing):
+        self.count(thing, -1)
+
+# The park for the options `compact_things` and `location_index`
+def park_class(options):
+    if options.compact_things:
+        return CompactPark
+    return IndexedPark if options.location_index else Park
+
 class BlindDog(Agent):
 
     def __repr__(self):
@@ -205,17 +257,16 @@ def program(percept):
 # =====
 
 # _=param
-def run(wss=None, steps=None, seed=None):
+def simulation(wss=None, steps=None, seed=None):
     steps = int(steps) if steps else 50
 
     random.seed(seed)
 
     l.debug('Running blind_dog ', steps, ' steps')
 
-    options = OPTIONS
-    options.wss = wss
+    options = run_options(OPTIONS, wss)
 
-    park = Park(options)
+    park = park_class(options)(options)
     dog1 = BlindDog(program, 'fido')
     dog2 = BlindDog(program, 'dido')
 
@@ -235,7 +286,13 @@ def run(wss=None, steps=None, seed=None):
     park.add_thing(dogfood, (0, 5))
     park.add_thing(water, (0, 7))
 
-    park.run(steps)
+    yield from iter_steps(park, steps)
+
+def run(wss=None, steps=None, seed=None):
+    return complete(simulation(wss, steps, seed))
+
+async def run_async(wss=None, steps=None, seed=None):
+    return await complete_async(simulation(wss, steps, seed))
 
 if __name__ == "__main__":
     run()
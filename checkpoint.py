@@ -0,0 +1,162 @@
+# pylint: disable=missing-docstring, invalid-name
+#
+# Checkpoints of learning agents and their environment
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+# A checkpoint contains the Q-table, the visit counts and the status of each
+# agent, the things in the environment and the state of the random generator.
+# It is saved as a gzipped pickle. Resuming from a checkpoint continues the run
+# exactly as if it had not been interrupted, including the histories that are
+# written by `finished`.
+#
+# Use `run` instead of `Environment.run` (or `iter_steps` in a simulation, see
+# `simulation.py`):
+#
+#```
+# time = checkpoint.restore(path, sea, [mom, calf]) if resume else 0
+# checkpoint.run(sea, steps, [mom, calf], path, every=1000, start=time)
+#```
+#
+
+import gzip
+import os
+import pickle
+import random
+
+from animatai.agents import Agent, Direction
+from gzutils.gzutils import Logging
+
+import simulation
+
+
+# Setup logging
+# =============
+
+DEBUG_MODE = True
+l = Logging('checkpoint', DEBUG_MODE)
+
+VERSION = 1
+
+Q_AGENT_ATTRS = ['Q', 'Nsa', 's', 'a', 'r', 'ps', 'pa', 'pr', 'iterations', 'in_terminal']
+ENV_ATTRS = ['thing_counter', 'non_spatials', 'actions', 'rewards', 'environment_history',
+             'respawn', 'store', 'obstacles']
+
+
+# Save and restore
+# ================
+
+def agent_state(agent):
+    return {
+        'location': agent.location,
+        'direction': agent.direction.direction,
+        'bump': agent.bump,
+        'alive': agent.alive,
+        'performance': agent.performance,
+        'status': dict(agent.status),
+        'status_history': agent.status_history,
+        'network': list(agent.network.state),
+        'q_agent': {attr: getattr(agent.q_agent, attr)
+                    for attr in getattr(agent.q_agent, 'checkpoint_attrs', Q_AGENT_ATTRS)},
+    }
+
+def restore_agent(agent, state):
+    agent.location = state['location']
+    agent.direction = Direction(state['direction'])
+    agent.bump, agent.alive = state['bump'], state['alive']
+    agent.performance = state['performance']
+
+    # the status dict is shared by the agent, the network and the ndp
+    agent.status.clear()
+    agent.status.update(state['status'])
+    agent.status_history = state['status_history']
+    agent.network.state[:] = state['network']
+    for attr, value in state['q_agent'].items():
+        setattr(agent.q_agent, attr, value)
+
+# The things are saved in the order of `env.things`, agents are saved by name
+def env_state(env):
+    return {
+        'things': [('agent', thing.__name__) if isinstance(thing, Agent) else
+                   (thing.__class__, thing.__name__, thing.location) for thing in env.things],
+        'attrs': {attr: getattr(env, attr) for attr in ENV_ATTRS if hasattr(env, attr)},
+    }
+
+def restore_env(env, state, agents):
+    agents = {agent.__name__: agent for agent in agents}
+    env.things, env.agents = [], []
+    for thing in state['things']:
+        if thing[0] == 'agent':
+            env.things.append(agents[thing[1]])
+            env.agents.append(agents[thing[1]])
+        else:
+            cls, name, location = thing
+            env.things.append(cls(name))
+            env.things[-1].location = location
+
+    for attr, value in state['attrs'].items():
+        setattr(env, attr, value)
+    if hasattr(env, 'rebuild_index'):
+        env.rebuild_index()
+    if hasattr(env, 'redraw'):
+        env.redraw()
+
+# `time` is the next step to execute
+def save(path, env, agents, time):
+    state = {
+        'version': VERSION,
+        'time': time,
+        'random': random.getstate(),
+        'env': env_state(env),
+        'agents': {agent.__name__: agent_state(agent) for agent in agents},
+    }
+
+    # write to a temporary file first, a crash should not leave a broken checkpoint
+    tmp_path = path + '.tmp'
+    with gzip.open(tmp_path, 'wb') as f:
+        pickle.dump(state, f, pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+# Restores the state from a checkpoint created with `save` in `env` and `agents`,
+# these should be created in the same way as when the checkpoint was saved.
+# Returns the time to continue from, or 0 if there is no checkpoint (or no path).
+def restore(path, env, agents):
+    if not path or not os.path.exists(path):
+        return 0
+
+    with gzip.open(path, 'rb') as f:
+        state = pickle.load(f)
+    if state['version'] != VERSION:
+        l.error('restore: unknown checkpoint version', state['version'], 'in', path)
+        return 0
+
+    restore_env(env, state['env'], agents)
+    for agent in agents:
+        restore_agent(agent, state['agents'][agent.__name__])
+    random.setstate(state['random'])
+
+    l.info('restored', path, 'at time', state['time'])
+    return state['time']
+
+
+# Run
+# ===
+
+# Same as `simulation.iter_steps` but saving a checkpoint every `every` steps
+# and at the end
+def iter_steps(env, steps, agents, path=None, every=None, start=0):
+    # pylint: disable=too-many-arguments
+    time = start
+    for time in simulation.iter_steps(env, steps, start):
+        if path and every and time % every == 0:
+            save(path, env, agents, time)
+        yield time
+
+    if path:
+        save(path, env, agents, time)
+
+# Same as `Environment.run` but starting at `start` and saving checkpoints
+def run(env, steps, agents, path=None, every=None, start=0):
+    # pylint: disable=too-many-arguments
+    for _ in iter_steps(env, steps, agents, path, every, start):
+        pass
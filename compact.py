@@ -0,0 +1,214 @@
+# pylint: disable=missing-docstring, invalid-name
+#
+# Compact storage of static things
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+# Each `Thing` is a Python object with a `__dict__`, a few hundred bytes with
+# its name and location. `__slots__` doesn't help since `Thing` (in animatai)
+# has a `__dict__`. Large maps are mostly squid, obstacles, landmarks etc. that
+# have no state besides their class and location.
+#
+# The `CompactThings` mixin keeps the things of the classes in `COMPACT` in a
+# `ThingStore` instead of `self.things`: one grid per class with the number of
+# things in each square (two bytes per square), one byte per square for
+# obstacles (they don't move). The things are created when they are listed, by
+# `list_things_at`, `things_near` and `list_things`. A listed thing is a new
+# object each time, named after its square (`y * width + x`, the same name as
+# when a layout that fills the map is parsed). Deleting it removes one thing of
+# its class from its square.
+#
+# Use the mixin before the environment class and list the compact classes:
+#
+#```
+# class CompactSea(CompactThings, Sea):
+#     COMPACT = (Squid, Obstacle)
+#```
+#
+
+from array import array
+
+from animatai.agents import PERCEPTIBLE_DISTANCE, Agent, Obstacle, Thing
+
+from templates import ObstacleGrid
+
+
+class ThingStore:
+
+    def __init__(self, width, height, classes):
+        self.width = width
+        self.height = height
+        self.classes = classes
+
+        # {class: grid}, with the number of things or obstacle or not in each square
+        self.grids = {}
+        for cls in classes:
+            if issubclass(cls, Obstacle):
+                self.grids[cls] = ObstacleGrid(width, height).grid
+            else:
+                self.grids[cls] = array('H', bytes(2 * width * height))
+        self.totals = {cls: 0 for cls in classes}
+
+    def inside(self, location):
+        x, y = location
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def add(self, cls, location):
+        x, y = location
+        grid, i = self.grids[cls], y * self.width + x
+        if isinstance(grid, array) or not grid[i]:
+            grid[i] += 1
+            self.totals[cls] += 1
+
+    # Returns False when there is no thing of the class in the square
+    def remove(self, cls, location):
+        x, y = location
+        grid, i = self.grids[cls], y * self.width + x
+        if not grid[i]:
+            return False
+        grid[i] -= 1
+        self.totals[cls] -= 1
+        return True
+
+    def count(self, cls, location):
+        if not self.inside(location):
+            return 0
+        x, y = location
+        return self.grids[cls][y * self.width + x]
+
+    def any_at(self, location, tclass=Thing):
+        return any(self.count(cls, location) for cls in self.classes if issubclass(cls, tclass))
+
+    def things_at(self, location, tclass=Thing):
+        res = []
+        for cls in self.classes:
+            if issubclass(cls, tclass):
+                for _ in range(0, self.count(cls, location)):
+                    res.append(self.thing(cls, location))
+        return res
+
+    def things(self, tclass=Thing):
+        res = []
+        for cls in self.classes:
+            if issubclass(cls, tclass) and self.totals[cls]:
+                for i, n in enumerate(self.grids[cls]):
+                    for _ in range(0, n):
+                        res.append(self.thing(cls, (i % self.width, i // self.width)))
+        return res
+
+    def total(self, tclass=Thing):
+        return sum(self.totals[cls] for cls in self.classes if issubclass(cls, tclass))
+
+    def thing(self, cls, location):
+        thing = cls(str(location[1] * self.width + location[0]))
+        thing.location = location
+        return thing
+
+
+class CompactThings:
+
+    # the classes of the things that are kept in the store
+    COMPACT = ()
+
+    def __init__(self, *args, **kwargs):
+        self.store = None
+        super().__init__(*args, **kwargs)
+        self.compact_store()
+
+    # The store is created when the size is known, things are added by `XYEnvironment.__init__`
+    def compact_store(self):
+        if self.store is None:
+            self.store = ThingStore(self.width, self.height, self.COMPACT)
+        return self.store
+
+    def is_compact(self, thing):
+        return isinstance(thing, self.COMPACT) and not isinstance(thing, Agent)
+
+    # Called when a compact thing has been added or deleted, the squares are also
+    # drawn again with `DeltaRender` (see `render.py`)
+    def thing_added(self, thing):
+        pass
+
+    def thing_deleted(self, thing):
+        pass
+
+    def add_thing(self, thing, location=(1, 1), exclude_duplicate_class_items=False):
+        if not self.is_compact(thing):
+            super().add_thing(thing, location, exclude_duplicate_class_items)
+            return
+        if not self.is_inbounds(location):
+            return
+        if exclude_duplicate_class_items and self.compact_store().count(thing.__class__, location):
+            return
+        thing.location = location
+        self.append_thing(thing)
+
+    # Add a thing without the checks in `add_thing`, see `templates.py`
+    def append_thing(self, thing):
+        if self.is_compact(thing):
+            self.compact_store().add(thing.__class__, thing.location)
+            self.thing_added(thing)
+            if hasattr(self, 'square_changed'):
+                self.square_changed(thing.location)
+        else:
+            self.things.append(thing)
+
+    def delete_thing(self, thing):
+        if not self.is_compact(thing):
+            super().delete_thing(thing)
+            return
+        if self.store.remove(thing.__class__, thing.location):
+            self.thing_deleted(thing)
+            if hasattr(self, 'square_changed'):
+                self.square_changed(thing.location)
+            for obs in self.observers:
+                obs.thing_deleted(thing)
+
+    def list_things(self, tclass=Thing):
+        return super().list_things(tclass) + self.store.things(tclass)
+
+    def list_things_at(self, location, tclass=Thing):
+        return super().list_things_at(location, tclass) + self.store.things_at(location, tclass)
+
+    def some_things_at(self, location, tclass=Thing):
+        return self.store.any_at(location, tclass) or super().some_things_at(location, tclass)
+
+    def count_things(self, tclass=Thing):
+        return len(super().list_things(tclass)) + self.store.total(tclass)
+
+    def things_near(self, location, radius=None):
+        if radius is None:
+            radius = PERCEPTIBLE_DISTANCE
+        res = super().things_near(location, radius)
+        x, y = location
+        for dx in range(-radius, radius + 1):
+            for dy in range(-radius, radius + 1):
+                distance = dx * dx + dy * dy
+                if distance <= radius * radius:
+                    res.extend((thing, radius * radius - distance)
+                               for thing in self.store.things_at((x + dx, y + dy)))
+        return res
+
+    # The things in the history are counted instead of listed
+    def save_history(self):
+        classes, self.save_history_for = self.save_history_for, []
+        try:
+            super().save_history()
+        finally:
+            self.save_history_for = classes
+        for cls in classes:
+            self.environment_history[cls].append(self.count_things(cls))
+
+    # The world is only drawn for the viewer
+    def build_world(self):
+        super().build_world()
+        if not (self.world and self.wss):
+            return
+        world = list(map(list, self.world))
+        for cls in self.COMPACT:
+            code = self.class2envcode(cls)
+            if code:
+                for i, n in enumerate(self.store.grids[cls]):
+                    if n:
+                        world[i // self.width][i % self.width] = code
+        self.world = list(map(''.join, world))
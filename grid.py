@@ -20,17 +20,25 @@
 # Imports
 # ======
 
+import os
 import random
 
-from functools import partial
-from toolz.curried import do
-from toolz.functoolz import compose
-from gzutils.gzutils import DotDict, Logging, get_output_dir
+from gzutils.gzutils import DotDict, Logging
 
 from animatai.utils import vector_add
 from animatai.agents import Agent, Obstacle, Thing, XYEnvironment
 from animatai.network import MotorNetwork, Network
-from animatai.network_rl import MotorModel, NetworkModel, NetworkDP, NetworkQLearningAgent
+from animatai.network_rl import MotorModel, NetworkModel, NetworkDP
+
+import checkpoint
+from compact import CompactThings
+import learning
+from profiling import PhaseProfiler
+from programs import build_program, phase, tap
+from render import DeltaRender
+from respawn import Respawn
+from simulation import complete, complete_async, output_path, run_options
+from spatial import LocationIndex
 
 
 # Setup logging
@@ -38,7 +46,6 @@ from animatai.network_rl import MotorModel, NetworkModel, NetworkDP, NetworkQLea
 
 random.seed(1)
 
-OUTPUT_DIR = get_output_dir()
 DEBUG_MODE = True
 l = Logging('grid', DEBUG_MODE)
 
@@ -77,7 +84,7 @@ agent_start_pos = (1, 3)
 
 # rewards: {action: {percept: {objective: reward}}}
 OPTIONS = DotDict({
-    'output_path': get_output_dir(file=__file__),
+    'output_path': None, # created when the world is run
     'terrain': terrain.split('\n'),
     'things': things.split('\n'),
     'exogenous_things': exogenous_things.split('\n'),
@@ -113,7 +120,9 @@ OPTIONS = DotDict({
     }
 })
 
-class Grid(XYEnvironment):
+# The exogenous energy and water are added by a `RespawnScheduler`, see `respawn.py`.
+# Set the option `render_deltas` to render with binary deltas, see `render.py`.
+class Grid(DeltaRender, Respawn, XYEnvironment):
 
     def __init__(self, options):
         self.options = options
@@ -122,9 +131,14 @@ class Grid(XYEnvironment):
         self.options.save_history_for = [Energy, Water]
         super().__init__(self.options)
 
+    # Set the location directly, without the obstacle check in `move_to`
+    def place(self, thing, location):
+        thing.location = location
+
     def execute_action(self, agent, action, time):
-        self.show_message((agent.__name__ + ' performing ' + str(action) + ' at location ' +
-                           str(agent.location) + ' and time ' + str(time)))
+        if not self.options.quiet:
+            self.show_message((agent.__name__ + ' performing ' + str(action) + ' at location ' +
+                               str(agent.location) + ' and time ' + str(time)))
 
         directions = {'^': (0, -1), 'v': (0, 1), '>': (1, 0), '<': (-1, 0)}
         if not action in directions:
@@ -133,16 +147,30 @@ class Grid(XYEnvironment):
 
         if agent.location == (4, 1):
             l.info('*** MIGHT HAVE FOUND ENERGY ***')
-            agent.location = agent_start_pos
+            self.place(agent, agent_start_pos)
 
         if agent.location == (4, 2):
             l.info('*** MIGHT HAVE FOUND WATER ***')
-            agent.location = agent_start_pos
+            self.place(agent, agent_start_pos)
 
         agent.bump = self.move_to(agent,
                                   vector_add(directions[action],
                                              agent.location))
 
+# Grid with the things indexed by location, see `spatial.py`
+class IndexedGrid(LocationIndex, Grid):
+    pass
+
+# Grid with the landmarks, obstacles, energy and water in grids, see `compact.py`
+class CompactGrid(CompactThings, Grid):
+    COMPACT = (Landmark, Obstacle, Energy, Water)
+
+# The grid for the options `compact_things` and `location_index`
+def grid_class(options):
+    if options.compact_things:
+        return CompactGrid
+    return IndexedGrid if options.location_index else Grid
+
 
 # Agent
 # ======
@@ -155,12 +183,14 @@ motor_model = MotorModel(motors_to_action)
 
 class GridAgent(Agent):
 
-    def __init__(self, objectives, landmarks):
+    # q_learning: see `learning.py`
+    def __init__(self, objectives, landmarks, profiler=None, q_learning=None):
         # pylint: disable=line-too-long, too-many-locals
 
         super().__init__(None, 'grid_agent')
+        params = learning.settings(q_learning)
 
-        N = Network(None, objectives)
+        self.network = N = Network(None, objectives)
         SENSOR = N.add_SENSOR_node
         self.status = N.get_NEEDs()
         self.status_history = {'energy':[], 'water': []}
@@ -178,26 +208,25 @@ class GridAgent(Agent):
 
         # NOTE: init=agent_start_pos, using a location here (only for debugging),
         #            is a state when MDP:s are used
-        self.ndp = NetworkDP(agent_start_pos, self.status, motor_model, .9, network_model)
-        self.q_agent = NetworkQLearningAgent(self.ndp, Ne=0, Rplus=2,
-                                             alpha=lambda n: 60./(59+n),
-                                             epsilon=0.2,
-                                             delta=0.5)
+        self.ndp = NetworkDP(agent_start_pos, self.status, motor_model, params['gamma'],
+                             network_model)
+        self.q_agent = learning.q_learning_agent(self.ndp, params)
 
 
         # compose applies the functions from right to left
-        self.program = compose(do(partial(l.debug, 'mnetwork.update'))
-                               , M.update
-                               , do(partial(l.debug, 'q_agent'))
-                               , self.q_agent
-                               , do(partial(l.debug, N))
-                               , do(partial(l.debug, 'network.update'))
-                               , N.update
-                               , do(partial(l.debug, 'percept'))
-                               , lambda x: do(partial(l.debug, '*** ENERY FOUND ***'))(x) if 'energy' in x[1] and x[1]['energy'] > 0.0 else x
-                               , lambda x: do(partial(l.debug, '*** WATER FOUND ***'))(x) if 'water' in x[1] and x[1]['water'] > 0.0 else x
-                               , do(self.printU)
-                              )
+        self.program = build_program(tap(l.debug, 'mnetwork.update', debug_only=True)
+                                     , phase('mnetwork.update', M.update)
+                                     , tap(l.debug, 'q_agent', debug_only=True)
+                                     , phase('q_agent', self.q_agent)
+                                     , tap(l.debug, N, debug_only=True)
+                                     , tap(l.debug, 'network.update', debug_only=True)
+                                     , phase('network.update', N.update)
+                                     , tap(l.debug, 'percept', debug_only=True)
+                                     , tap(l.debug, '*** ENERY FOUND ***', when=lambda x: 'energy' in x[1] and x[1]['energy'] > 0.0, debug_only=True)
+                                     , tap(l.debug, '*** WATER FOUND ***', when=lambda x: 'water' in x[1] and x[1]['water'] > 0.0, debug_only=True)
+                                     , tap(self.printU)
+                                     , debug=DEBUG_MODE, profiler=profiler,
+                                     owner='grid_agent')
 
     def __repr__(self):
         return '<{} ({})>'.format(self.__name__, self.__class__.__name__)
@@ -238,19 +267,36 @@ def print_grid(U):
     l.info(res)
 
 
-def run(wss=None, steps=None, seed=None):
+def simulation(wss=None, steps=None, seed=None, checkpoint_path=None, checkpoint_every=1000,
+               resume=False):
+    # pylint: disable=too-many-arguments
     steps = int(steps) if steps else 1000
     l.debug('Running grid in', str(steps), 'steps with seed', seed)
 
     random.seed(seed)
-    options = OPTIONS
-    options.wss = wss
+    options = run_options(OPTIONS, wss)
+    output_path(options, __file__)
+
+    grid = grid_class(options)(options)
+    profiler = PhaseProfiler() if options.profile else None
+    if profiler:
+        profiler.instrument(grid)
 
-    grid = Grid(options)
     landmarks = [lm.__name__ for lm in grid.list_things(Landmark)]
-    grid_agent = GridAgent(options.objectives, landmarks)
+    grid_agent = GridAgent(options.objectives, landmarks, profiler, options.q_learning)
     grid.add_thing(grid_agent, agent_start_pos)
-    grid.run(steps)
+    writer = None
+    if options.trace:
+        import traces # imports NumPy, only when tracing
+        writer = traces.TraceWriter(os.path.join(options.output_path, 'trace'), options.objectives)
+        traces.instrument(grid, writer)
+
+    start = checkpoint.restore(checkpoint_path, grid, [grid_agent]) if resume else 0
+    yield from checkpoint.iter_steps(grid, steps, [grid_agent], checkpoint_path,
+                                     checkpoint_every, start)
+
+    if writer:
+        writer.close()
 
     l.info('\n')
     l.info('The Landmarks will have these numbers:')
@@ -268,5 +314,20 @@ def run(wss=None, steps=None, seed=None):
 
     l.info('q_agent:', grid_agent.q_agent)
 
+    if profiler:
+        profiler.report()
+
+    return grid_agent
+
+# A checkpoint is saved in the file `checkpoint_path` every `checkpoint_every`
+# steps and at the end, use `resume=True` to continue from it
+def run(wss=None, steps=None, seed=None, checkpoint_path=None, checkpoint_every=1000,
+        resume=False):
+    # pylint: disable=too-many-arguments
+    return complete(simulation(wss, steps, seed, checkpoint_path, checkpoint_every, resume))
+
+async def run_async(wss=None, steps=None, seed=None):
+    return await complete_async(simulation(wss, steps, seed))
+
 if __name__ == "__main__":
     run()
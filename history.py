@@ -0,0 +1,72 @@
+# pylint: disable=missing-docstring, invalid-name
+#
+# Histories with bounded memory
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+# A `RingBuffer` keeps the last `window` values in an `array`. It is used
+# instead of a list for the histories of the environments (and the statuses of
+# the agents) so that long runs use constant memory. It supports `append`,
+# `len`, indexing and iteration from the oldest to the latest value, i.e. what
+# `XYEnvironment.save_history` and `finished` need. Without a window all values
+# are kept (still stored compactly in the array).
+#
+
+from array import array
+
+
+class RingBuffer:
+
+    # typecode: see `array`, 'l' for counts and 'd' for statuses
+    def __init__(self, window=None, typecode='d', values=()):
+        if window is not None and window < 2:
+            raise ValueError('the window must be at least 2')
+        self.window = window
+        self.values = array(typecode)
+        self.start = 0 # index of the oldest value when the buffer is full
+        self.count = 0 # number of values appended, including the dropped ones
+        for value in values:
+            self.append(value)
+
+    def append(self, value):
+        if self.window is None or len(self.values) < self.window:
+            self.values.append(value)
+        else:
+            self.values[self.start] = value
+            self.start = (self.start + 1) % self.window
+        self.count += 1
+
+    def __len__(self):
+        return len(self.values)
+
+    # 0 is the oldest value in the buffer and -1 the latest
+    def __getitem__(self, i):
+        n = len(self.values)
+        if i < -n or i >= n:
+            raise IndexError('RingBuffer index out of range')
+        return self.values[(self.start + i) % n]
+
+    def __iter__(self):
+        values, start = self.values, self.start
+        for i in range(start, len(values)):
+            yield values[i]
+        for i in range(0, start):
+            yield values[i]
+
+    def __repr__(self):
+        return 'RingBuffer({}, {})'.format(self.window, list(self))
+
+    def latest(self):
+        return self[-1]
+
+    def previous(self):
+        return self[-2]
+
+    # True when the latest value is less than the one before it
+    def decreased(self):
+        values = self.values
+        n = len(values)
+        if n < 2:
+            return False
+        last = (self.start - 1) % n
+        return values[last] < values[last - 1]
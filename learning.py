@@ -0,0 +1,52 @@
+# pylint: disable=missing-docstring, invalid-name
+#
+# Q-learning settings of the example agents
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+# `Mom`, `Calf` and `GridAgent` use the same `NetworkQLearningAgent` settings.
+# They can be changed with the option `q_learning` (a dict with some of the keys
+# in `DEFAULTS`), for instance in a sweep (see `sweep.py`). The learning rate is
+# alpha(n) = alpha / (alpha - 1 + n), i.e. 60 / (59 + n) by default.
+#
+# The Q-table is kept in dicts by default, set `backend` to `'array'` to keep it
+# in NumPy arrays instead (see `qtable.py`). The results are the same.
+#
+
+from animatai.network_rl import NetworkQLearningAgent
+
+
+DEFAULTS = {
+    'Ne': 0,
+    'Rplus': 2,
+    'alpha': 60.,
+    'epsilon': 0.2,
+    'delta': 0.5,
+    'gamma': .9,
+    'backend': 'dict',
+}
+
+BACKENDS = ['dict', 'array']
+
+def settings(params=None):
+    unknown = set(params or {}) - set(DEFAULTS)
+    if unknown:
+        raise ValueError('unknown Q-learning settings: ' + ', '.join(sorted(unknown)))
+    params = {**DEFAULTS, **(params or {})}
+    if params['backend'] not in BACKENDS:
+        raise ValueError('unknown Q-learning backend: ' + str(params['backend']))
+    return params
+
+def learning_rate(alpha):
+    return lambda n: alpha / (alpha - 1 + n)
+
+# `params` is the result of `settings`, gamma is used in the `NetworkDP`
+def q_learning_agent(ndp, params):
+    cls = NetworkQLearningAgent
+    if params['backend'] == 'array':
+        from qtable import ArrayQLearningAgent # imports NumPy, only when used
+        cls = ArrayQLearningAgent
+    return cls(ndp, Ne=params['Ne'], Rplus=params['Rplus'],
+               alpha=learning_rate(params['alpha']),
+               epsilon=params['epsilon'],
+               delta=params['delta'])
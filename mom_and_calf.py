@@ -8,20 +8,23 @@
 # learnt is that the mother signs when she eats.
 #
 
+import os
 import random
-from numpy import corrcoef
-from statistics import mean, stdev
 
-from functools import partial
-from toolz.curried import do
-from toolz.functoolz import compose
 from gzutils.gzutils import DefaultDict, Logging, unpack, get_output_dir
 
 from animatai.agents import Agent
 from animatai.network import Network, MotorNetwork
-from animatai.network_rl import MotorModel, NetworkModel, NetworkDP, NetworkQLearningAgent
-
-from sea import Sea, Song, Squid
+from animatai.network_rl import MotorModel, NetworkModel, NetworkDP
+
+import checkpoint
+import learning
+from profiling import PhaseProfiler
+from programs import build_program, phase, tap
+from sea import Song, Squid, sea_class
+from simulation import complete, complete_async, output_path, run_options
+from stats import RunningCorrelation, RunningStats
+import templates
 from random_mom_and_calf_config import mom_start_pos, calf_start_pos, OPTIONS
 
 
@@ -37,11 +40,13 @@ l = Logging('mom_and_calf', DEBUG_MODE)
 
 class Mom(Agent):
 
-    def __init__(self, objectives):
+    # q_learning: see `learning.py`
+    def __init__(self, objectives, profiler=None, q_learning=None):
         # pylint: disable=line-too-long, too-many-locals
 
         # program=None
         super().__init__(None, 'mom')
+        params = learning.settings(q_learning)
 
         # Motors and actions
         motors = ['sing_eat_and_forward', 'forward', 'dive_and_forward',
@@ -70,24 +75,21 @@ class Mom(Agent):
 
         # NOTE: init=agent_start_pos, using a location here (only for debugging),
         #            is a state when MDP:s are used
-        self.ndp = NetworkDP(mom_start_pos, self.status, motor_model, gamma=.9,
+        self.ndp = NetworkDP(mom_start_pos, self.status, motor_model, gamma=params['gamma'],
                              network_model=self.network_model)
-        self.q_agent = NetworkQLearningAgent(self.ndp, Ne=0, Rplus=2,
-                                             alpha=lambda n: 60./(59+n),
-                                             epsilon=0.2,
-                                             delta=0.5)
+        self.q_agent = learning.q_learning_agent(self.ndp, params)
 
         # compose applies the functions from right to left
-        self.program = compose(do(partial(l.debug, 'Mom mnetwork.update'))
-                               , do(partial(l.debug, M))
-                               , M.update
-                               , do(partial(l.debug, 'Mom q_agent'))
-                               , self.q_agent
-                               , do(partial(l.debug, N))
-                               , do(partial(l.debug, 'Mom network.update'))
-                               , N.update
-                               , do(partial(l.debug, 'Mom percept'))
-                              )
+        self.program = build_program(tap(l.debug, 'Mom mnetwork.update', debug_only=True)
+                                     , tap(l.debug, M, debug_only=True)
+                                     , phase('mnetwork.update', M.update)
+                                     , tap(l.debug, 'Mom q_agent', debug_only=True)
+                                     , phase('q_agent', self.q_agent)
+                                     , tap(l.debug, N, debug_only=True)
+                                     , tap(l.debug, 'Mom network.update', debug_only=True)
+                                     , phase('network.update', N.update)
+                                     , tap(l.debug, 'Mom percept', debug_only=True)
+                                     , debug=DEBUG_MODE, profiler=profiler, owner='mom')
 
     def __repr__(self):
         return '<{} ({}) iterations:{}>'.format(self.__name__,
@@ -101,10 +103,11 @@ class Mom(Agent):
 class Calf(Agent):
     # pylint: disable=too-many-instance-attributes
 
-    def __init__(self, objectives):
+    def __init__(self, objectives, profiler=None, q_learning=None):
         # pylint: disable=line-too-long
 
         super().__init__(None, 'calf')
+        params = learning.settings(q_learning)
 
         motors = ['eat_and_forward', 'forward', 'dive_and_forward',
                   'up_and_forward']
@@ -135,27 +138,24 @@ class Calf(Agent):
 
         # NOTE: init=agent_start_pos, using a location here (only for debugging),
         #            is a state when MDP:s are used
-        self.ndp = NetworkDP(calf_start_pos, self.status, motor_model, gamma=.9,
+        self.ndp = NetworkDP(calf_start_pos, self.status, motor_model, gamma=params['gamma'],
                              network_model=self.network_model)
-        self.q_agent = NetworkQLearningAgent(self.ndp, Ne=0, Rplus=2,
-                                             alpha=lambda n: 60./(59+n),
-                                             epsilon=0.2,
-                                             delta=0.5)
+        self.q_agent = learning.q_learning_agent(self.ndp, params)
 
         # compose applies the functions from right to left
-        self.program = compose(do(partial(l.debug, 'Calf mnetwork.update'))
-                               , do(partial(l.debug, M))
-                               , lambda a: do(partial(l.debug, '*** CALF EATING! ***'))(a) if a == 'eat_and_forward' else a
-                               , M.update
-                               , do(partial(l.debug, 'Calf q_agent'))
-                               , self.q_agent
-                               , do(partial(l.debug, N))
-                               , lambda p: do(partial(l.debug, '*** CALF HEARD SONG! ***'))(p) if s2 in p[0] else p
-                               , lambda p: do(partial(l.debug, '*** CALF FOUND SQUID! ***'))(p) if s1 in p[0] else p
-                               , do(partial(l.debug, 'Calf network.update'))
-                               , N.update
-                               , do(partial(l.debug, 'Calf percept'))
-                              )
+        self.program = build_program(tap(l.debug, 'Calf mnetwork.update', debug_only=True)
+                                     , tap(l.debug, M, debug_only=True)
+                                     , tap(l.debug, '*** CALF EATING! ***', when=lambda a: a == 'eat_and_forward', debug_only=True)
+                                     , phase('mnetwork.update', M.update)
+                                     , tap(l.debug, 'Calf q_agent', debug_only=True)
+                                     , phase('q_agent', self.q_agent)
+                                     , tap(l.debug, N, debug_only=True)
+                                     , tap(l.debug, '*** CALF HEARD SONG! ***', when=lambda p: s2 in p[0], debug_only=True)
+                                     , tap(l.debug, '*** CALF FOUND SQUID! ***', when=lambda p: s1 in p[0], debug_only=True)
+                                     , tap(l.debug, 'Calf network.update', debug_only=True)
+                                     , phase('network.update', N.update)
+                                     , tap(l.debug, 'Calf percept', debug_only=True)
+                                     , debug=DEBUG_MODE, profiler=profiler, owner='calf')
 
     def __repr__(self):
         return '<{} ({}) iterations:{}>'.format(self.__name__,
@@ -166,80 +166,219 @@ class Calf(Agent):
 # Main
 # =====
 
-def run_trial(wss=None, steps=None, seed=None):
+def trial_simulation(wss=None, steps=None, seed=None, checkpoint_path=None,
+                     checkpoint_every=1000, resume=False):
+    # pylint: disable=too-many-arguments, too-many-locals
     steps = int(steps) if steps else 10
     l.debug('Running mom_and_calf in', str(steps), 'steps with seed', seed)
 
     random.seed(seed)
 
-    options = OPTIONS
-    options.wss = wss
-    sea = Sea(options)
+    options = run_options(OPTIONS, wss)
+    output_path(options, __file__)
+    sea = templates.new_env(sea_class(options), options)
+
+    profiler = PhaseProfiler() if options.profile else None
+    if profiler:
+        profiler.instrument(sea)
 
-    mom = Mom(options.objectives)
-    calf = Calf(options.objectives)
+    mom = Mom(options.objectives, profiler, options.q_learning)
+    calf = Calf(options.objectives, profiler, options.q_learning)
 
     sea.add_thing(mom, mom_start_pos)
     sea.add_thing(calf, calf_start_pos)
 
-    sea.run(steps)
+    writer = None
+    if options.trace:
+        import traces # imports NumPy, only when tracing
+        writer = traces.TraceWriter(os.path.join(options.output_path, 'trace'), options.objectives)
+        traces.instrument(sea, writer)
+
+    start = checkpoint.restore(checkpoint_path, sea, [mom, calf]) if resume else 0
+    yield from checkpoint.iter_steps(sea, steps, [mom, calf], checkpoint_path,
+                                     checkpoint_every, start)
+
+    if writer:
+        writer.close()
 
     for status in ['energy']:
         l.debug('----- ' + status + '------')
 
-        U, pi = mom.q_agent.Q_to_U_and_pi()[status]
+        U, pi = sea.U_and_pi(mom)[status]
         l.debug('mom - pi:', pi, ', U:', U)
 
-        U, pi = calf.q_agent.Q_to_U_and_pi()[status]
+        U, pi = sea.U_and_pi(calf)[status]
         l.debug('calf - pi:', pi, ', U:', U)
 
-    return ({'name': mom.__name__, 'iterations': mom.q_agent.iterations, 'U_and_pi': mom.q_agent.Q_to_U_and_pi()},
-            {'name': calf.__name__, 'iterations': calf.q_agent.iterations, 'U_and_pi': calf.q_agent.Q_to_U_and_pi()})
+    if profiler:
+        profiler.report()
 
+    return ({'name': mom.__name__, 'iterations': mom.q_agent.iterations, 'U_and_pi': sea.U_and_pi(mom)},
+            {'name': calf.__name__, 'iterations': calf.q_agent.iterations, 'U_and_pi': sea.U_and_pi(calf)})
 
-def summarize_U_and_pi(U_and_pi):
-    U_res = DefaultDict(0)
-    pi_res = DefaultDict(0)
-    for j in range(0, len(U_and_pi)):
-        for objective, (U, pi) in U_and_pi[j].items():
+# A checkpoint is saved in the file `checkpoint_path` every `checkpoint_every` steps
+# and when the trial is finished. With `resume` the trial continues from the
+# checkpoint, if it exists.
+def run_trial(wss=None, steps=None, seed=None, checkpoint_path=None, checkpoint_every=1000,
+              resume=False):
+    # pylint: disable=too-many-arguments
+    return complete(trial_simulation(wss, steps, seed, checkpoint_path, checkpoint_every,
+                                     resume))
+
+
+# Running sums of U and counts of the actions selected by the policy over
+# the trials, one trial at a time
+class UAndPiSummary:
+
+    def __init__(self):
+        self.U = DefaultDict(0)  # {(objective, sensors): sum of U}
+        self.pi = DefaultDict(0) # {(objective, sensors, action): count}
+
+    def add(self, U_and_pi):
+        for objective, (U, pi) in U_and_pi.items():
             for sensors, action in pi.items():
-                pi_res[objective + ':' + sensors + ':' + action] += 1
+                self.pi[objective, sensors, action] += 1
             for sensors, utility in U.items():
-                U_res[objective + ':' + sensors] += utility
-    U_res = sorted(list(U_res.items()), key=lambda x: x[1], reverse=True)
-    pi_res = sorted(list(pi_res.items()), key=lambda x: x[1], reverse=True)
-    return U_res, pi_res
+                self.U[objective, sensors] += utility
+
+    def summary(self):
+        U_res = [(':'.join(key), value) for key, value in self.U.items()]
+        pi_res = [(':'.join(key), value) for key, value in self.pi.items()]
+        return (sorted(U_res, key=lambda x: x[1], reverse=True),
+                sorted(pi_res, key=lambda x: x[1], reverse=True))
 
-def run(wss=None, steps=None, seed=None, trials=10):
+def summarize_U_and_pi(U_and_pi):
+    summary = UAndPiSummary()
+    for trial in U_and_pi:
+        summary.add(trial)
+    return summary.summary()
+
+# Statistics of the trials that are updated as each trial finishes, the memory
+# used is the same for any number of trials
+class TrialAggregator:
+
+    def __init__(self):
+        self.ages = (RunningStats(), RunningStats())
+        self.correlation = RunningCorrelation()
+        self.U_and_pi = (UAndPiSummary(), UAndPiSummary())
+
+    def add(self, mom, calf):
+        l.info('AGES - trial:', self.trials, ', mom:', mom['iterations'],
+               ', calf:', calf['iterations'])
+        self.ages[0].add(mom['iterations'])
+        self.ages[1].add(calf['iterations'])
+        self.correlation.add(mom['iterations'], calf['iterations'])
+        self.U_and_pi[0].add(mom['U_and_pi'])
+        self.U_and_pi[1].add(calf['U_and_pi'])
+
+    @property
+    def trials(self):
+        return self.ages[0].n
+
+    # The statistics of the ages, for a JSON result
+    def as_dict(self):
+        several = self.trials > 1
+        return {
+            'trials': self.trials,
+            'mean_age': {'mom': self.ages[0].mean, 'calf': self.ages[1].mean},
+            'stdev_age': {'mom': self.ages[0].stdev() if several else None,
+                          'calf': self.ages[1].stdev() if several else None},
+        }
+
+    def report(self):
+        l.info('-------- STATS --------')
+        l.info('MEAN - mom:', self.ages[0].mean, ', calf:', self.ages[1].mean)
+        if self.trials > 1:
+            l.info('CORRELATION:', self.correlation.correlation())
+            l.info('STDEV - mom:', self.ages[0].stdev(), ', calf:', self.ages[1].stdev())
+
+        l.info('SUMMARY - U (state:sum of U over the trials) & PI  (state:number of times the policy selected action) ')
+        l.info('mom', self.U_and_pi[0].summary())
+        l.info('calf', self.U_and_pi[1].summary())
+
+# Each trial gets its own seed derived from the base seed. This makes the
+# trials independent of the order they are executed in.
+def trial_seed(seed, trial):
+    return None if seed is None else '{}:{}'.format(seed, trial)
+
+def trial_checkpoint_path(checkpoint_dir, trial):
+    return checkpoint_dir and os.path.join(checkpoint_dir, 'trial-{}.ckpt.gz'.format(trial))
+
+# The trials after the first get a new timestamp, in the same folder as the first
+def new_output_path():
+    if not OPTIONS.output_path:
+        return get_output_dir(file=__file__)
+    return get_output_dir(folder='/', file=OPTIONS.output_path)
+
+# The simulation of trial number `trial`, with its seed, output path and checkpoint
+def _trial_simulation(args):
+    wss, steps, seed, trial, checkpoint_dir, checkpoint_every, resume = args
+    if trial != 0:
+        OPTIONS.output_path = new_output_path()
+    return trial_simulation(wss, steps, trial_seed(seed, trial),
+                            trial_checkpoint_path(checkpoint_dir, trial), checkpoint_every, resume)
+
+def _run_trial(args):
+    return complete(_trial_simulation(args))
+
+# Run the trials one after another (workers=1) or spread them over a pool
+# of processes. The results are returned in trial order in both cases.
+# There is one checkpoint file per trial in `checkpoint_dir`.
+def run_trials(wss=None, steps=None, seed=None, trials=10, workers=1, checkpoint_dir=None,
+               checkpoint_every=1000, resume=False):
+    # pylint: disable=too-many-arguments
+    return list(iter_trials(wss, steps, seed, trials, workers, checkpoint_dir,
+                            checkpoint_every, resume))
+
+# Same as `run_trials` but the results are yielded as soon as they are ready
+def iter_trials(wss=None, steps=None, seed=None, trials=10, workers=1, checkpoint_dir=None,
+                checkpoint_every=1000, resume=False):
+    # pylint: disable=too-many-arguments
+    if checkpoint_dir:
+        os.makedirs(checkpoint_dir, exist_ok=True)
+
+    jobs = [(wss, steps, seed, i, checkpoint_dir, checkpoint_every, resume)
+            for i in range(0, trials)]
+    if workers > 1 and trials > 1:
+        if wss:
+            l.error('run_trials: a viewer can only be used with one worker')
+        else:
+            from multiprocessing import Pool # only imported when needed, for a fast startup
+            with Pool(min(workers, trials)) as pool:
+                yield from pool.imap(_run_trial, jobs, chunksize=1)
+            return
+
+    for job in jobs:
+        yield _run_trial(job)
+
+# Use `resume=True` with the same arguments to continue an interrupted run
+def run(wss=None, steps=None, seed=None, trials=10, workers=1, checkpoint_dir=None,
+        checkpoint_every=1000, resume=False):
+    # pylint: disable=too-many-arguments
     steps = int(steps) if steps else 500
     random.seed(seed)
 
-    ages = ([], [])
-    U_and_pi = ([], [])
-    for i in range(0, trials):
-        if i != 0:
-            OPTIONS.output_path = get_output_dir(file=__file__) # get a new timestamp in each trial
-
-        mom, calf = run_trial(wss, steps, seed)
-        ages[0].append(mom['iterations'])
-        ages[1].append(calf['iterations'])
-
-        U_and_pi[0].append(mom['U_and_pi'])
-        U_and_pi[1].append(calf['U_and_pi'])
+    stats = TrialAggregator()
+    for mom, calf in iter_trials(wss, steps, seed, trials, workers, checkpoint_dir,
+                                 checkpoint_every, resume):
+        stats.add(mom, calf)
 
+    stats.report()
+    return stats
 
+# The trials are run one after another, giving control back to the event loop
+# after each step
+async def run_async(wss=None, steps=None, seed=None, trials=10):
+    steps = int(steps) if steps else 500
+    random.seed(seed)
 
-    l.info('-------- STATS --------')
-    l.info('MEAN - mom:', mean(ages[0]), ', calf:', mean(ages[1]))
-    if len(ages[0]) > 1:
-        l.info('CORRELATIONS:\n', corrcoef(ages[0], ages[1]) )
-        l.info('STDEV - mom:', stdev(ages[0]), ', calf:', stdev(ages[1]))
-    l.info('AGES - mom:', ages[0])
-    l.info('AGES - calf:', ages[1])
+    stats = TrialAggregator()
+    for trial in range(0, trials):
+        args = (wss, steps, seed, trial, None, None, False)
+        stats.add(*await complete_async(_trial_simulation(args)))
 
-    l.info('SUMMARY - U (state:sum of U over the trials) & PI  (state:number of times the policy selected action) ')
-    l.info('mom', summarize_U_and_pi(U_and_pi[0]))
-    l.info('calf', summarize_U_and_pi(U_and_pi[1]))
+    stats.report()
+    return stats
 
 
 
@@ -0,0 +1,70 @@
+# pylint: disable=missing-docstring, invalid-name
+#
+# Profiling of the phases of the agents and environments
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+# Each step of a learning agent goes through `Network.update`, the q_agent and
+# `MotorNetwork.update` before the environment executes the action. The
+# `PhaseProfiler` records the wall time and the number of calls of each phase,
+# per agent and per environment. The phases of the agent programs are marked
+# with `programs.phase` and are only wrapped when a profiler is used, so there is
+# no overhead otherwise. Enable with the option `profile`.
+#
+
+import time
+
+from collections import OrderedDict
+from gzutils.gzutils import Logging
+
+
+# Setup logging
+# =============
+
+DEBUG_MODE = True
+l = Logging('profiling', DEBUG_MODE)
+
+
+class PhaseProfiler:
+
+    def __init__(self):
+        # {(owner, phase): [calls, seconds]}
+        self.phases = OrderedDict()
+
+    def wrap(self, owner, phase, func):
+        stats = self.phases.setdefault((owner, phase), [0, 0.0])
+        perf_counter = time.perf_counter
+
+        def timed(*args):
+            start = perf_counter()
+            try:
+                return func(*args)
+            finally:
+                stats[0] += 1
+                stats[1] += perf_counter() - start
+        return timed
+
+    # Time `execute_action` per agent and `step` of an environment
+    def instrument(self, env):
+        owner = env.__class__.__name__
+        execute_action, step = env.execute_action, env.step
+        actions = {}
+
+        def timed_execute_action(agent, action, time_):
+            if agent.__name__ not in actions:
+                actions[agent.__name__] = self.wrap(owner, 'execute_action:' + agent.__name__,
+                                                    execute_action)
+            return actions[agent.__name__](agent, action, time_)
+
+        env.execute_action = timed_execute_action
+        env.step = self.wrap(owner, 'step', step)
+        return env
+
+    def report(self):
+        l.info('-------- PROFILE --------')
+        l.info('{:<12}{:<28}{:>10}{:>12}{:>12}'.format('owner', 'phase', 'calls',
+                                                         'total (ms)', 'mean (us)'))
+        for (owner, phase), (calls, seconds) in self.phases.items():
+            l.info('{:<12}{:<28}{:>10}{:>12.1f}{:>12.1f}'.format(owner, phase, calls,
+                                                                 seconds * 1e3,
+                                                                 seconds / max(calls, 1) * 1e6))
@@ -0,0 +1,78 @@
+# pylint: disable=missing-docstring, invalid-name, too-few-public-methods, exec-used
+#
+# Building agent programs
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+# The agent programs are chains of functions where the output of one function
+# is the input to the next. `build_program` takes the functions in the same order
+# as `toolz.compose` (applied from right to left) and compiles them into one
+# function. Taps, created with `tap`, log the value and pass it through unchanged.
+# Debug taps (`debug_only=True`) are dropped when debug is off, the other taps
+# (`l.info` etc.) are always kept. Example:
+#
+#```
+# program = build_program(tap(l.debug, 'mnetwork.update', debug_only=True)
+#                         , M.update
+#                         , q_agent
+#                         , tap(l.debug, N, debug_only=True)
+#                         , phase('network.update', N.update)
+#                         , debug=DEBUG_MODE)
+#```
+#
+# Functions marked with `phase` are timed when a `profiling.PhaseProfiler` is
+# given, they are used as they are otherwise.
+#
+
+
+# Calls `log(*args, value)` and returns the value, like `do(partial(log, *args))`.
+# `when` is an optional predicate for the value.
+class Tap:
+
+    def __init__(self, log, *args, when=None, debug_only=False):
+        self.log = log
+        self.args = args
+        self.when = when
+        self.debug_only = debug_only
+
+    def __call__(self, value):
+        if self.when is None or self.when(value):
+            self.log(*self.args, value)
+        return value
+
+def tap(log, *args, when=None, debug_only=False):
+    return Tap(log, *args, when=when, debug_only=debug_only)
+
+class Phase:
+
+    def __init__(self, name, func):
+        self.name = name
+        self.func = func
+
+def phase(name, func):
+    return Phase(name, func)
+
+# Compile one function calling `funcs` from left to right, i.e. f2(f1(f0(x))).
+# This avoids the loop and the extra calls of a generic compose.
+def fuse(funcs):
+    names = ['f' + str(i) for i in range(0, len(funcs))]
+    expr = 'x'
+    for name in names:
+        expr = name + '(' + expr + ')'
+
+    namespace = dict(zip(names, funcs))
+    exec('def program(x):\n    return ' + expr, namespace)
+    return namespace['program']
+
+def unwrap(func, profiler, owner):
+    if not isinstance(func, Phase):
+        return func
+    if profiler:
+        return profiler.wrap(owner, func.name, func.func)
+    return func.func
+
+# `owner` is the name used for the phases in the profiler, typically the agent name
+def build_program(*funcs, debug=False, profiler=None, owner=None):
+    funcs = [unwrap(func, profiler, owner) for func in reversed(funcs)
+             if debug or not (isinstance(func, Tap) and func.debug_only)]
+    return fuse(funcs)
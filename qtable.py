@@ -0,0 +1,184 @@
+# pylint: disable=missing-docstring, invalid-name, too-many-instance-attributes
+#
+# Q-learning with the Q-table in NumPy arrays
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+# `ArrayQLearningAgent` is a `NetworkQLearningAgent` where the states and the
+# actions are numbered (the states when they are first seen) and Q and N are
+# arrays: `Q[objective, state, action]` and `Nsa[state, action]`. The update of
+# the objectives, the choice of action and `Q_to_U_and_pi` are array operations.
+#
+# It is a drop-in replacement, the results are the same as with the dicts for
+# the same seed: `random.random()` is called as many times and in the same order
+# by the exploration function, ties are broken the same way (the first action
+# with the highest value, the first objective with the lowest) and U/pi is
+# calculated from the entries in the order they were added to the Q-table. The
+# order is saved in `inserted[state, action]`, -1 when the entry is not in the
+# Q-table. The last action is `None`, used for the terminal states.
+#
+# Use it with the Q-learning setting `backend` (see `learning.py`):
+#
+#```
+# OPTIONS.q_learning = {'backend': 'array'}
+#```
+#
+
+import math
+import random
+
+import numpy as np
+
+from animatai.network_rl import NetworkQLearningAgent
+
+
+class ArrayQLearningAgent(NetworkQLearningAgent):
+
+    # The arrays grow by this number of states
+    CHUNK = 16
+
+    # The attributes saved in a checkpoint, see `checkpoint.py`
+    checkpoint_attrs = ['Q', 'Nsa', 'inserted', 'count', 'states', 'state_list',
+                        's', 'a', 'r', 'ps', 'pa', 'pr', 'iterations', 'in_terminal']
+
+    def __init__(self, ndp, Ne, Rplus, alpha=None, delta=0.5, epsilon=0.3,
+                 max_iterations=None, name='noname', calc_status=False):
+        # pylint: disable=too-many-arguments
+        super().__init__(ndp, Ne, Rplus, alpha, delta, epsilon, max_iterations, name, calc_status)
+
+        self.objectives = list(ndp.statuses)
+        self.action_list = list(self.all_act) + [None]
+        self.actions = {action: i for i, action in enumerate(self.action_list)}
+        self.all_indexes = (slice(0, len(self.all_act)), list(range(0, len(self.all_act))))
+
+        # {state: index} and the states in the order they were seen
+        self.states = {}
+        self.state_list = []
+
+        shape = (self.CHUNK, len(self.action_list))
+        self.Q = np.zeros((len(self.objectives),) + shape)
+        self.Nsa = np.zeros(shape)
+        self.inserted = np.full(shape, -1, dtype=np.int64)
+        self.count = 0
+
+    def state_index(self, state):
+        i = self.states.get(state)
+        if i is None:
+            i = self.states[state] = len(self.state_list)
+            self.state_list.append(state)
+            if i == self.Nsa.shape[0]:
+                self.grow()
+        return i
+
+    def grow(self):
+        states = self.CHUNK
+        self.Q = np.concatenate([self.Q, np.zeros((self.Q.shape[0], states, self.Q.shape[2]))],
+                                axis=1)
+        self.Nsa = np.concatenate([self.Nsa, np.zeros((states, self.Nsa.shape[1]))])
+        self.inserted = np.concatenate([self.inserted,
+                                        np.full((states, self.inserted.shape[1]), -1,
+                                                dtype=np.int64)])
+
+    # Set Q for all objectives, the entry is added to the Q-table if needed
+    def set_Q(self, s, a, values):
+        self.Q[:, s, a] = values
+        if self.inserted[s, a] < 0:
+            self.inserted[s, a] = self.count
+            self.count += 1
+
+    # (index in the arrays, list of indexes) of the actions in `state`
+    def action_indexes(self, state):
+        actions = self.actions_in_state(state)
+        if actions is self.all_act:
+            return self.all_indexes
+        indexes = [self.actions[action] for action in actions]
+        return indexes, indexes
+
+    # The items of the Q-table of `objective`, in the order they were added
+    def items(self, objective):
+        Q = self.Q[self.objectives.index(objective)]
+        s, a = np.nonzero(self.inserted[:len(self.state_list)] >= 0)
+        order = np.argsort(self.inserted[s, a])
+        return [((self.state_list[s[i]], self.action_list[a[i]]), float(Q[s[i], a[i]]))
+                for i in order]
+
+    def __repr__(self):
+        res = ''
+        for status in self.ndp.statuses:
+            lst = [(self.ndp.network_model(k[0]),
+                    self.ndp.motor_model(k[1]), '{0:.3f}'.format(v))
+                   for k, v in self.items(status)]
+            res += status + ':' + str(lst)
+        return ('Q:' + res  +
+                ',statuses:' + str(self.ndp.statuses) +
+                ',iterations:' + str(self.iterations) +
+                ',in_terminal:' + str(self.in_terminal))
+
+    def Q_to_U_and_pi(self):
+        n = len(self.state_list)
+        inserted = self.inserted[:n]
+        present = inserted >= 0
+        last = np.iinfo(np.int64).max
+
+        # the states in the order they were first added to the Q-table
+        first = np.where(present, inserted, last).min(axis=1)
+        states = np.argsort(first, kind='mergesort')[:np.count_nonzero(first < last)]
+        names = [self.ndp.network_model(self.state_list[i]) for i in states.tolist()]
+        motors = [self.ndp.motor_model(action) for action in self.action_list]
+
+        res = {}
+        for objective, Q in zip(self.ndp.statuses, self.Q[:, :n]):
+            Q = np.where(present, Q, -math.inf)[states]
+            best = (Q == Q.max(axis=1)[:, None]) & present[states]
+            pi = np.where(best, inserted[states], last).argmin(axis=1)
+            U = Q[np.arange(0, len(states)), pi]
+            res[objective] = (dict(zip(names, U.tolist())),
+                              dict(zip(names, [motors[a] for a in pi.tolist()])))
+        return res
+
+    def __call__(self, percept):
+        s1, r = self.update_state(percept)
+        s, a = self.s, self.a
+        alpha, gamma, in_terminal = self.alpha, self.gamma, self.check_terminal()
+        statuses = self.ndp.statuses
+
+        s1i = self.state_index(s1)
+        actions, indexes = self.action_indexes(s1)
+
+        if in_terminal:
+            self.set_Q(self.state_index(s), self.actions[None],
+                       [r[objective] for objective in statuses])
+        if s is not None:
+            si, ai = self.state_index(s), self.actions[a]
+            self.Nsa[si, ai] += 1
+            Q = self.Q[:, si, ai]
+            rewards = np.array([r[objective] for objective in statuses])
+            self.set_Q(si, ai, Q + (alpha(float(self.Nsa[si, ai])) *
+                                    (rewards + gamma * self.Q[:, s1i, actions].max(axis=1) - Q)))
+
+        if in_terminal:
+            self.s = self.a = self.r = None
+        else:
+            self.s, self.r = s1, r
+            self.a = self.action_list[indexes[self.choose(s1i, actions)]]
+
+            if self.calc_status:
+                self.ndp.update_statuses(self.s, self.a, self.r)
+        return self.a
+
+    # The index in `actions` of the action to perform in state `s`, see `f`
+    def choose(self, s, actions):
+        statuses = np.array(list(self.ndp.statuses.values()))
+        values = statuses[:, None] + self.delta * self.Q[:, s, actions]
+
+        if self.Ne >= 1:
+            explore = np.repeat([self.Nsa[s, actions] < self.Ne], len(values), axis=0)
+            draws = np.count_nonzero(~explore)
+        else:
+            explore, draws = np.zeros(values.shape, dtype=bool), values.size
+        if draws:
+            explore[~explore] = [random.random() <= self.epsilon for _ in range(0, draws)]
+        values[explore] = self.Rplus
+
+        best = values.argmax(axis=1)
+        return best[values[np.arange(0, len(best)), best].argmin()]
@@ -5,7 +5,12 @@
 # Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
 #
 
+import copy
+import json
 import random
+import time
+
+from simulation import complete, complete_async
 
 # Example of how the Field JS class can be used
 # ---------------------------------------------
@@ -48,22 +53,62 @@ def add_pos(pos1, pos2):
 def check_pos(pos):
     return pos[0] >= 0 and pos[0] < TERRAIN_SIZE[0] and pos[1] >= 0 and pos[1] < TERRAIN_SIZE[1]
 
-def random_move(from_pos):
-    move = random.choice(MOVES)
+def random_move(from_pos, rand=random):
+    move = rand.choice(MOVES)
     new_pos = add_pos(from_pos, move)
 
     # Make sure we are within the field
     if not check_pos(new_pos):
-        new_pos = random_move(from_pos)
+        new_pos = random_move(from_pos, rand)
 
     return new_pos
 
-def run(wss_=None, steps=None, seed=None):
+def move_agents(cfg, rand=random):
+    for agent in cfg['agents']:
+        update_agent_pos(cfg, agent, random_move(get_agent_pos(cfg, agent), rand))
+
+# The browser evaluates the messages it receives, so the updates of all agents
+# can be joined into one message (one websocket frame).
+def send_update_agents(wss_, cfg):
+    wss_.send(';'.join('w.updateAgent("' + agent + '",' + json.dumps(state) + ')'
+                       for agent, state in cfg['agents'].items()))
+
+# `batch` sends the positions of all agents in one message per step, otherwise
+# one message is sent per agent. `fps` caps the number of messages per second
+# when batching, the positions of several steps are then merged into one message.
+#
+# Each simulation has its own copy of `CFG` (with the positions of the agents) and
+# its own random generator, so simulations that run at the same time don't
+# affect each other.
+def simulation(wss_=None, steps=None, seed=None, batch=True, fps=None):
     steps = int(steps) if steps else 10
-    random.seed(seed)
+    rand = random.Random(seed)
+    cfg = copy.deepcopy(CFG)
+
+    if wss_:
+        wss_.send_init(cfg)
 
-    wss_.send_init(CFG)
+    last_frame, pending = None, False
     for _ in range(0, steps):
-        for agent in CFG['agents']:
-            update_agent_pos(CFG, agent, random_move(get_agent_pos(CFG, agent)))
-            wss_.send_update_agent(agent, CFG['agents'][agent])
+        move_agents(cfg, rand)
+
+        if wss_ and not batch:
+            for agent in cfg['agents']:
+                wss_.send_update_agent(agent, cfg['agents'][agent])
+        elif wss_:
+            now = time.monotonic()
+            pending = fps and last_frame is not None and now - last_frame < 1 / fps
+            if not pending:
+                send_update_agents(wss_, cfg)
+                last_frame = now
+
+        yield
+
+    if pending:
+        send_update_agents(wss_, cfg)
+
+def run(wss_=None, steps=None, seed=None, batch=True, fps=None):
+    return complete(simulation(wss_, steps, seed, batch, fps))
+
+async def run_async(wss_=None, steps=None, seed=None, batch=True, fps=None):
+    return await complete_async(simulation(wss_, steps, seed, batch, fps))
@@ -22,7 +22,9 @@ import random
 from animatai.agents import Agent
 from gzutils.gzutils import Logging
 
-from sea import Sea, Song, Squid
+from sea import Song, Squid, sea_class
+from simulation import complete, complete_async, iter_steps, output_path, run_options
+import templates
 from random_mom_and_calf_config import mom_start_pos, calf_start_pos, OPTIONS
 
 
@@ -97,15 +99,15 @@ def calf_program(percept):
 # Main
 # =====
 
-def run(wss=None, steps=None, seed=None):
+def simulation(wss=None, steps=None, seed=None):
     l.debug('Running random_mom_and_calf in', str(steps), 'steps with seed', seed)
     steps = int(steps) if steps else 10
 
     random.seed(seed)
 
-    options = OPTIONS
-    options.wss = wss
-    sea = Sea(options)
+    options = run_options(OPTIONS, wss)
+    output_path(options, __file__)
+    sea = templates.new_env(sea_class(options), options)
 
     mom = Agent(mom_program, 'mom')
     calf = Agent(calf_program, 'calf')
@@ -113,7 +115,13 @@ def run(wss=None, steps=None, seed=None):
     sea.add_thing(mom, mom_start_pos)
     sea.add_thing(calf, calf_start_pos)
 
-    sea.run(steps)
+    yield from iter_steps(sea, steps)
+
+def run(wss=None, steps=None, seed=None):
+    return complete(simulation(wss, steps, seed))
+
+async def run_async(wss=None, steps=None, seed=None):
+    return await complete_async(simulation(wss, steps, seed))
 
 if __name__ == "__main__":
     run()
@@ -12,16 +12,15 @@
 #
 
 import random
-from functools import partial
 
 from animatai.agents import Agent
 from animatai.network import Network, MotorNetwork
-
-from toolz.curried import do
-from toolz.functoolz import compose
 from gzutils.gzutils import Logging, unpack
 
-from sea import Sea, Song, Squid
+from programs import build_program, tap
+from sea import Song, Squid, sea_class
+from simulation import complete, complete_async, iter_steps, output_path, run_options
+import templates
 from random_mom_and_calf_config import mom_start_pos, calf_start_pos, OPTIONS
 
 
@@ -95,17 +94,17 @@ class Mom(Agent):
         l.info('motors_to_action:', motors_to_action)
 
         # compose applies the functions from right to left
-        self.program = compose(do(partial(l.debug, 'Mom mnetwork.update'))
-                               , M.update
-                               , do(partial(l.debug, 'Mom state_to_motor'))
-                               , lambda p: state_to_motor.get(p[0])
-                               , do(partial(l.debug, N))
-                               , do(partial(l.debug, 'Mom filter interesting states'))
-                               , lambda p: (p[0] & {s1, n2, n3, n4}, p[1])
-                               , do(partial(l.debug, 'Mom network.update'))
-                               , N.update
-                               , do(partial(l.debug, 'Mom percept'))
-                              )
+        self.program = build_program(tap(l.debug, 'Mom mnetwork.update', debug_only=True)
+                                     , M.update
+                                     , tap(l.debug, 'Mom state_to_motor', debug_only=True)
+                                     , lambda p: state_to_motor.get(p[0])
+                                     , tap(l.debug, N, debug_only=True)
+                                     , tap(l.debug, 'Mom filter interesting states', debug_only=True)
+                                     , lambda p: (p[0] & {s1, n2, n3, n4}, p[1])
+                                     , tap(l.debug, 'Mom network.update', debug_only=True)
+                                     , N.update
+                                     , tap(l.debug, 'Mom percept', debug_only=True)
+                                     , debug=DEBUG_MODE)
 
     def __repr__(self):
         return '<{} ({})>'.format(self.__name__, self.__class__.__name__)
@@ -144,17 +143,17 @@ class Calf(Agent):
                           frozenset([]): dive_and_forward}
 
         # compose applies the functions from right to left
-        self.program = compose(do(partial(l.debug, 'Calf mnetwork.update'))
-                               , M.update
-                               , do(partial(l.debug, 'Calf state_to_motor'))
-                               , lambda p: eat_and_forward if s1 in p[0] else (dive_and_forward if s2 in p[0] else up_and_forward)
-                               #, lambda s: eat_and_forward if s1 in s else (dive_and_forward if s2 in s else state_to_motor.get(s))
-                               , lambda p: do(partial(l.info, '--- CALF HEARD SONG, DIVING! ---'))(p) if s2 in p[0] else p
-                               , lambda p: do(partial(l.info, '--- CALF FOUND SQUID, EATING! ---'))(p) if s1 in p[0] else p
-                               , do(partial(l.debug, 'Calf network.update'))
-                               , N.update
-                               , do(partial(l.debug, 'Calf percept'))
-                              )
+        self.program = build_program(tap(l.debug, 'Calf mnetwork.update', debug_only=True)
+                                     , M.update
+                                     , tap(l.debug, 'Calf state_to_motor', debug_only=True)
+                                     , lambda p: eat_and_forward if s1 in p[0] else (dive_and_forward if s2 in p[0] else up_and_forward)
+                                     #, lambda s: eat_and_forward if s1 in s else (dive_and_forward if s2 in s else state_to_motor.get(s))
+                                     , tap(l.info, '--- CALF HEARD SONG, DIVING! ---', when=lambda p: s2 in p[0])
+                                     , tap(l.info, '--- CALF FOUND SQUID, EATING! ---', when=lambda p: s1 in p[0])
+                                     , tap(l.debug, 'Calf network.update', debug_only=True)
+                                     , N.update
+                                     , tap(l.debug, 'Calf percept', debug_only=True)
+                                     , debug=DEBUG_MODE)
 
     def __repr__(self):
         return '<{} ({})>'.format(self.__name__, self.__class__.__name__)
@@ -163,15 +162,15 @@ class Calf(Agent):
 # Main
 # =====
 
-def run(wss=None, steps=None, seed=None):
+def simulation(wss=None, steps=None, seed=None):
     steps = int(steps) if steps else 10
     l.debug('Running random_mom_and_calf in', str(steps), 'steps with seed', seed)
 
     random.seed(seed)
 
-    options = OPTIONS
-    options.wss = wss
-    sea = Sea(options)
+    options = run_options(OPTIONS, wss)
+    output_path(options, __file__)
+    sea = templates.new_env(sea_class(options), options)
 
     mom = Mom()
     calf = Calf()
@@ -179,7 +178,13 @@ def run(wss=None, steps=None, seed=None):
     sea.add_thing(mom, mom_start_pos)
     sea.add_thing(calf, calf_start_pos)
 
-    sea.run(steps)
+    yield from iter_steps(sea, steps)
+
+def run(wss=None, steps=None, seed=None):
+    return complete(simulation(wss, steps, seed))
+
+async def run_async(wss=None, steps=None, seed=None):
+    return await complete_async(simulation(wss, steps, seed))
 
 if __name__ == "__main__":
     run()
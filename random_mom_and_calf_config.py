@@ -7,7 +7,7 @@
 # Configuration that is common for the different cachelot examples.
 #
 
-from gzutils.gzutils import DotDict, get_output_dir
+from gzutils.gzutils import DotDict
 
 from sea import Squid
 
@@ -46,7 +46,7 @@ calf_start_pos = (0, 4)
 # `sensors` are boolean variables indicating percepts (`Things` of different kinds)
 # that are perceived. Active `sensors` are sent as input to the `program`
 OPTIONS = DotDict({
-    'output_path': get_output_dir(file=__file__),
+    'output_path': None, # created when the world is run, see `simulation.output_path`
     'terrain': terrain.split('\n'),
     'things': things.split('\n'),
     'exogenous_things': exogenous_things.split('\n'),
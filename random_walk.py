@@ -0,0 +1,81 @@
+# pylint: disable=missing-docstring, invalid-name, no-member
+#
+# A vectorized random walk
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+# A NumPy version of `random_agents` that moves all agents in one array
+# operation. Each agent makes one of the moves in `MOVES` with equal probability.
+# Moves that would leave the field are masked instead of sampled again, the
+# result is the same distribution as `random_agents.random_move`.
+#
+# This makes it possible to run 100k agents and stream their positions:
+#
+#```
+# walk = RandomWalk(positions, (100, 100), seed=1)
+# for positions in walk.stream(1000):
+#     ...
+#```
+#
+
+import copy
+
+import numpy as np
+
+from random_agents import CFG, MOVES, TERRAIN_SIZE, send_update_agents
+
+
+class RandomWalk:
+
+    # positions: [(x, y)] or an array with the shape (N, 2)
+    # seed: a seed or a `np.random.RandomState`
+    def __init__(self, positions, size=TERRAIN_SIZE, seed=None):
+        self.positions = np.array(positions, dtype=np.int64).reshape(-1, 2)
+        self.size = np.array(size, dtype=np.int64)
+        self.moves = np.array(MOVES, dtype=np.int64)
+        self.random = (seed if isinstance(seed, np.random.RandomState)
+                       else np.random.RandomState(seed))
+
+    def step(self):
+        # all moves of all agents (N, len(MOVES), 2) and the ones within the field
+        candidates = self.positions[:, np.newaxis, :] + self.moves
+        valid = ((candidates >= 0) & (candidates < self.size)).all(axis=2)
+
+        # the valid move with the highest random score is choosen
+        scores = np.where(valid, self.random.random_sample(valid.shape), -1.0)
+        choice = scores.argmax(axis=1)
+        self.positions = candidates[np.arange(len(choice)), choice]
+        return self.positions
+
+    def stream(self, steps):
+        for _ in range(0, steps):
+            yield self.step()
+
+
+# Main
+# =====
+
+# The agents in `CFG` are rendered in the browser, `agents` is the total number
+# of agents (the additional agents start at random positions).
+def run(wss_=None, steps=None, seed=None, agents=None):
+    steps = int(steps) if steps else 10
+    names = list(CFG['agents'])
+    agents = max(int(agents), len(names)) if agents else len(names)
+
+    random_state = np.random.RandomState(seed)
+    positions = np.stack([random_state.randint(0, TERRAIN_SIZE[0], agents),
+                          random_state.randint(0, TERRAIN_SIZE[1], agents)], axis=1)
+    positions[:len(names)] = [CFG['agents'][name]['pos'] for name in names]
+    walk = RandomWalk(positions, TERRAIN_SIZE, random_state)
+
+    cfg = copy.deepcopy(CFG)
+    if wss_:
+        wss_.send_init(cfg)
+
+    for positions in walk.stream(steps):
+        if wss_:
+            for name, pos in zip(names, positions[:len(names)].tolist()):
+                cfg['agents'][name]['pos'] = tuple(pos)
+            send_update_agents(wss_, cfg)
+
+    return walk.positions
@@ -0,0 +1,344 @@
+# pylint: disable=missing-docstring, invalid-name
+#
+# Rendering in the browser with snapshots and binary deltas
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+# By default the whole terrain is sent as JSON after each step, and the agents
+# one message at a time (see `Environment.step`). `Sea` also sends the status
+# and U/pi of all the agents as text after each action. With large maps and many
+# agents, this is a lot to send and for the browser to parse.
+#
+# Set the option `render_deltas` to send binary frames instead (`wss.send(bytes)`):
+# one keyframe with the full state when the environment is created, then one
+# delta per step with what has changed: the squares of the terrain (squid eaten
+# or respawned etc.), the agents that moved and the needs (status) that changed.
+# A keyframe is sent every `keyframe_interval` steps (100 by default), when a
+# delta would be larger than a keyframe and when an agent gets a new objective
+# or is deleted. The U/pi of the agents are only sent in the keyframes. The
+# other messages (`send_print_message` etc.) are sent as before.
+#
+# The world isn't built after each step then. The squares where things are added
+# or deleted are recorded (`square_changed`, also called by `CompactThings` and
+# `RespawnScheduler`) and only these squares are drawn again.
+#
+# The frames are little endian:
+#
+#```
+# keyframe: type (u8, 1), time (u32), width (u16), height (u16), JSON length (u32),
+#           the terrain (one byte per square), JSON with `cfg` (without the
+#           terrain), `agents` ([name, x, y]), `objectives`, `status` and `texts`
+# delta:    type (u8, 2), time (u32),
+#           number of squares (u32), [index (u32, y * width + x), code (u8)],
+#           number of moves (u16), [agent (u16), x (i16), y (i16)],
+#           number of needs (u16), [agent (u16), objective (u16), value (f32)]
+#```
+#
+# The agents and objectives are indexes in `agents` and `objectives` in the last
+# keyframe. `RenderState` applies the frames, the same as the viewer does.
+#
+# Use the mixin before the environment class:
+#
+#```
+# class Sea(DeltaRender, Respawn, XYEnvironment):
+#     ...
+#```
+#
+
+import json
+import struct
+
+from animatai.agents import Agent
+from gzutils.gzutils import DotDict
+
+
+KEYFRAME = 1
+DELTA = 2
+
+KEYFRAME_INTERVAL = 100
+
+HEADER = struct.Struct('<BI')
+SIZE = struct.Struct('<HHI')
+SQUARES = struct.Struct('<I')
+SQUARE = struct.Struct('<IB')
+COUNT = struct.Struct('<H')
+MOVE = struct.Struct('<Hhh')
+NEED = struct.Struct('<HHf')
+
+# the terrain codes are single characters
+ENCODING = 'latin-1'
+
+
+# Channel
+# =======
+
+# Used as `wss` by the environment. The agents are collected from the `send_*`
+# calls of `XYEnvironment` and the squares from `update_square`, they are sent
+# in the frames after each step (`end_step`). The other `send*` methods are
+# those of `wss`.
+class RenderChannel:
+
+    # `texts` returns the texts to send in the keyframes, {element: text}
+    def __init__(self, wss, keyframe_interval=None, texts=None):
+        self.wss = wss
+        self.keyframe_interval = keyframe_interval or KEYFRAME_INTERVAL
+        self.texts = texts
+
+        self.cfg = None
+        self.width = 0
+        self.height = 0
+        self.terrain = bytearray()
+        self.time = 0
+        self.keyframe_time = 0
+
+        # the current state and the state in the viewer, {name: location} and
+        # {name: {objective: value}}
+        self.names = []
+        self.locations = {}
+        self.sent_locations = {}
+        self.status = {}
+        self.sent_status = {}
+        self.objectives = []
+
+        # the indexes of the agents or objectives have changed
+        self.keyframe_due = False
+
+        # squares changed since the last frame, [(index, code)]
+        self.squares = []
+
+        # {name or objective: index}
+        self.agent_index = {}
+        self.objective_index = {}
+
+    def __getattr__(self, name):
+        return getattr(self.wss, name)
+
+    # Called by `XYEnvironment.__init__`
+    def send_init(self, cfg):
+        self.cfg = cfg
+        rows = cfg['terrain'].split('\n')
+        self.width, self.height = len(rows[0]), len(rows)
+        self.terrain = bytearray(''.join(rows).encode(ENCODING))
+        self.names = list(cfg['agents'])
+        self.agent_index = {name: i for i, name in enumerate(self.names)}
+        self.locations = {name: tuple(agent['pos']) for name, agent in cfg['agents'].items()}
+        self.send_keyframe()
+
+    # Called after each step for the squares where things have been added or deleted
+    def update_square(self, location, code):
+        x, y = location
+        i, code = y * self.width + x, ord(code)
+        if self.terrain[i] != code:
+            self.terrain[i] = code
+            self.squares.append((i, code))
+
+    # Called when an agent has moved and after each step
+    def send_update_agent(self, agent, state):
+        if agent in self.agent_index:
+            self.locations[agent] = tuple(state['pos'])
+
+    def update_status(self, agent, status):
+        if agent not in self.agent_index:
+            return
+        for objective in status:
+            if objective not in self.objective_index:
+                self.objective_index[objective] = len(self.objectives)
+                self.objectives.append(objective)
+                self.keyframe_due = True
+        self.status[agent] = dict(status)
+
+    # Called when an agent has been deleted from the environment
+    def remove_agent(self, agent):
+        if agent not in self.agent_index:
+            return
+        self.names.remove(agent)
+        self.agent_index = {name: i for i, name in enumerate(self.names)}
+        for state in (self.locations, self.sent_locations, self.status, self.sent_status):
+            state.pop(agent, None)
+        self.keyframe_due = True
+
+    def moves(self):
+        return [(self.agent_index[name], location) for name, location in self.locations.items()
+                if self.sent_locations.get(name) != location]
+
+    def needs(self):
+        res = []
+        for name, status in self.status.items():
+            sent = self.sent_status.get(name, {})
+            for objective, value in status.items():
+                if sent.get(objective) != value:
+                    res.append((self.agent_index[name], self.objective_index[objective], value))
+        return res
+
+    # Send the frame of step `time`
+    def end_step(self, time):
+        self.time = time
+        moves, needs = self.moves(), self.needs()
+        size = (SQUARE.size * len(self.squares) + MOVE.size * len(moves) +
+                NEED.size * len(needs))
+        if (self.keyframe_due or time - self.keyframe_time >= self.keyframe_interval or
+                size > len(self.terrain)):
+            self.send_keyframe()
+        else:
+            self.send_delta(moves, needs)
+
+    def send_keyframe(self):
+        cfg = {key: value for key, value in self.cfg.items() if key != 'terrain'}
+        state = {
+            'cfg': cfg,
+            'agents': [[name] + list(self.locations[name]) for name in self.names],
+            'objectives': self.objectives,
+            'status': self.status,
+            'texts': self.texts() if self.texts else {}
+        }
+        data = json.dumps(state).encode('utf-8')
+        self.wss.send(b''.join([HEADER.pack(KEYFRAME, self.time),
+                                SIZE.pack(self.width, self.height, len(data)),
+                                bytes(self.terrain), data]))
+
+        self.keyframe_time = self.time
+        self.squares = []
+        self.sent_locations = dict(self.locations)
+        self.sent_status = {name: dict(status) for name, status in self.status.items()}
+        self.keyframe_due = False
+
+    def send_delta(self, moves, needs):
+        frame = [HEADER.pack(DELTA, self.time), SQUARES.pack(len(self.squares))]
+        frame.extend(SQUARE.pack(i, code) for i, code in self.squares)
+        frame.append(COUNT.pack(len(moves)))
+        frame.extend(MOVE.pack(agent, x, y) for agent, (x, y) in moves)
+        frame.append(COUNT.pack(len(needs)))
+        frame.extend(NEED.pack(*need) for need in needs)
+        self.wss.send(b''.join(frame))
+
+        self.squares = []
+        self.sent_locations = dict(self.locations)
+        for agent, objective, value in needs:
+            self.sent_status.setdefault(self.names[agent], {})[self.objectives[objective]] = value
+
+
+# Viewer
+# ======
+
+# The state of the viewer, updated with the frames in the order they are sent
+class RenderState:
+
+    def __init__(self):
+        self.time = None
+        self.width = 0
+        self.height = 0
+        self.terrain = bytearray()
+        self.cfg = None
+        self.names = []
+        self.locations = {}
+        self.objectives = []
+        self.status = {}
+        self.texts = {}
+
+    def rows(self):
+        terrain = self.terrain.decode(ENCODING)
+        return [terrain[y * self.width:(y + 1) * self.width] for y in range(0, self.height)]
+
+    def apply(self, frame):
+        kind, self.time = HEADER.unpack_from(frame)
+        offset = HEADER.size
+        if kind == KEYFRAME:
+            self.width, self.height, length = SIZE.unpack_from(frame, offset)
+            offset += SIZE.size
+            squares = self.width * self.height
+            self.terrain = bytearray(frame[offset:offset + squares])
+            state = json.loads(frame[offset + squares:offset + squares + length].decode('utf-8'))
+            self.cfg = state['cfg']
+            self.names = [name for name, _, _ in state['agents']]
+            self.locations = {name: (x, y) for name, x, y in state['agents']}
+            self.objectives = state['objectives']
+            self.status = state['status']
+            self.texts = state['texts']
+        elif kind == DELTA:
+            n, = SQUARES.unpack_from(frame, offset)
+            offset += SQUARES.size
+            for i, code in SQUARE.iter_unpack(frame[offset:offset + n * SQUARE.size]):
+                self.terrain[i] = code
+            offset += n * SQUARE.size
+
+            n, = COUNT.unpack_from(frame, offset)
+            offset += COUNT.size
+            for agent, x, y in MOVE.iter_unpack(frame[offset:offset + n * MOVE.size]):
+                self.locations[self.names[agent]] = (x, y)
+            offset += n * MOVE.size
+
+            n, = COUNT.unpack_from(frame, offset)
+            offset += COUNT.size
+            for agent, objective, value in NEED.iter_unpack(frame[offset:offset + n * NEED.size]):
+                self.status.setdefault(self.names[agent], {})[self.objectives[objective]] = value
+        else:
+            raise ValueError('unknown frame type ' + str(kind))
+
+
+# Mixin
+# =====
+
+class DeltaRender:
+
+    def __init__(self, options, *args, **kwargs):
+        self.render = None
+        render = None
+        options = DotDict(options)
+        if options.render_deltas and options.wss:
+            render = RenderChannel(options.wss, options.keyframe_interval, self.render_texts)
+            options = DotDict({**options, 'wss': render})
+
+        # the world is built once, for the keyframe sent by `XYEnvironment.__init__`
+        super().__init__(options, *args, **kwargs)
+        self.render = render
+        if render:
+            self.world = None
+
+        # the squares to draw at the end of the step
+        self.changed = set()
+
+    # The texts sent in the keyframes, {element: text}
+    def render_texts(self):
+        return {}
+
+    def build_world(self):
+        if not self.render:
+            super().build_world()
+
+    # Called when a thing has been added to or deleted from a square
+    def square_changed(self, location):
+        if self.render:
+            self.changed.add(location)
+
+    # Draw all the squares, when all the things have been replaced
+    def redraw(self):
+        if self.render:
+            self.changed.update((x, y) for y in range(0, self.height) for x in range(0, self.width))
+
+    # The code of a square, the same as drawn by `build_world`
+    def square_code(self, location):
+        x, y = location
+        code = self.options.terrain[y][x]
+        for thing in self.list_things_at(location):
+            code = self.class2envcode(thing.__class__) or code
+        return code
+
+    def add_thing(self, thing, location=(1, 1), exclude_duplicate_class_items=False):
+        super().add_thing(thing, location, exclude_duplicate_class_items)
+        self.square_changed(location)
+
+    def delete_thing(self, thing):
+        super().delete_thing(thing)
+        if self.render:
+            self.square_changed(thing.location)
+            if isinstance(thing, Agent):
+                self.render.remove_agent(thing.__name__)
+
+    def step(self, time):
+        super().step(time)
+        if self.render:
+            for location in sorted(self.changed):
+                if 0 <= location[0] < self.width and 0 <= location[1] < self.height:
+                    self.render.update_square(location, self.square_code(location))
+            self.changed = set()
+            self.render.end_step(time)
@@ -0,0 +1,107 @@
+# pylint: disable=missing-docstring, invalid-name, too-few-public-methods
+#
+# Respawn of the exogenous things
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+# `XYEnvironment.exogenous_change` draws a random number each step and when it
+# is below `exogenous_things_prob`, the `exogenous_things` layout is parsed and
+# the things are added one at a time (`add_thing` checks for duplicates among
+# all the things). The cost grows with the size of the map.
+#
+# `RespawnScheduler` parses the layout once into a list of spawn cells, a
+# respawn appends the things directly. The things get the same names and are
+# added in the same order as with `exogenous_change`.
+#
+# By default there is one draw from the `random` module per step, as before, so
+# seeded runs give the same results. Set the option `respawn_seed` to use a
+# separate generator instead: the number of steps between the respawns is
+# geometric and drawn with NumPy for a block of respawns at a time, the steps
+# without a respawn don't draw anything. The respawns are then the same for a
+# seed whatever the agents do.
+#
+# Use the mixin before the environment class:
+#
+#```
+# class Sea(Respawn, XYEnvironment):
+#     ...
+#```
+#
+
+import random
+
+import templates
+
+
+class RespawnScheduler:
+
+    # respawns drawn at a time with `seed`
+    BLOCK = 1024
+
+    # `things` are the spawn cells, [(class, location)]
+    def __init__(self, things, prob, seed=None):
+        self.things = things
+        self.prob = prob or 0.0
+        self.seed = seed
+
+        # the steps done and the steps of the next respawns, with `seed`
+        self.random = None
+        self.time = 0
+        self.upcoming = []
+
+    # Is there a respawn in this step (called once per step)
+    def due(self):
+        if not self.prob:
+            return False
+        if self.seed is None:
+            return random.random() < self.prob
+
+        self.time += 1
+        if not self.upcoming:
+            self.draw()
+        if self.upcoming[-1] == self.time:
+            self.upcoming.pop()
+            return True
+        return False
+
+    # The steps of the next `BLOCK` respawns, the last respawn is the next one
+    def draw(self):
+        import numpy as np # only imported with a seed, for a fast startup
+        if self.random is None:
+            self.random = np.random.RandomState(self.seed)
+        steps = self.time - 1 + np.cumsum(self.random.geometric(min(self.prob, 1.0), self.BLOCK))
+        self.upcoming = steps[::-1].tolist()
+
+    # Add the things to `env`, the same as `env.add_things(exogenous_things)`
+    def spawn(self, env):
+        append = getattr(env, 'append_thing', None)
+        index = getattr(env, 'index_thing', None)
+        changed = getattr(env, 'square_changed', None)
+        for cls, location in self.things:
+            thing = cls(str(env.thing_counter))
+            thing.location = location
+            env.thing_counter += 1
+            if append:
+                append(thing)
+            else:
+                env.things.append(thing)
+                if index:
+                    index(thing)
+            if changed:
+                changed(location)
+
+
+class Respawn:
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        options = self.options
+        things = [(cls, location) for cls, location
+                  in templates.parse(options.exogenous_things, self.ENV_ENCODING)
+                  if self.is_inbounds(location)]
+        self.respawn = RespawnScheduler(things, options.exogenous_things_prob,
+                                        options.respawn_seed)
+
+    def exogenous_change(self):
+        if self.respawn.due():
+            self.respawn.spawn(self)
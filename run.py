@@ -1,15 +1,172 @@
 #!./venv3/bin/python
-# pylint: disable=missing-docstring, exec-used, invalid-name
+# pylint: disable=missing-docstring, invalid-name
+#
+# Run a world from the command line:
+#
+#```
+# ./run.py <world> [steps] [seed] [world specific arguments]
+# ./run.py mom_and_calf 500 1         # 1 trial
+# ./run.py mom_and_calf 500 1 10 4    # 10 trials with 4 workers
+# ./run.py random_walk 1000 1 100000  # 100000 agents
+#```
+#
+# The world is looked up in `worlds.py` and its module is imported when it is run.
+# The time it takes to import the world is written to stderr.
+#
+# Many short runs are faster in batch mode, where the jobs are run in the same
+# process (or pool of processes with `--processes`) and the modules are only
+# imported once. There is one job per line, with the same arguments as above:
+#
+#```
+# ./run.py --batch jobs.txt --processes 4 > results.jsonl
+# echo "grid 100 1" | ./run.py --batch -
+#```
+#
+# One JSON line is written to stdout per job, in the same order as the jobs. The
+# output of the worlds is written to stderr. With `--processes`, the worlds with a
+# pool of their own (`workers` of `mom_and_calf`) run with one worker, the jobs
+# run in daemonic processes that can't have children.
+#
+
+import argparse
+import contextlib
+import inspect
+import json
 import sys
+import time
+
+import worlds
+
+
+# The seed is an int when possible, like in the browser
+def parse_seed(text):
+    if text in (None, 'None'):
+        return None
+    try:
+        return int(text)
+    except ValueError:
+        return text
+
+def parse_arg(text):
+    try:
+        return int(text)
+    except ValueError:
+        return text
+
+# The world specific arguments when there are none, `mom_and_calf` runs one trial
+DEFAULT_ARGS = {'mom_and_calf': [1]}
+
+def world_args(world, args):
+    return list(args) or DEFAULT_ARGS.get(world, [])
+
+def load(world):
+    start = time.perf_counter()
+    run = worlds.load(world)
+    print('run.py: imported {} in {:.1f} ms'.format(world, (time.perf_counter() - start) * 1e3),
+          file=sys.stderr)
+    return run
+
+
+# Batch mode
+# ==========
+
+# A job is a line: <world> [steps] [seed] [world specific arguments]
+def parse_job(line):
+    fields = line.split()
+    if not worlds.is_registered(fields[0]):
+        raise ValueError('unknown world ' + fields[0])
+    return {
+        'world': fields[0],
+        'steps': int(fields[1]) if len(fields) > 1 else 100,
+        'seed': parse_seed(fields[2]) if len(fields) > 2 else None,
+        'args': world_args(fields[0], [parse_arg(field) for field in fields[3:]]),
+    }
+
+def read_jobs(f):
+    jobs = []
+    for line in f:
+        line = line.split('#')[0].strip()
+        if line:
+            jobs.append(line)
+    return jobs
+
+# The part of the result of a world that is written, when there is one
+def result_summary(result):
+    if hasattr(result, 'as_dict'):
+        return result.as_dict()
+    q_agent = getattr(result, 'q_agent', None)
+    if q_agent:
+        return {'iterations': q_agent.iterations}
+    return None
+
+# The jobs in the pool of `run_batch` run in daemonic processes
+def one_worker(run, args):
+    from multiprocessing import current_process
+    call = inspect.signature(run).bind(*args)
+    if call.arguments.get('workers', 1) != 1 and current_process().daemon:
+        print('run.py: running with one worker in a pool of processes', file=sys.stderr)
+        call.arguments['workers'] = 1
+    return call.args, call.kwargs
+
+def run_job(line):
+    res = {'job': line}
+    start = time.perf_counter()
+    try:
+        job = parse_job(line)
+        res.update(job)
+        run = worlds.load(job['world'])
+        args, kwargs = one_worker(run, [None, job['steps'], job['seed']] + job['args'])
+        with contextlib.redirect_stdout(sys.stderr):
+            result = run(*args, **kwargs)
+        res['result'] = result_summary(result)
+    except Exception as e: # pylint: disable=broad-except
+        res['error'] = repr(e)
+    res['seconds'] = time.perf_counter() - start
+    return res
+
+def run_batch(jobs, processes=1, out=None):
+    out = out or sys.stdout
+    if processes > 1 and len(jobs) > 1:
+        from multiprocessing import Pool
+        with Pool(min(processes, len(jobs))) as pool:
+            results = pool.imap(run_job, jobs, chunksize=1)
+            for res in results:
+                print(json.dumps(res), file=out, flush=True)
+    else:
+        for job in jobs:
+            print(json.dumps(run_job(job)), file=out, flush=True)
+
+
+# Main
+# ====
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='./run.py', description='Run a world')
+    parser.add_argument('world', nargs='?', choices=worlds.names())
+    parser.add_argument('steps', nargs='?', type=int, default=100)
+    parser.add_argument('seed', nargs='?', type=parse_seed)
+    parser.add_argument('args', nargs='*', type=parse_arg, metavar='arg',
+                        help='world specific arguments, for instance trials and workers')
+    parser.add_argument('--batch', metavar='FILE',
+                        help='run the jobs in FILE (- for stdin), one per line')
+    parser.add_argument('--processes', type=int, default=1,
+                        help='number of processes in batch mode')
+    args = parser.parse_args(argv)
 
-mod = sys.argv[1]
-num = sys.argv[2] if len(sys.argv) >= 3 else '100'
-seed = sys.argv[3] if len(sys.argv) >= 4 else 'None'
-trials = sys.argv[4] if len(sys.argv) >= 5 else '1'
-s = 'import ' + mod
-s += '\n' + mod + '.run(None, ' + num + ', ' + seed + ', ' + trials + ')'
+    if args.batch:
+        if args.batch == '-':
+            jobs = read_jobs(sys.stdin)
+        else:
+            with open(args.batch) as f:
+                jobs = read_jobs(f)
+        run_batch(jobs, args.processes)
+        return 0
 
+    if not args.world:
+        parser.error('a world or --batch is required')
 
-print('Generated python:\n'+s+'\n')
+    load(args.world)(None, args.steps, args.seed, *world_args(args.world, args.args))
+    return 0
 
-exec(s)
+if __name__ == '__main__':
+    sys.exit(main())
@@ -8,6 +8,12 @@
 from animatai.agents import Thing, Obstacle, Direction, NonSpatial, XYEnvironment
 from gzutils.gzutils import DotDict, Logging
 
+from compact import CompactThings
+from history import RingBuffer
+from render import DeltaRender
+from respawn import Respawn
+from spatial import LocationIndex
+
 
 # Setup constants and logging
 # ===========================
@@ -26,7 +32,26 @@ class Squid(Thing):
 class Song(NonSpatial):
     pass
 
-class Sea(XYEnvironment):
+# The status and U/pi of the agents are published with `show_escaped_text`.
+# This is controlled with the options:
+# * `status_interval` - publish every N steps. When not set, the status is only
+#   published when a viewer is attached (`wss`)
+# * `status_on_change` - only publish when the status or the Q-table has changed
+#
+# Set the option `quiet` to skip the messages about each action in headless runs.
+#
+# The histories are saved in `RingBuffer`s. Set the option `history_window` to
+# keep only the last N steps (including in the history written by `finished`).
+#
+# Seas created from a template (see `templates.py`) have the obstacles in a grid,
+# `obstacles`, that is used for the bump checks. The grid is updated when
+# obstacles are added or deleted.
+#
+# The exogenous squid are added by a `RespawnScheduler`, see `respawn.py`.
+#
+# Set the option `render_deltas` to render in the browser with binary deltas,
+# see `render.py`. The status is then sent in the deltas and U/pi in the keyframes.
+class Sea(DeltaRender, Respawn, XYEnvironment):
 
     # pylint: disable=arguments-differ
 
@@ -34,29 +59,118 @@ class Sea(XYEnvironment):
         self.options = DotDict(options)
         self.options.ENV_ENCODING = [('s', Squid), ('X', Obstacle)]
         self.options.save_history_for = [Squid]
+
+        # set by `WorldTemplate.new`, things are added by `XYEnvironment.__init__`
+        self.obstacles = None
         super().__init__(self.options)
 
+        for cls in self.save_history_for:
+            self.environment_history[cls] = RingBuffer(self.options.history_window, 'l')
+
         self.agent_status = {}
         self.agent_U_and_pi = {}
 
+        # {agent name: (q_agent.iterations, U_and_pi)}
+        self.U_and_pi_cache = {}
+        self.published = {}
+
+    def some_things_at(self, location, tclass=Thing):
+        if tclass is Obstacle and self.obstacles is not None:
+            return location in self.obstacles
+        return super().some_things_at(location, tclass)
+
+    def add_thing(self, thing, location=(1, 1), exclude_duplicate_class_items=False):
+        super().add_thing(thing, location, exclude_duplicate_class_items)
+        self.update_obstacles(thing, location)
+
+    def delete_thing(self, thing):
+        super().delete_thing(thing)
+        self.update_obstacles(thing, thing.location)
+
+    # Mark the square of an obstacle that has been added or deleted in the grid
+    def update_obstacles(self, thing, location):
+        if (self.obstacles is None or not isinstance(thing, Obstacle) or
+                not self.is_inbounds(location)):
+            return
+        if self.obstacle_at(location):
+            self.obstacles.add(location)
+        else:
+            self.obstacles.remove(location)
+
+    # Not with `list_things_at`, the index of `LocationIndex` is updated after `Sea`
+    def obstacle_at(self, location):
+        return any(isinstance(thing, Obstacle) and thing.location == location
+                   for thing in self.things)
+
+    # U/pi is calculated from the Q-table, which is updated once per iteration
+    # of the q_agent. The result is cached until the next iteration.
+    def U_and_pi(self, agent):
+        iterations = agent.q_agent.iterations
+        cached = self.U_and_pi_cache.get(agent.__name__)
+        if cached is None or cached[0] != iterations:
+            cached = (iterations, agent.q_agent.Q_to_U_and_pi())
+            self.U_and_pi_cache[agent.__name__] = cached
+        return cached[1]
+
+    def publish_status(self, agent, time):
+        interval = self.options.status_interval
+        if interval is None and not self.wss:
+            return
+        if interval and time % interval != 0:
+            return
+        if not hasattr(agent, 'status'):
+            return
+
+        if self.render:
+            self.render.update_status(agent.__name__, agent.status)
+            return
+
+        q_agent = getattr(agent, 'q_agent', None)
+        if self.options.status_on_change:
+            state = (dict(agent.status), q_agent.iterations if q_agent else None)
+            if self.published.get(agent.__name__) == state:
+                return
+            self.published[agent.__name__] = state
+
+        self.agent_status[agent.__name__] = agent.status
+        self.show_escaped_text('status', str(self.agent_status))
+        if q_agent:
+            self.agent_U_and_pi[agent.__name__] = self.U_and_pi(agent)
+            self.show_escaped_text('U_and_pi', str(self.agent_U_and_pi))
+
+    def render_texts(self):
+        U_and_pi = {agent.__name__: self.U_and_pi(agent) for agent in self.agents
+                    if getattr(agent, 'q_agent', None)}
+        return {'U_and_pi': str(U_and_pi)} if U_and_pi else {}
+
+    # Set the location directly, without the obstacle check in `move_to`
+    def place(self, thing, location):
+        thing.location = location
+
+    # The status histories of the agents are also saved in ring buffers
+    def save_history(self):
+        window = self.options.history_window
+        for agent in self.agents:
+            histories = getattr(agent, 'status_history', None)
+            if histories and not isinstance(next(iter(histories.values())), RingBuffer):
+                agent.status_history = {objective: RingBuffer(window, 'd', history)
+                                        for objective, history in histories.items()}
+        super().save_history()
+
     # to be used after the __call__ function
     def any_measurement_decreased(self):
-        any_obj = list(self.environment_history)[0]
-        i, res = len(self.environment_history[any_obj]), False
-        if i < 2:
-            return False
+        history = self.environment_history
         for cls in self.save_history_for:
-            res = res or self.environment_history[cls][i] < self.environment_history[cls][i - 1]
-        return res
+            if history[cls].decreased():
+                return True
+        return False
 
     def execute_action(self, agent, action, time):
-        self.show_message((agent.__name__ + ' performing ' + str(action) + ' at location ' +
-                           str(agent.location) + ' and time ' + str(time)))
+        if not self.options.quiet:
+            self.show_message((agent.__name__ + ' performing ' + str(action) + ' at location ' +
+                               str(agent.location) + ' and time ' + str(time)))
 
-        self.agent_status[agent.__name__] = agent.status
-        self.agent_U_and_pi[agent.__name__] = agent.q_agent.Q_to_U_and_pi()
-        self.show_escaped_text('status', str(self.agent_status))
-        self.show_escaped_text('U_and_pi',  str(self.agent_U_and_pi))
+        self.publish_status(agent, time)
 
         def up():
             agent.direction += Direction.L
@@ -71,7 +185,7 @@ class Sea(XYEnvironment):
         def forward():
             agent.bump = self.move_to(agent, agent.direction.move_forward(agent.location))
             # a torus world
-            agent.location = (agent.location[0] % self.width, agent.location[1])
+            self.place(agent, (agent.location[0] % self.width, agent.location[1]))
 
         def eat():
             squid = self.list_things_at(agent.location, Squid)
@@ -99,3 +213,27 @@ class Sea(XYEnvironment):
             forward()
         else:
             l.error('execute_action:unknow action', action, 'for agent', agent, 'at time', time)
+
+
+# Sea with the things indexed by location, see `spatial.py`
+class IndexedSea(LocationIndex, Sea):
+    pass
+
+# Sea with the squid and obstacles in grids instead of objects, see `compact.py`
+class CompactSea(CompactThings, Sea):
+    COMPACT = (Squid, Obstacle)
+
+    def thing_added(self, thing):
+        self.update_obstacles(thing, thing.location)
+
+    def thing_deleted(self, thing):
+        self.update_obstacles(thing, thing.location)
+
+    def obstacle_at(self, location):
+        return self.store.any_at(location, Obstacle) or super().obstacle_at(location)
+
+# The sea for the options `compact_things` and `location_index`
+def sea_class(options):
+    if options.compact_things:
+        return CompactSea
+    return IndexedSea if options.location_index else Sea
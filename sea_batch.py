@@ -0,0 +1,227 @@
+# pylint: disable=missing-docstring, invalid-name
+#
+# A batch of seas simulated with NumPy
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+# `SeaBatch` runs `size` independent copies of the `Sea` world at the same time.
+# The squid are counted in a grid per sea (there can be more than one squid in a
+# square after an exogenous change), the obstacles are in a grid shared by the
+# seas and the locations of the agents are arrays. The rules are the same as in
+# `Sea.execute_action`:
+# * forward - move right, the sea is a torus
+# * up/down - move up/down unless there is an obstacle in the way
+# * eat - remove one squid in the square of the agent
+# * sing - the song is heard by the agents in the next step
+#
+# The steps are done in the same order as `Environment.step`: the programs get
+# the percepts of all agents, then the rewards are calculated and the actions
+# executed one agent at a time. The exogenous squid are added last, with the
+# generator of the batch (`random`) instead of the `random` module.
+#
+# The actions are indexes in `ACTIONS` (`NO_ACTION` for none) in an array with
+# one row per sea and one column per agent. The percepts are also arrays: is
+# there squid near each agent and is the song heard in each sea. The programs of
+# `random_mom_and_calf` for a batch are `mom_program` and `calf_program`:
+#
+#```
+# batch = SeaBatch(OPTIONS, 1000, [mom_start_pos, calf_start_pos], seed=1)
+# for _ in range(0, steps):
+#     squid, song = batch.percepts()
+#     rand = batch.random.random_sample((2, batch.size))
+#     batch.step(np.stack([mom_program(squid[:, 0], song, rand[0]),
+#                          calf_program(squid[:, 1], song, rand[1])], axis=1))
+#```
+#
+# `random_mom_and_calf(size, steps, seed)` does this.
+#
+
+import numpy as np
+
+from animatai.agents import PERCEPTIBLE_DISTANCE, Obstacle
+from gzutils.gzutils import DotDict
+
+from sea import Sea, Squid
+from templates import WorldTemplate
+from random_mom_and_calf_config import mom_start_pos, calf_start_pos, OPTIONS
+
+
+# Actions
+# =======
+
+ACTIONS = ['sing_eat_and_forward', 'eat_and_forward', 'dive_and_forward', 'up_and_forward',
+           'forward']
+SING_EAT_AND_FORWARD, EAT_AND_FORWARD, DIVE_AND_FORWARD, UP_AND_FORWARD, FORWARD = range(0, 5)
+NO_ACTION = -1
+
+# (sing, eat, dy, forward) of each action, the last row is `NO_ACTION`
+RULES = np.array([(1, 1, 0, 1),
+                  (0, 1, 0, 1),
+                  (0, 0, 1, 1),
+                  (0, 0, -1, 1),
+                  (0, 0, 0, 1),
+                  (0, 0, 0, 0)])
+SING, EAT, DY, FORWARD_MOVE = RULES[:, 0] == 1, RULES[:, 1] == 1, RULES[:, 2], RULES[:, 3] == 1
+
+# The rewards of `Sea.calc_performance`, `table[action, squid, objective]` is the
+# reward when there is (1) or isn't (0) squid in the square of the agent. The
+# reward is nan when an action doesn't have a reward for the objective.
+def reward_table(options):
+    objectives = list(options.objectives)
+    table = np.full((len(ACTIONS) + 1, 2, len(objectives)), np.nan)
+    for i, action in enumerate(ACTIONS + [None]):
+        for squid in (0, 1):
+            rewards = {}
+            for rewarded_action, object_and_objectives in options.rewards.items():
+                if action == rewarded_action or rewarded_action is None:
+                    for rewarded_thing, obj_and_reward in object_and_objectives.items():
+                        if rewarded_thing not in (None, Squid):
+                            raise ValueError('only squid can be rewarded in a batch, not ' +
+                                             str(rewarded_thing))
+                        if rewarded_thing is None or squid:
+                            for obj, rew in obj_and_reward.items():
+                                rewards.setdefault(obj, rew)
+            for j, objective in enumerate(objectives):
+                table[i, squid, j] = rewards.get(objective, np.nan)
+    return objectives, table
+
+
+# Batch
+# =====
+
+class SeaBatch:
+
+    # `locations` are the start locations of the agents, the same in all seas
+    def __init__(self, options, size, locations, seed=None):
+        options = DotDict(options)
+        options.wss = None
+        template = WorldTemplate(Sea, options)
+
+        self.size = size
+        self.width, self.height = template.width, template.height
+
+        self.obstacles = np.zeros((self.height, self.width), dtype=bool)
+        squid = np.zeros((self.height, self.width), dtype=np.int32)
+        for cls, (x, y) in template.things:
+            if issubclass(cls, Obstacle):
+                self.obstacles[y, x] = True
+            elif cls is Squid:
+                squid[y, x] += 1
+        self.squid = np.tile(squid, (size, 1, 1))
+
+        self.spawn = np.zeros((self.height, self.width), dtype=np.int32)
+        for cls, (x, y) in template.parse(options.exogenous_things):
+            if cls is Squid:
+                self.spawn[y, x] += 1
+        self.spawn_prob = options.exogenous_things_prob or 0.0
+
+        self.x = np.tile(np.array([x for x, _ in locations]), (size, 1))
+        self.y = np.tile(np.array([y for _, y in locations]), (size, 1))
+        self.bump = np.zeros((size, len(locations)), dtype=bool)
+
+        # is the song heard in this step
+        self.song = np.zeros(size, dtype=bool)
+
+        self.objectives, self.reward_table = reward_table(options)
+        self.rewards = np.zeros((size, len(locations), len(self.objectives)))
+
+        self.rows = np.arange(0, size)
+        self.time = 0
+        self.random = np.random.RandomState(seed)
+
+    # The values in `grid` at the locations, 0 outside the sea
+    def at(self, grid, x, y):
+        inside = (x >= 0) & (x < self.width) & (y >= 0) & (y < self.height)
+        xi, yi = np.clip(x, 0, self.width - 1), np.clip(y, 0, self.height - 1)
+        if grid.ndim == 2:
+            return grid[yi, xi] * inside
+        rows = self.rows if x.ndim == 1 else self.rows[:, None]
+        return grid[rows, yi, xi] * inside
+
+    # (squid near each agent, song heard in each sea), see `XYEnvironment.percept`
+    def percepts(self, radius=PERCEPTIBLE_DISTANCE):
+        squid = np.zeros(self.x.shape, dtype=bool)
+        for dx in range(-radius, radius + 1):
+            for dy in range(-radius, radius + 1):
+                if dx * dx + dy * dy <= radius * radius:
+                    squid |= self.at(self.squid, self.x + dx, self.y + dy) > 0
+        return squid, self.song.copy()
+
+    def step(self, actions):
+        actions = np.asarray(actions)
+        song = np.zeros(self.size, dtype=bool)
+
+        for agent in range(0, self.x.shape[1]):
+            action, x, y = actions[:, agent], self.x[:, agent], self.y[:, agent]
+
+            here = self.at(self.squid, x, y) > 0
+            self.rewards[:, agent] = self.reward_table[action, here.astype(int)]
+
+            song |= SING[action]
+
+            eat = EAT[action] & here
+            self.squid[self.rows[eat], y[eat], x[eat]] -= 1
+
+            y2 = y + DY[action]
+            y = np.where(self.at(self.obstacles, x, y2), y, y2)
+
+            forward = FORWARD_MOVE[action]
+            bump = forward & self.at(self.obstacles, x + 1, y)
+            x = np.where(forward & ~bump, x + 1, x) % self.width
+
+            self.x[:, agent], self.y[:, agent], self.bump[:, agent] = x, y, bump
+
+        self.song = song
+        if self.spawn_prob:
+            spawned = self.random.random_sample(self.size) < self.spawn_prob
+            self.squid[spawned] += self.spawn
+        self.time += 1
+
+    # The number of squid in each sea, like `environment_history[Squid]`
+    def squid_count(self):
+        return self.squid.sum(axis=(1, 2))
+
+    def as_dict(self):
+        return {
+            'size': self.size,
+            'time': self.time,
+            'mean_squid': float(self.squid_count().mean()),
+            'mean_rewards': {objective: self.rewards[:, :, i].mean(axis=0).tolist()
+                             for i, objective in enumerate(self.objectives)},
+        }
+
+
+# Programs
+# ========
+
+# forward, dive or up with the same probability, `rand` in [0, 1)
+def random_action(rand):
+    return np.where(rand < 1/3, DIVE_AND_FORWARD, np.where(rand < 2/3, UP_AND_FORWARD, FORWARD))
+
+# `random_mom_and_calf.mom_program`
+def mom_program(squid, _, rand):
+    return np.where(squid, SING_EAT_AND_FORWARD, random_action(rand))
+
+# `random_mom_and_calf.calf_program`
+def calf_program(squid, song, rand):
+    return np.where(squid, EAT_AND_FORWARD, np.where(song, DIVE_AND_FORWARD, random_action(rand)))
+
+def random_mom_and_calf(size, steps, seed=None, options=None):
+    batch = SeaBatch(options or OPTIONS, size, [mom_start_pos, calf_start_pos], seed)
+    for _ in range(0, steps):
+        squid, song = batch.percepts()
+        rand = batch.random.random_sample((2, size))
+        batch.step(np.stack([mom_program(squid[:, 0], song, rand[0]),
+                             calf_program(squid[:, 1], song, rand[1])], axis=1))
+    return batch
+
+
+# Main
+# =====
+
+# There is no viewer for a batch, `wss` is not used
+def run(_=None, steps=None, seed=None, size=1000):
+    return random_mom_and_calf(int(size), int(steps) if steps else 10, seed)
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,181 @@
+# pylint: disable=missing-docstring, invalid-name
+#
+# Running worlds in worker processes for the websocket server
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+# Each session (a world started by a viewer) runs in its own worker process, so
+# a slow world doesn't stall the others and the server stays responsive. The
+# worker gets a `PipeWss` instead of the server, the messages it sends are
+# forwarded to the real server by a task in the event loop of the server.
+#
+# The server (`wss`) is the same object for all the connections, the viewers are
+# identified with `viewer`, an id of the connection. Starting a world again for
+# the same viewer cancels the running session of that world (the worker process
+# is terminated). The sessions started without a viewer (the server in animatai
+# doesn't know the connections) are those of one viewer, `None`. Used in
+# `config.py.template`:
+#
+#```
+# POOL = sessions.WorkerPool(max_workers=4)
+#
+# def handler(wss_, world, steps, seed, viewer=None):
+#     POOL.start(wss_, world, steps, seed, viewer)
+#```
+#
+
+import asyncio
+import multiprocessing
+
+from gzutils.gzutils import Logging
+
+import worlds
+
+
+# Setup logging
+# =============
+
+DEBUG_MODE = True
+l = Logging('sessions', DEBUG_MODE)
+
+# seconds between the checks for messages from the workers
+POLL_INTERVAL = 0.01
+
+
+# Worker
+# ======
+
+# Sends the calls of the `send*` methods of the server through a pipe
+class PipeWss:
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __getattr__(self, name):
+        if not name.startswith('send'):
+            raise AttributeError(name)
+
+        def send(*args):
+            self.conn.send((name, args))
+        return send
+
+def work(conn, world, steps, seed):
+    try:
+        worlds.run(world, PipeWss(conn), steps, seed)
+        conn.send(('done', ()))
+    except BrokenPipeError:
+        pass # the session was cancelled
+    except Exception as e: # pylint: disable=broad-except
+        conn.send(('error', (world + ': ' + repr(e),)))
+    finally:
+        conn.close()
+
+
+# Pool
+# ====
+
+class Session:
+
+    def __init__(self, wss, world, viewer=None):
+        self.wss = wss
+        self.world = world
+        self.viewer = viewer
+        self.process = None
+        self.conn = None
+        self.task = None
+
+    # The worker is joined in a thread, not to block the event loop
+    async def stop(self):
+        if self.process:
+            if self.process.is_alive():
+                self.process.terminate()
+            await asyncio.get_event_loop().run_in_executor(None, self.process.join)
+        if self.conn:
+            self.conn.close()
+
+class WorkerPool:
+
+    # At most `max_workers` sessions run at the same time, the others wait
+    def __init__(self, max_workers=4):
+        self.max_workers = max_workers
+        self.running = 0
+        self.waiting = []
+
+        # {(viewer, world): Session}
+        self.sessions = {}
+
+    # Start `world` for `viewer` in a worker process, the messages are sent to `wss`.
+    # Returns the task that runs the session, or None when the world isn't registered
+    def start(self, wss, world, steps=None, seed=None, viewer=None):
+        # pylint: disable=too-many-arguments
+        if not worlds.is_registered(world):
+            wss.send_print_message(('unknown world &quot;' + world +
+                                    '&quot; with param &quot;' + str(steps) + '&quot;'))
+            return None
+
+        self.cancel(viewer, world)
+        session = Session(wss, world, viewer)
+        self.sessions[viewer, world] = session
+        session.task = asyncio.ensure_future(self.run_session(session, steps, seed))
+        return session.task
+
+    # Cancel the sessions of `viewer`, all of them or the one of `world`
+    def cancel(self, viewer, world=None):
+        for key, session in list(self.sessions.items()):
+            if key[0] == viewer and world in (None, session.world):
+                del self.sessions[key]
+                session.task.cancel()
+
+    def cancel_all(self):
+        for viewer, _ in list(self.sessions):
+            self.cancel(viewer)
+
+    async def acquire(self):
+        while self.running >= self.max_workers:
+            future = asyncio.get_event_loop().create_future()
+            self.waiting.append(future)
+            await future
+        self.running += 1
+
+    def release(self):
+        self.running -= 1
+        while self.waiting:
+            future = self.waiting.pop(0)
+            if not future.done():
+                future.set_result(None)
+                break
+
+    async def run_session(self, session, steps, seed):
+        await self.acquire()
+        try:
+            session.conn, sender = multiprocessing.Pipe(duplex=False)
+            session.process = multiprocessing.Process(target=work, daemon=True,
+                                                      args=(sender, session.world, steps, seed))
+            session.process.start()
+            sender.close()
+            await self.forward(session)
+            session.process.join()
+        finally:
+            await session.stop()
+            self.release()
+            key = (session.viewer, session.world)
+            if self.sessions.get(key) is session:
+                del self.sessions[key]
+
+    # Forward the messages from the worker to the server until the world is done
+    async def forward(self, session):
+        conn, wss = session.conn, session.wss
+        while True:
+            try:
+                while conn.poll():
+                    name, args = conn.recv()
+                    if name == 'done':
+                        return
+                    if name == 'error':
+                        l.error('forward:', *args)
+                        wss.send_print_message(*args)
+                        return
+                    getattr(wss, name)(*args)
+            except EOFError:
+                return # the worker has stopped
+            await asyncio.sleep(POLL_INTERVAL)
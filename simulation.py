@@ -0,0 +1,81 @@
+# pylint: disable=missing-docstring, invalid-name
+#
+# Running the worlds step by step
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+# The `run` function of a world is built from a generator, `simulation`, that
+# sets up the world and yields after each step. `complete` runs it to the end.
+# `complete_async` does the same in a coroutine and gives control back to the
+# event loop after each step, so that a websocket server can serve other
+# clients while a world is running:
+#
+#```
+# def simulation(wss=None, steps=None, seed=None):
+#     env = ...
+#     yield from iter_steps(env, steps)
+#     return result
+#
+# def run(wss=None, steps=None, seed=None):
+#     return complete(simulation(wss, steps, seed))
+#
+# async def run_async(wss=None, steps=None, seed=None):
+#     return await complete_async(simulation(wss, steps, seed))
+#```
+#
+# `asyncio` is only imported when `complete_async` is used, it takes a while to
+# import.
+#
+# The worlds use the global `random` generator, worlds that run concurrently in
+# the same process will therefore not give the same results as when they run one
+# at a time with the same seed. Each run gets its own options (`run_options`),
+# so the viewers and the agents shown in them are not mixed up.
+#
+
+import copy
+
+from gzutils.gzutils import DotDict, get_output_dir
+
+
+# The output directory (for `history.csv` etc.) is created when the first
+# world is run instead of when the module is imported
+def output_path(options, file):
+    if not options.output_path:
+        options.output_path = get_output_dir(file=file)
+    return options.output_path
+
+# The options of one run, with the viewer `wss`. The config of the viewer (with
+# the positions of the agents) is updated during the run and is copied.
+def run_options(options, wss):
+    options = DotDict(options)
+    options.wss = wss
+    options.wss_cfg = copy.deepcopy(options.wss_cfg)
+    return options
+
+# Same as `Environment.run`, yields the number of steps done after each step
+def iter_steps(env, steps, start=0):
+    time = start
+    while time < steps and not env.is_done():
+        env.step(time)
+        time += 1
+        yield time
+
+    env.finished()
+
+# Run a simulation to the end and return its result
+def complete(simulation):
+    while True:
+        try:
+            next(simulation)
+        except StopIteration as stop:
+            return stop.value
+
+# `delay` is the number of seconds to wait after each step
+async def complete_async(simulation, delay=0):
+    import asyncio
+    while True:
+        try:
+            next(simulation)
+        except StopIteration as stop:
+            return stop.value
+        await asyncio.sleep(delay)
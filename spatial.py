@@ -0,0 +1,115 @@
+# pylint: disable=missing-docstring, invalid-name, too-few-public-methods
+#
+# Location index for the example environments
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+# `XYEnvironment.list_things_at` scans all things in the environment. The
+# `LocationIndex` mixin keeps a dict with the things at each location, divided in
+# one bucket per class: `{location: {class: [things]}}`. The index is updated in
+# `add_thing`, `delete_thing`, `move_to` and `place`. Environments that set the
+# location of a thing directly must use `place` instead.
+#
+# Use the mixin before the environment class:
+#
+#```
+# class IndexedSea(LocationIndex, Sea):
+#     pass
+#```
+#
+
+from animatai.agents import PERCEPTIBLE_DISTANCE, Thing
+
+
+class LocationIndex:
+
+    def __init__(self, *args, **kwargs):
+        self.index = {}
+
+        # the things at a location are returned in the same order as in
+        # `self.things`: {id(thing): sequence no}
+        self.sequence = {}
+        self.counter = 0
+
+        super().__init__(*args, **kwargs)
+
+    def index_thing(self, thing):
+        self.sequence[id(thing)] = self.counter
+        self.counter += 1
+        buckets = self.index.setdefault(thing.location, {})
+        buckets.setdefault(thing.__class__, []).append(thing)
+
+    def unindex_thing(self, thing, location):
+        buckets = self.index.get(location)
+        bucket = buckets and buckets.get(thing.__class__)
+        if not bucket or thing not in bucket:
+            return
+        bucket.remove(thing)
+        if not bucket:
+            del buckets[thing.__class__]
+            if not buckets:
+                del self.index[location]
+
+    # Rebuild the index from `self.things`
+    def rebuild_index(self):
+        self.index, self.sequence, self.counter = {}, {}, 0
+        for thing in self.things:
+            self.index_thing(thing)
+
+    def add_thing(self, thing, location=(1, 1), exclude_duplicate_class_items=False):
+        n = len(self.things)
+        super().add_thing(thing, location, exclude_duplicate_class_items)
+        if len(self.things) > n:
+            self.index_thing(self.things[-1])
+
+    def delete_thing(self, thing):
+        n = len(self.things)
+        super().delete_thing(thing)
+        if len(self.things) < n:
+            self.unindex_thing(thing, thing.location)
+            self.sequence.pop(id(thing), None)
+
+    def move_to(self, thing, destination):
+        location = thing.location
+        bump = super().move_to(thing, destination)
+        if thing.location != location:
+            self.move_in_index(thing, location)
+        return bump
+
+    # Set the location directly, without the obstacle check in `move_to`
+    def place(self, thing, location):
+        old_location = thing.location
+        thing.location = location
+        self.move_in_index(thing, old_location)
+
+    def move_in_index(self, thing, old_location):
+        sequence = self.sequence.get(id(thing))
+        self.unindex_thing(thing, old_location)
+        self.index_thing(thing)
+        if sequence is not None:
+            self.sequence[id(thing)] = sequence
+
+    def list_things_at(self, location, tclass=Thing):
+        buckets = self.index.get(location)
+        if not buckets:
+            return []
+        things = [thing for cls, bucket in buckets.items() if issubclass(cls, tclass)
+                  for thing in bucket]
+        if len(things) > 1:
+            sequence = self.sequence
+            things.sort(key=lambda thing: sequence.get(id(thing), 0))
+        return things
+
+    def some_things_at(self, location, tclass=Thing):
+        buckets = self.index.get(location)
+        if not buckets:
+            return False
+        return any(bucket for cls, bucket in buckets.items() if issubclass(cls, tclass))
+
+    # Only perceptions at the location of the agent are looked up in the index
+    def things_near(self, location, radius=None):
+        if radius is None:
+            radius = PERCEPTIBLE_DISTANCE
+        if radius == 0:
+            return [(thing, 0) for thing in self.list_things_at(location)]
+        return super().things_near(location, radius)
@@ -0,0 +1,59 @@
+# pylint: disable=missing-docstring, invalid-name
+#
+# Online statistics
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+# Mean, standard deviation and correlation that are updated one value at a time
+# (Welford's algorithm). The memory used is the same for any number of values.
+#
+#```
+# ages = RunningStats()
+# for age in trial_ages:
+#     ages.add(age)
+# ages.mean, ages.stdev()
+#```
+#
+
+import math
+
+
+class RunningStats:
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0 # sum of squared differences from the mean
+
+    def add(self, x):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    # sample variance, like `statistics.variance`
+    def variance(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else math.nan
+
+    def stdev(self):
+        return math.sqrt(self.variance())
+
+
+# Pearson correlation of pairs of values, like `numpy.corrcoef(xs, ys)[0, 1]`
+class RunningCorrelation:
+
+    def __init__(self):
+        self.x = RunningStats()
+        self.y = RunningStats()
+        self.c = 0.0 # sum of the products of the differences from the means
+
+    def add(self, x, y):
+        dx = x - self.x.mean
+        self.x.add(x)
+        self.y.add(y)
+        self.c += dx * (y - self.y.mean)
+
+    def correlation(self):
+        if self.x.m2 == 0 or self.y.m2 == 0:
+            return math.nan
+        return self.c / math.sqrt(self.x.m2 * self.y.m2)
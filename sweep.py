@@ -0,0 +1,185 @@
+# pylint: disable=missing-docstring, invalid-name
+#
+# Hyperparameter sweeps of the Q-learning settings
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+# Runs `mom_and_calf.run_trial` or `grid.run` once for each combination of the
+# Q-learning settings (see `learning.py`) and seeds, spread over a pool of
+# processes. One JSON line is written per configuration with the ages
+# (iterations), the final U of each agent and the wall time. Configurations that
+# are already in the results file are skipped, so an interrupted sweep continues
+# where it stopped when it is started again with the same arguments.
+#
+#```
+# python sweep.py mom_and_calf --steps 500 --seeds 1 2 3 --workers 4 \
+#                 --set epsilon=0.1,0.2,0.3 --set alpha=30,60 --output sweep.jsonl
+#```
+#
+# Use `--samples N` to run a random sample of N configurations of the grid.
+#
+
+import argparse
+import importlib
+import itertools
+import json
+import os
+import random
+import sys
+import time
+
+from multiprocessing import Pool
+
+import learning
+
+
+WORLDS = ['mom_and_calf', 'grid']
+
+
+# Configurations
+# ==============
+
+# grid: {setting: [values]}
+def configurations(world, steps, seeds, grid, samples=None, sample_seed=None):
+    names = sorted(grid)
+    params = [dict(zip(names, values)) for values in
+              itertools.product(*[grid[name] for name in names])]
+    if samples is not None and samples < len(params):
+        params = random.Random(sample_seed).sample(params, samples)
+
+    return [{'world': world, 'steps': steps, 'seed': seed, 'q_learning': p}
+            for p in params for seed in seeds]
+
+def config_key(config):
+    return json.dumps(config, sort_keys=True)
+
+def finished_configs(path):
+    if not os.path.exists(path):
+        return set()
+
+    keys = set()
+    with open(path) as f:
+        for line in f:
+            try:
+                keys.add(config_key(json.loads(line)['config']))
+            except (ValueError, KeyError):
+                pass # a line that was cut when the sweep was interrupted
+    return keys
+
+# Remove the line that was cut when the sweep was interrupted, the next rows are
+# appended after the last complete line
+def drop_cut_line(path, block=4096):
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb+') as f:
+        end = f.seek(0, os.SEEK_END)
+        pos = end
+        while pos > 0:
+            start = max(pos - block, 0)
+            f.seek(start)
+            i = f.read(pos - start).rfind(b'\n')
+            if i >= 0:
+                pos = start + i + 1
+                break
+            pos = start
+        if pos < end:
+            f.truncate(pos)
+
+
+# Runs
+# ====
+
+def final_U(U_and_pi):
+    return {objective: U for objective, (U, _) in U_and_pi.items()}
+
+def run_world(module, config):
+    steps, seed = config['steps'], config['seed']
+    if config['world'] == 'mom_and_calf':
+        return module.run_trial(None, steps, seed)
+
+    q_agent = module.run(None, steps, seed).q_agent
+    return [{'name': 'grid_agent', 'iterations': q_agent.iterations,
+             'U_and_pi': q_agent.Q_to_U_and_pi()}]
+
+def run_config(config):
+    module = importlib.import_module(config['world'])
+    options = module.OPTIONS
+    saved = (options.q_learning, options.quiet)
+    options.q_learning, options.quiet = config['q_learning'], True
+
+    start = time.perf_counter()
+    try:
+        agents = run_world(module, config)
+    finally:
+        options.q_learning, options.quiet = saved
+    seconds = time.perf_counter() - start
+
+    return {
+        'config': config,
+        'ages': {agent['name']: agent['iterations'] for agent in agents},
+        'U': {agent['name']: final_U(agent['U_and_pi']) for agent in agents},
+        'seconds': seconds,
+    }
+
+# The results are appended to `output` as they finish (in any order)
+def sweep(configs, output, workers=1):
+    done = finished_configs(output)
+    todo = [config for config in configs if config_key(config) not in done]
+
+    drop_cut_line(output)
+    with open(output, 'a') as f:
+        def save(row):
+            print(json.dumps(row, sort_keys=True), file=f, flush=True)
+
+        if workers > 1 and len(todo) > 1:
+            with Pool(min(workers, len(todo))) as pool:
+                for row in pool.imap_unordered(run_config, todo):
+                    save(row)
+        else:
+            for config in todo:
+                save(run_config(config))
+
+    return len(configs) - len(todo), len(todo)
+
+
+# Main
+# =====
+
+# 'epsilon=0.1,0.2' -> ('epsilon', [0.1, 0.2])
+def parse_setting(text):
+    name, _, values = text.partition('=')
+    if name not in learning.DEFAULTS or not values:
+        raise argparse.ArgumentTypeError('expected <setting>=<value>,... with a setting in ' +
+                                         ', '.join(sorted(learning.DEFAULTS)))
+    try:
+        return name, [json.loads(value) for value in values.split(',')]
+    except ValueError:
+        raise argparse.ArgumentTypeError('the values must be numbers: ' + values)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python sweep.py',
+                                     description='Sweep the Q-learning settings of a world')
+    parser.add_argument('world', choices=WORLDS)
+    parser.add_argument('--steps', type=int, default=500)
+    parser.add_argument('--seeds', type=int, nargs='+', default=[1])
+    defaults = ', '.join('{}={}'.format(*item) for item in sorted(learning.DEFAULTS.items()))
+    parser.add_argument('--set', type=parse_setting, action='append', default=[],
+                        dest='settings', metavar='SETTING=VALUES',
+                        help='values of a setting, for instance epsilon=0.1,0.2 (defaults: ' +
+                        defaults + ')')
+    parser.add_argument('--samples', type=int,
+                        help='run a random sample of this many combinations of the settings')
+    parser.add_argument('--sample-seed', type=int, default=1)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--output', default='sweep.jsonl')
+    args = parser.parse_args(argv)
+
+    configs = configurations(args.world, args.steps, args.seeds, dict(args.settings),
+                             args.samples, args.sample_seed)
+    skipped, ran = sweep(configs, args.output, args.workers)
+    print('sweep: ran', ran, 'configurations, skipped', skipped, 'finished ones, results in',
+          args.output, file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,130 @@
+# pylint: disable=missing-docstring, invalid-name, too-few-public-methods
+#
+# World templates
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+# `XYEnvironment` parses the `things` layout in the options and adds the things
+# one at a time (with a check for duplicates and a log message per thing) each
+# time an environment is created. A `WorldTemplate` parses the layout once, new
+# environments are then stamped out from it. The things get the same names,
+# locations and order as when the layout is parsed by the environment.
+#
+# The obstacles are also saved in a grid with one byte per square,
+# `env.obstacles`, that environments like `Sea` use to check for bumps. Each
+# environment gets a copy of the grid of the template, and keeps it up to date
+# when obstacles are added or deleted.
+#
+#```
+# sea = templates.new_env(Sea, options)
+#```
+#
+
+from animatai.agents import Obstacle
+
+
+# [(class, location)] of the things in a layout, in the order they are added by
+# `XYEnvironment.add_things`. `encoding` is the `ENV_ENCODING` of the environment.
+def parse(rows, encoding):
+    classes = {}
+    for code, cls in reversed(encoding):
+        classes[code] = cls
+
+    things = []
+    for y, row in enumerate(rows or []):
+        for x, code in enumerate(row):
+            if code in classes:
+                things.append((classes[code], (x, y)))
+    return things
+
+
+class ObstacleGrid:
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.grid = bytearray(width * height)
+
+    def add(self, location):
+        x, y = location
+        self.grid[y * self.width + x] = 1
+
+    def remove(self, location):
+        x, y = location
+        self.grid[y * self.width + x] = 0
+
+    def copy(self):
+        obstacles = ObstacleGrid(self.width, self.height)
+        obstacles.grid[:] = self.grid
+        return obstacles
+
+    def __contains__(self, location):
+        x, y = location
+        return 0 <= x < self.width and 0 <= y < self.height and self.grid[y * self.width + x] == 1
+
+
+class WorldTemplate:
+
+    def __init__(self, env_class, options):
+        self.env_class = env_class
+
+        # an empty environment, to get the size and the encoding of the things
+        env = self.empty_env(options)
+        self.width, self.height = env.width, env.height
+
+        self.encoding = env.ENV_ENCODING
+
+        # [(class, location)] in the order they are added by `add_things`
+        self.things = self.parse(options.things)
+        self.obstacles = ObstacleGrid(env.width, env.height)
+        for cls, location in self.things:
+            if issubclass(cls, Obstacle):
+                self.obstacles.add(location)
+
+    # The things in a layout (like `things` and `exogenous_things` in the options)
+    def parse(self, rows):
+        return parse(rows, self.encoding)
+
+    def empty_env(self, options):
+        things, wss = options.things, options.wss
+        options.things, options.wss = None, None
+        try:
+            env = self.env_class(options)
+        finally:
+            options.things, options.wss = things, wss
+        env.options.things = things
+        return env
+
+    # A new environment with the things in the template, `options` are the
+    # options of the environment (with the same layout as the template)
+    def new(self, options):
+        # the environment sends the world to the viewer when it is created
+        if options.wss:
+            return self.env_class(options)
+
+        # environments that don't keep all things in `env.things` have `append_thing`
+        env = self.empty_env(options)
+        append = getattr(env, 'append_thing', env.things.append)
+        for i, (cls, location) in enumerate(self.things):
+            thing = cls(str(i))
+            thing.location = location
+            append(thing)
+        env.thing_counter = len(self.things)
+        env.obstacles = self.obstacles.copy()
+
+        if hasattr(env, 'rebuild_index'):
+            env.rebuild_index()
+        return env
+
+
+# {(env class, things, terrain, width, height): WorldTemplate}
+TEMPLATES = {}
+
+# Create an environment, the layout is parsed the first time it is used (for
+# each size, the grid of obstacles has the size of the environment)
+def new_env(env_class, options):
+    key = (env_class, tuple(options.things or ()), tuple(options.terrain or ()),
+           options.width, options.height)
+    if key not in TEMPLATES:
+        TEMPLATES[key] = WorldTemplate(env_class, options)
+    return TEMPLATES[key].new(options)
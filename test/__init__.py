@@ -0,0 +1,60 @@
+# pylint: disable=missing-docstring, invalid-name
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+# Helpers shared by the tests
+#
+
+import os
+import tempfile
+
+from sea import Squid
+
+
+# The worlds write `history.csv` etc. in `output_path` (`output/<timestamp>` by
+# default). In the tests, the options point to a temporary folder instead, from
+# `setUp` until `cleanup` is called in `tearDown`.
+class TemporaryOutput:
+
+    def __init__(self, *options):
+        self.dir = tempfile.TemporaryDirectory()
+        self.options = options
+        self.saved = [opts.output_path for opts in options]
+
+        # in a subfolder, the other trials of `mom_and_calf` are saved next to it
+        path = os.path.join(self.dir.name, 'output')
+        os.makedirs(path)
+        for opts in options:
+            opts.output_path = path
+
+    def cleanup(self):
+        for opts, path in zip(self.options, self.saved):
+            opts.output_path = path
+        self.dir.cleanup()
+
+
+# A sea with a mother and a calf lane, used by the tests of `Sea` and the seas
+# built on it
+LANE = ('XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX\n' +
+        '                                                  \n' +
+        '     ssss                          ssss           \n')
+
+# the mother and calf have separate and identical lanes
+SEA_THINGS = LANE + LANE + 'XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX'
+
+SEA_OPTIONS = {
+    'things': SEA_THINGS.split('\n'),
+    'width': 50,
+    'height': 7,
+    'agents': {
+        'cachelot': {
+            'sensors': [None, Squid],
+            'motors': [('eat_and_forward', ['eat', 'forward']),
+                       ('forward', ['forward']),
+                       ('dive_and_forward', ['down', 'forward']),
+                       ('up_and_forward', ['up', 'forward']),
+                       ('sing', ['sing'])
+                      ],
+        }
+    },
+}
@@ -0,0 +1,71 @@
+# pylint: disable=missing-docstring, global-statement, invalid-name
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+
+
+# Imports
+# ======
+
+import unittest
+
+from animatai.agents import Agent
+from gzutils.gzutils import Logging
+
+from blind_dog import Dirt, Food, IndexedPark, Park, Water
+
+
+# Setup logging
+# =============
+
+DEBUG_MODE = True
+l = Logging('test_blind_dog', DEBUG_MODE)
+
+
+# Unit tests
+# ==========
+
+class TestBlindDog(unittest.TestCase):
+
+    def setUp(self):
+        l.info('Testing blind dog...')
+
+    def test_counts(self):
+        l.info('test_counts')
+
+        for cls in (Park, IndexedPark):
+            park = cls({'terrain': ['G'] * 4})
+            park.add_thing(Agent(None, 'fido'), (0, 0))
+            self.assertEqual(park.counts, {Food: 0, Water: 0})
+            self.assertTrue(park.is_done())
+
+            food, water = Food('dogfood'), Water('water')
+            park.add_thing(food, (0, 1))
+            park.add_thing(Food('more dogfood'), (0, 2))
+            park.add_thing(water, (0, 3))
+            park.add_thing(Dirt('dirt'), (0, 3))
+            self.assertEqual(park.counts, {Food: 2, Water: 1})
+
+            # things that aren't added are not counted
+            park.add_thing(Food('outside'), (1, 0))
+            park.add_thing(Water('duplicate'), (0, 3), exclude_duplicate_class_items=True)
+            self.assertEqual(park.counts, {Food: 2, Water: 1})
+
+            park.delete_thing(food)
+            park.delete_thing(water)
+            self.assertEqual(park.counts, {Food: 1, Water: 0})
+            self.assertFalse(park.is_done())
+
+            park.delete_thing(park.list_things_at((0, 2), Food)[0])
+            self.assertEqual(park.counts, {Food: 0, Water: 0})
+            self.assertTrue(park.is_done())
+
+    def tearDown(self):
+        l.info('...done with test_blind_dog.')
+
+
+# Main
+# ====
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+# pylint: disable=missing-docstring, global-statement, invalid-name
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+
+
+# Imports
+# ======
+
+import os
+import tempfile
+import unittest
+
+from gzutils.gzutils import Logging
+
+import grid
+import mom_and_calf
+from test import TemporaryOutput
+
+
+# Setup logging
+# =============
+
+DEBUG_MODE = True
+l = Logging('test_checkpoint', DEBUG_MODE)
+
+
+# Unit tests
+# ==========
+
+class TestCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        l.info('Testing checkpoint...')
+        self.output = TemporaryOutput(mom_and_calf.OPTIONS, grid.OPTIONS)
+        self.dir = tempfile.TemporaryDirectory()
+
+    def test_resume_trial(self):
+        l.info('test_resume_trial')
+
+        path = os.path.join(self.dir.name, 'trial.ckpt.gz')
+        expected = mom_and_calf.run_trial(None, 60, 1)
+
+        mom_and_calf.run_trial(None, 30, 1, path, 10)
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(mom_and_calf.run_trial(None, 60, 1, path, 10, resume=True), expected)
+
+    def test_resume_grid(self):
+        l.info('test_resume_grid')
+
+        path = os.path.join(self.dir.name, 'grid.ckpt.gz')
+        expected = grid.run(None, 60, 1).q_agent
+
+        grid.run(None, 25, 1, path, 10)
+        q_agent = grid.run(None, 60, 1, path, 10, resume=True).q_agent
+        self.assertEqual(q_agent.iterations, expected.iterations)
+        self.assertEqual(q_agent.Q, expected.Q)
+        self.assertEqual(q_agent.Nsa, expected.Nsa)
+
+    def test_resume_without_checkpoint(self):
+        l.info('test_resume_without_checkpoint')
+
+        path = os.path.join(self.dir.name, 'missing.ckpt.gz')
+        self.assertEqual(mom_and_calf.run_trial(None, 20, 2, path, resume=True),
+                         mom_and_calf.run_trial(None, 20, 2))
+
+    def test_resume_without_path(self):
+        l.info('test_resume_without_path')
+
+        self.assertEqual(mom_and_calf.run_trial(None, 20, 2, resume=True),
+                         mom_and_calf.run_trial(None, 20, 2))
+        self.assertEqual(grid.run(None, 20, 1, resume=True).q_agent.Q,
+                         grid.run(None, 20, 1).q_agent.Q)
+
+    def tearDown(self):
+        self.output.cleanup()
+        self.dir.cleanup()
+        l.info('...done with test_checkpoint.')
+
+
+# Main
+# ====
+
+if __name__ == '__main__':
+    unittest.main()
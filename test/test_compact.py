@@ -0,0 +1,120 @@
+# pylint: disable=missing-docstring, global-statement, invalid-name
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+
+
+# Imports
+# ======
+
+import os
+import tempfile
+import unittest
+
+from animatai.agents import Agent, Obstacle
+from gzutils.gzutils import DotDict, Logging
+
+import grid
+import templates
+from blind_dog import CompactPark, Food, Water
+from sea import CompactSea, Sea, Squid
+from test import SEA_OPTIONS, TemporaryOutput
+
+
+# Setup logging
+# =============
+
+DEBUG_MODE = True
+l = Logging('test_compact', DEBUG_MODE)
+
+
+# Unit tests
+# ==========
+
+def things_at(env, location):
+    return sorted((type(thing).__name__, thing.location) for thing in env.list_things_at(location))
+
+class TestCompact(unittest.TestCase):
+
+    def setUp(self):
+        l.info('Testing compact...')
+        self.output = TemporaryOutput(grid.OPTIONS)
+
+    def test_same_things(self):
+        l.info('test_same_things')
+
+        sea = Sea(SEA_OPTIONS)
+        stamped = templates.new_env(CompactSea, DotDict(SEA_OPTIONS))
+        for compact in (CompactSea(SEA_OPTIONS), stamped):
+            self.assertEqual(compact.things, [])
+            self.assertEqual(compact.thing_counter, sea.thing_counter)
+            for x in range(0, 50):
+                for y in range(0, 7):
+                    self.assertEqual(things_at(compact, (x, y)), things_at(sea, (x, y)))
+                    self.assertEqual(compact.some_things_at((x, y), Obstacle),
+                                     sea.some_things_at((x, y), Obstacle))
+            self.assertEqual(len(compact.list_things(Squid)), len(sea.list_things(Squid)))
+            self.assertEqual(compact.count_things(Obstacle), len(sea.list_things(Obstacle)))
+            self.assertEqual(compact.list_things_at((5, 2))[0].__name__, str(2 * 50 + 5))
+
+    def test_moving_cachalot(self):
+        l.info('test_moving_cachalot')
+
+        e = CompactSea({**SEA_OPTIONS, 'history_window': 3})
+        a = Agent(None, 'cachelot')
+        e.add_thing(a, (4, 2))
+        self.assertEqual(e.things, [a])
+
+        for time in range(0, 6):
+            e.save_history()
+            self.assertEqual(len([t for t, _ in e.things_near(a.location) if t is not a]),
+                             1 if 5 <= a.location[0] <= 8 else 0)
+            e.execute_action(a, 'eat_and_forward', time)
+        self.assertEqual(list(e.environment_history[Squid]), [14, 13, 12])
+        self.assertEqual(a.location, (10, 2))
+
+        e.execute_action(a, 'dive_and_forward', 6)
+        self.assertEqual(a.location, (11, 2))
+        self.assertTrue(e.any_measurement_decreased())
+
+    def test_park_counts(self):
+        l.info('test_park_counts')
+
+        park = CompactPark({'terrain': ['G'] * 3})
+        park.add_thing(Agent(None, 'fido'), (0, 0))
+        park.add_thing(Food('dogfood'), (0, 1))
+        park.add_thing(Water('water'), (0, 2))
+        self.assertFalse(park.is_done())
+        park.delete_thing(park.list_things_at((0, 1), Food)[0])
+        park.delete_thing(park.list_things_at((0, 2), Water)[0])
+        self.assertEqual(park.counts, {Food: 0, Water: 0})
+        self.assertTrue(park.is_done())
+
+    def test_grid(self):
+        l.info('test_grid')
+
+        expected = grid.run(None, 100, 1).q_agent
+        grid.OPTIONS.compact_things = True
+        try:
+            q_agent = grid.run(None, 100, 1).q_agent
+            self.assertEqual(q_agent.Q, expected.Q)
+            self.assertEqual(q_agent.Q_to_U_and_pi(), expected.Q_to_U_and_pi())
+
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, 'grid.ckpt.gz')
+                grid.run(None, 40, 1, path, 20)
+                q_agent = grid.run(None, 100, 1, path, 20, resume=True).q_agent
+                self.assertEqual(q_agent.Q, expected.Q)
+        finally:
+            grid.OPTIONS.compact_things = None
+
+    def tearDown(self):
+        self.output.cleanup()
+        l.info('...done with test_compact.')
+
+
+# Main
+# ====
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+# pylint: disable=missing-docstring, global-statement, invalid-name
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+
+
+# Imports
+# ======
+
+import pickle
+import unittest
+
+from gzutils.gzutils import Logging
+
+from history import RingBuffer
+
+
+# Setup logging
+# =============
+
+DEBUG_MODE = True
+l = Logging('test_history', DEBUG_MODE)
+
+
+# Unit tests
+# ==========
+
+class TestHistory(unittest.TestCase):
+
+    def setUp(self):
+        l.info('Testing history...')
+
+    def test_window(self):
+        l.info('test_window')
+
+        history = RingBuffer(3, 'l')
+        for value in range(0, 5):
+            history.append(value)
+
+        self.assertEqual(len(history), 3)
+        self.assertEqual(history.count, 5)
+        self.assertEqual(list(history), [2, 3, 4])
+        self.assertEqual((history[0], history[-1], history.previous()), (2, 4, 3))
+        with self.assertRaises(IndexError):
+            history[3] # pylint: disable=pointless-statement
+
+    def test_no_window(self):
+        l.info('test_no_window')
+
+        history = RingBuffer(values=[1.0, 0.5])
+        history.append(0.25)
+        self.assertEqual(list(history), [1.0, 0.5, 0.25])
+        self.assertEqual(list(zip(history, [1, 2, 3])), [(1.0, 1), (0.5, 2), (0.25, 3)])
+
+    def test_decreased(self):
+        l.info('test_decreased')
+
+        history = RingBuffer(2, 'l')
+        history.append(5)
+        self.assertFalse(history.decreased())
+        for value, decreased in [(4, True), (4, False), (6, False), (1, True), (2, False)]:
+            history.append(value)
+            self.assertEqual(history.decreased(), decreased)
+
+    def test_pickle(self):
+        l.info('test_pickle')
+
+        history = RingBuffer(3, 'l', range(0, 7))
+        self.assertEqual(list(pickle.loads(pickle.dumps(history))), [4, 5, 6])
+
+    def tearDown(self):
+        l.info('...done with test_history.')
+
+
+# Main
+# ====
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+# pylint: disable=missing-docstring, global-statement, invalid-name
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+
+
+# Imports
+# ======
+
+import unittest
+
+from gzutils.gzutils import Logging
+
+import mom_and_calf
+from test import TemporaryOutput
+
+
+# Setup logging
+# =============
+
+DEBUG_MODE = True
+l = Logging('test_mom_and_calf', DEBUG_MODE)
+
+
+# Unit tests
+# ==========
+
+class TestMomAndCalf(unittest.TestCase):
+
+    def setUp(self):
+        l.info('Testing mom and calf...')
+        self.output = TemporaryOutput(mom_and_calf.OPTIONS)
+
+    def test_trial_seed(self):
+        l.info('test_trial_seed')
+
+        self.assertTrue(mom_and_calf.trial_seed(None, 3) is None)
+        self.assertTrue(mom_and_calf.trial_seed(1, 0) != mom_and_calf.trial_seed(1, 1))
+        self.assertTrue(mom_and_calf.trial_seed(1, 2) == mom_and_calf.trial_seed(1, 2))
+
+    def test_parallel_trials(self):
+        l.info('test_parallel_trials')
+
+        sequential = mom_and_calf.run_trials(None, 30, 1, 3, workers=1)
+        parallel = mom_and_calf.run_trials(None, 30, 1, 3, workers=3)
+
+        self.assertTrue(len(parallel) == 3)
+        for (mom1, calf1), (mom2, calf2) in zip(sequential, parallel):
+            self.assertTrue(mom1['iterations'] == mom2['iterations'])
+            self.assertTrue(calf1['iterations'] == calf2['iterations'])
+            self.assertTrue(mom1['U_and_pi'] == mom2['U_and_pi'])
+            self.assertTrue(calf1['U_and_pi'] == calf2['U_and_pi'])
+
+    def test_trial_aggregator(self):
+        l.info('test_trial_aggregator')
+
+        trials = mom_and_calf.run_trials(None, 30, 1, 3)
+        stats = mom_and_calf.TrialAggregator()
+        for mom, calf in trials:
+            stats.add(mom, calf)
+
+        self.assertTrue(stats.trials == 3)
+        self.assertAlmostEqual(stats.ages[1].mean, sum(calf['iterations'] for _, calf in trials) / 3)
+        self.assertTrue(stats.U_and_pi[0].summary() ==
+                        mom_and_calf.summarize_U_and_pi([mom['U_and_pi'] for mom, _ in trials]))
+
+        U, pi = stats.U_and_pi[1].summary()
+        self.assertTrue(sum(count for _, count in pi) ==
+                        sum(len(trial_pi) for _, calf in trials
+                            for _, trial_pi in calf['U_and_pi'].values()))
+        self.assertTrue(all(key.startswith('energy:') for key, _ in U))
+
+    def tearDown(self):
+        self.output.cleanup()
+        l.info('...done with test_mom_and_calf.')
+
+
+# Main
+# ====
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+# pylint: disable=missing-docstring, global-statement, invalid-name
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+
+
+# Imports
+# ======
+
+import contextlib
+import io
+import unittest
+
+from gzutils.gzutils import Logging
+
+import mom_and_calf
+from profiling import PhaseProfiler
+from programs import build_program, phase
+from test import TemporaryOutput
+
+
+# Setup logging
+# =============
+
+DEBUG_MODE = True
+l = Logging('test_profiling', DEBUG_MODE)
+
+
+# Unit tests
+# ==========
+
+def report(profiler):
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        profiler.report()
+    return out.getvalue()
+
+class TestProfiling(unittest.TestCase):
+
+    def setUp(self):
+        l.info('Testing profiling...')
+        self.output = TemporaryOutput(mom_and_calf.OPTIONS)
+
+    def test_build_program(self):
+        l.info('test_build_program')
+
+        funcs = [phase('double', lambda x: x * 2), lambda x: x - 1, phase('inc', lambda x: x + 1)]
+        profiler = PhaseProfiler()
+        program = build_program(*funcs, profiler=profiler, owner='agent')
+        expected = build_program(*funcs, profiler=None, owner='agent')
+
+        for x in range(0, 5):
+            self.assertEqual(program(x), expected(x))
+        self.assertEqual(list(profiler.phases), [('agent', 'inc'), ('agent', 'double')])
+        for calls, seconds in profiler.phases.values():
+            self.assertEqual(calls, 5)
+            self.assertTrue(seconds >= 0.0)
+
+    def test_mom_and_calf(self):
+        l.info('test_mom_and_calf')
+
+        expected = mom_and_calf.run_trial(None, 30, 1)
+        mom_and_calf.OPTIONS.profile = True
+        out = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(out):
+                result = mom_and_calf.run_trial(None, 30, 1)
+        finally:
+            mom_and_calf.OPTIONS.profile = None
+        self.assertEqual(result, expected)
+
+        text = out.getvalue()
+        for owner in ('mom', 'calf'):
+            for name in ('network.update', 'q_agent', 'mnetwork.update'):
+                self.assertIn('{:<12}{:<28}'.format(owner, name), text)
+        self.assertIn('{:<12}{:<28}{:>10}'.format('Sea', 'step', 30), text)
+        self.assertIn('execute_action:mom', text)
+
+    def test_instrument(self):
+        l.info('test_instrument')
+
+        class Env:
+            def step(self, time):
+                return time
+
+            def execute_action(self, agent, action, time):
+                return action
+
+        class Thing:
+            __name__ = 'thing'
+
+        profiler = PhaseProfiler()
+        env = profiler.instrument(Env())
+        self.assertEqual(env.step(3), 3)
+        self.assertEqual(env.execute_action(Thing(), 'eat', 3), 'eat')
+        self.assertEqual(env.execute_action(Thing(), 'eat', 4), 'eat')
+        self.assertEqual(profiler.phases[('Env', 'step')][0], 1)
+        self.assertEqual(profiler.phases[('Env', 'execute_action:thing')][0], 2)
+        self.assertTrue(all(seconds >= 0.0 for _, seconds in profiler.phases.values()))
+
+        text = report(profiler)
+        self.assertIn('step', text)
+        self.assertIn('execute_action:thing', text)
+
+    def tearDown(self):
+        self.output.cleanup()
+        l.info('...done with test_profiling.')
+
+
+# Main
+# ====
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+# pylint: disable=missing-docstring, global-statement, invalid-name
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+
+
+# Imports
+# ======
+
+import unittest
+
+from gzutils.gzutils import Logging
+
+from programs import build_program, tap
+
+
+# Setup logging
+# =============
+
+DEBUG_MODE = True
+l = Logging('test_programs', DEBUG_MODE)
+
+
+# Unit tests
+# ==========
+
+class TestPrograms(unittest.TestCase):
+
+    def setUp(self):
+        l.info('Testing programs...')
+
+    def test_build_program(self):
+        l.info('test_build_program')
+
+        logged = []
+        log = lambda *args: logged.append(args)
+
+        # applied from right to left, like compose
+        funcs = [tap(log, 'result', debug_only=True)
+                 , lambda x: x * 2
+                 , tap(log, 'odd', when=lambda x: x % 2, debug_only=True)
+                 , tap(log, 'info', when=lambda x: x > 2)
+                 , lambda x: x + 1]
+
+        program = build_program(*funcs, debug=True)
+        self.assertTrue(program(2) == 6)
+        self.assertTrue(logged == [('info', 3), ('odd', 3), ('result', 6)])
+
+        # only the debug taps are dropped
+        logged.clear()
+        program = build_program(*funcs, debug=False)
+        self.assertTrue(program(2) == 6)
+        self.assertTrue(logged == [('info', 3)])
+
+    def tearDown(self):
+        l.info('...done with test_programs.')
+
+
+# Main
+# ====
+
+if __name__ == '__main__':
+    unittest.main()
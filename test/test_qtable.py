@@ -0,0 +1,108 @@
+# pylint: disable=missing-docstring, global-statement, invalid-name
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+
+
+# Imports
+# ======
+
+import os
+import random
+import tempfile
+import unittest
+
+from animatai.network_rl import MotorModel, NetworkModel, NetworkDP
+from gzutils.gzutils import Logging
+
+import learning
+import mom_and_calf
+from qtable import ArrayQLearningAgent
+from random_mom_and_calf_config import OPTIONS
+from test import TemporaryOutput
+
+
+# Setup logging
+# =============
+
+DEBUG_MODE = True
+l = Logging('test_qtable', DEBUG_MODE)
+
+
+# Unit tests
+# ==========
+
+STATES = [frozenset(), frozenset([1]), frozenset([2]), frozenset([1, 2])]
+
+def q_agent(backend, params=None):
+    status = {'energy': 1.0, 'water': 1.0}
+    motor_model = MotorModel({frozenset([i]): 'a' + str(i) for i in range(0, 4)})
+    network_model = NetworkModel({state: str(sorted(state)) for state in STATES})
+    ndp = NetworkDP(None, status, motor_model, gamma=.9, network_model=network_model)
+    return learning.q_learning_agent(ndp, learning.settings({**(params or {}),
+                                                             'backend': backend}))
+
+# The actions of an agent with random percepts, the statuses sometimes reach 0
+# (a terminal state). Some rewards are equal, to have ties in the Q-table.
+def actions(agent, seed, steps=300):
+    random.seed(seed)
+    res = []
+    for time in range(0, steps):
+        rewards = {'energy': random.choice([-0.1, 0.0, 0.1, random.random() - 0.5]),
+                   'water': random.choice([-0.1, 0.1])}
+        for objective in agent.ndp.statuses:
+            agent.ndp.statuses[objective] = 0.0 if time % 50 == 49 else 1.0
+        res.append(agent((random.choice(STATES), rewards)))
+    return res
+
+class TestQTable(unittest.TestCase):
+
+    def setUp(self):
+        l.info('Testing qtable...')
+        self.output = TemporaryOutput(OPTIONS)
+
+    def test_same_as_dicts(self):
+        l.info('test_same_as_dicts')
+
+        for params in ({}, {'Ne': 3}, {'epsilon': 0.0}, {'epsilon': 1.0}):
+            for seed in range(0, 3):
+                dicts, arrays = q_agent('dict', params), q_agent('array', params)
+                self.assertTrue(isinstance(arrays, ArrayQLearningAgent))
+                self.assertEqual(actions(arrays, seed), actions(dicts, seed))
+                self.assertEqual(arrays.iterations, dicts.iterations)
+                self.assertEqual(arrays.Q_to_U_and_pi(), dicts.Q_to_U_and_pi())
+                self.assertEqual(repr(arrays), repr(dicts))
+                self.assertEqual(arrays.items('water'), list(dicts.Q['water'].items()))
+
+    def test_unknown_backend(self):
+        l.info('test_unknown_backend')
+
+        with self.assertRaises(ValueError):
+            learning.settings({'backend': 'sparse'})
+
+    def test_trial(self):
+        l.info('test_trial')
+
+        expected = mom_and_calf.run_trial(None, 100, 1)
+        OPTIONS.q_learning = {'backend': 'array'}
+        try:
+            self.assertEqual(mom_and_calf.run_trial(None, 100, 1), expected)
+
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, 'trial.ckpt.gz')
+                mom_and_calf.run_trial(None, 50, 1, path, 20)
+                self.assertEqual(mom_and_calf.run_trial(None, 100, 1, path, 20, resume=True),
+                                 expected)
+        finally:
+            OPTIONS.q_learning = None
+
+    def tearDown(self):
+        self.output.cleanup()
+        l.info('...done with test_qtable.')
+
+
+# Main
+# ====
+
+if __name__ == '__main__':
+    unittest.main()
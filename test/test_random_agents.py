@@ -0,0 +1,77 @@
+# pylint: disable=missing-docstring, global-statement, invalid-name
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+
+
+# Imports
+# ======
+
+import unittest
+
+from gzutils.gzutils import Logging
+
+import random_agents
+
+
+# Setup logging
+# =============
+
+DEBUG_MODE = True
+l = Logging('test_random_agents', DEBUG_MODE)
+
+
+# Records the messages instead of sending them to a browser
+class FakeWss:
+
+    def __init__(self):
+        self.messages = []
+
+    def send(self, msg):
+        self.messages.append(msg)
+
+    def send_init(self, _):
+        self.send('init')
+
+    def send_update_agent(self, agent, state):
+        self.send('w.updateAgent("' + agent + '")')
+
+
+# Unit tests
+# ==========
+
+class TestRandomAgents(unittest.TestCase):
+
+    def setUp(self):
+        l.info('Testing random agents...')
+
+    def test_batch(self):
+        l.info('test_batch')
+
+        wss = FakeWss()
+        random_agents.run(wss, 5, 1, batch=False)
+        self.assertTrue(len(wss.messages) == 1 + 5 * len(random_agents.CFG['agents']))
+
+        wss = FakeWss()
+        random_agents.run(wss, 5, 1)
+        self.assertTrue(len(wss.messages) == 1 + 5)
+        for agent in random_agents.CFG['agents']:
+            self.assertTrue('w.updateAgent("' + agent + '"' in wss.messages[-1])
+
+    def test_frame_rate(self):
+        l.info('test_frame_rate')
+
+        # all steps but the first are merged into the last frame
+        wss = FakeWss()
+        random_agents.run(wss, 100, 1, fps=0.001)
+        self.assertTrue(len(wss.messages) == 1 + 2)
+
+    def tearDown(self):
+        l.info('...done with test_random_agents.')
+
+
+# Main
+# ====
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+# pylint: disable=missing-docstring, global-statement, invalid-name
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+
+
+# Imports
+# ======
+
+import unittest
+
+import numpy as np
+from gzutils.gzutils import Logging
+
+import random_walk
+from random_walk import RandomWalk
+
+
+# Setup logging
+# =============
+
+DEBUG_MODE = True
+l = Logging('test_random_walk', DEBUG_MODE)
+
+
+# Unit tests
+# ==========
+
+class TestRandomWalk(unittest.TestCase):
+
+    def setUp(self):
+        l.info('Testing random walk...')
+
+    def test_within_field(self):
+        l.info('test_within_field')
+
+        walk = RandomWalk(np.zeros((1000, 2)), (3, 2), seed=1)
+        previous = walk.positions
+        for positions in walk.stream(50):
+            self.assertTrue((positions >= 0).all())
+            self.assertTrue((positions < (3, 2)).all())
+            self.assertTrue((abs(positions - previous).sum(axis=1) == 1).all())
+            previous = positions
+
+    def test_corner(self):
+        l.info('test_corner')
+
+        # only right (1, 0) and down (0, 1) are possible, with equal probability
+        walk = RandomWalk(np.zeros((10000, 2)), (10, 10), seed=1)
+        positions = walk.step()
+        self.assertTrue(set(map(tuple, positions.tolist())) == {(1, 0), (0, 1)})
+        self.assertTrue(abs(positions[:, 0].mean() - 0.5) < 0.05)
+
+    def test_seed(self):
+        l.info('test_seed')
+
+        self.assertTrue((random_walk.run(None, 20, 1, 100) ==
+                         random_walk.run(None, 20, 1, 100)).all())
+        self.assertFalse((random_walk.run(None, 20, 1, 100) ==
+                          random_walk.run(None, 20, 2, 100)).all())
+
+    def tearDown(self):
+        l.info('...done with test_random_walk.')
+
+
+# Main
+# ====
+
+if __name__ == '__main__':
+    unittest.main()
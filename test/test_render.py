@@ -0,0 +1,201 @@
+# pylint: disable=missing-docstring, global-statement, invalid-name
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+
+
+# Imports
+# ======
+
+import ast
+import copy
+import json
+import unittest
+
+from animatai.agents import Agent, Obstacle
+from gzutils.gzutils import Logging
+
+import mom_and_calf
+from render import DELTA, KEYFRAME, RenderChannel, RenderState
+from sea import CompactSea, IndexedSea, Sea, Squid
+from test import SEA_OPTIONS, TemporaryOutput
+
+
+# Setup logging
+# =============
+
+DEBUG_MODE = True
+l = Logging('test_render', DEBUG_MODE)
+
+
+# Unit tests
+# ==========
+
+# Records what is sent, the states of the agents are copied since they are updated in place
+class FakeWss:
+
+    def __init__(self):
+        self.messages = []
+
+    def send(self, msg):
+        self.messages.append(msg)
+
+    def send_update_agent(self, agent, state):
+        self.messages.append(('send_update_agent', agent, copy.deepcopy(state)))
+
+    def __getattr__(self, name):
+        return lambda *args: self.messages.append((name,) + args)
+
+# Without respawns, so that the squid that are eaten are removed from the terrain
+def run_trial(steps, render_deltas):
+    options = mom_and_calf.OPTIONS
+    saved = copy.deepcopy({key: options[key] for key in ['wss_cfg', 'exogenous_things_prob']})
+    options.update(render_deltas=render_deltas, keyframe_interval=50, quiet=True,
+                   exogenous_things_prob=0.0)
+    wss = FakeWss()
+    try:
+        mom_and_calf.run_trial(wss, steps, 1)
+    finally:
+        options.update(saved, wss=None, render_deltas=None, keyframe_interval=None, quiet=None)
+    return wss.messages
+
+
+def size(messages):
+    return sum(len(msg) if isinstance(msg, bytes) else len(json.dumps(msg)) for msg in messages)
+
+class TestRender(unittest.TestCase):
+
+    def setUp(self):
+        l.info('Testing render...')
+        self.output = TemporaryOutput(mom_and_calf.OPTIONS)
+
+    def test_same_as_json(self):
+        l.info('test_same_as_json')
+
+        expected = run_trial(120, False)
+        messages = run_trial(120, True)
+        frames = [msg for msg in messages if isinstance(msg, bytes)]
+        self.assertEqual(len(frames), 121)
+        self.assertTrue(size(messages) * 10 < size(expected))
+
+        # the terrain after each step and the agents at the end
+        terrains = [msg[1] for msg in expected if msg[0] == 'send_update_terrain']
+        locations = {msg[1]: tuple(msg[2]['pos']) for msg in expected
+                     if msg[0] == 'send_update_agent'}
+        state = RenderState()
+        state.apply(frames[0])
+        self.assertEqual(state.texts, {})
+        rendered = []
+        for frame in frames[1:]:
+            state.apply(frame)
+            rendered.append('\n'.join(state.rows()))
+        self.assertEqual(rendered, terrains)
+        self.assertTrue(len(set(terrains)) > 1)
+        self.assertEqual(state.locations, locations)
+        self.assertEqual(state.time, 119)
+
+        # the status of the last action of each agent
+        statuses = [ast.literal_eval(msg[2]) for msg in expected
+                    if msg[:2] == ('send_print_escaped_text', 'status')]
+        self.assertEqual(set(state.status), {'mom', 'calf'})
+        for name, status in state.status.items():
+            for objective, value in status.items():
+                self.assertAlmostEqual(value, statuses[-1][name][objective], places=6)
+
+        # a keyframe every 50 steps (and when the agents get their objectives), with U/pi
+        kinds = [frame[0] for frame in frames]
+        self.assertEqual([i for i, kind in enumerate(kinds) if kind == KEYFRAME], [0, 1, 51, 101])
+        self.assertEqual(kinds.count(DELTA), 117)
+        self.assertIn('mom', state.texts['U_and_pi'])
+
+    # The squares changed by deletes, respawns and things added between the steps
+    def test_changed_squares(self):
+        l.info('test_changed_squares')
+
+        for cls in (Sea, IndexedSea, CompactSea):
+            expected, rendered = [], []
+            for render_deltas, messages in [(False, expected), (True, rendered)]:
+                sea = cls({**SEA_OPTIONS, 'wss': FakeWss(), 'render_deltas': render_deltas,
+                           'terrain': ['~' * 50] * 7, 'quiet': True,
+                           'exogenous_things': ['', ' ' * 20 + 'ss'],
+                           'exogenous_things_prob': 1.0,
+                           'wss_cfg': {'agents': {'a': {'pos': (1, 1)}, 'b': {'pos': (1, 4)}}}})
+                a, b = Agent(lambda percept: 'forward', 'a'), Agent(lambda percept: 'forward', 'b')
+                sea.add_thing(a, (1, 1))
+                sea.add_thing(b, (1, 4))
+                sea.step(0)
+                sea.delete_thing(sea.list_things_at((5, 2), Squid)[0])
+                sea.add_thing(Obstacle('rock'), (4, 1))
+                sea.step(1)
+                sea.respawn.prob = 0.0
+                for squid in sea.list_things_at((20, 1), Squid):
+                    sea.delete_thing(squid)
+                sea.delete_thing(b)
+                sea.step(2)
+                messages.extend(sea.wss.messages)
+
+            terrains = [msg[1] for msg in expected if msg[0] == 'send_update_terrain']
+            frames = [msg for msg in rendered if isinstance(msg, bytes)]
+            self.assertEqual(len(set(terrains)), 3)
+            self.assertEqual([frame[0] for frame in frames], [KEYFRAME, DELTA, DELTA, KEYFRAME])
+            state = RenderState()
+            state.apply(frames[0])
+            for frame, terrain in zip(frames[1:], terrains):
+                state.apply(frame)
+                self.assertEqual('\n'.join(state.rows()), terrain)
+            self.assertEqual(state.locations, {'a': (3, 1)})
+
+    def test_deleted_agent(self):
+        l.info('test_deleted_agent')
+
+        wss = FakeWss()
+        channel = RenderChannel(wss)
+        channel.send_init({'terrain': 'a' * 20, 'agents': {'a': {'pos': (0, 0)},
+                                                           'b': {'pos': (1, 0)}}})
+        channel.update_status('a', {'energy': 1.0})
+        channel.end_step(0)
+        channel.remove_agent('a')
+        channel.send_update_agent('a', {'pos': (2, 0)})
+        channel.send_update_agent('b', {'pos': (2, 0)})
+        channel.end_step(1)
+        channel.send_update_agent('b', {'pos': (0, 0)})
+        channel.end_step(2)
+        self.assertEqual([frame[0] for frame in wss.messages], [KEYFRAME, KEYFRAME, KEYFRAME, DELTA])
+
+        state = RenderState()
+        state.apply(wss.messages[2])
+        self.assertEqual(state.names, ['b'])
+        self.assertEqual(state.status, {})
+        state.apply(wss.messages[3])
+        self.assertEqual(state.locations, {'b': (0, 0)})
+
+    def test_large_delta(self):
+        l.info('test_large_delta')
+
+        wss = FakeWss()
+        channel = RenderChannel(wss)
+        channel.send_init({'terrain': 'abc\ndef', 'agents': {'a': {'pos': (0, 0)}}})
+        channel.update_square((0, 0), 'x')
+        channel.end_step(0)
+        for location, code in [((0, 0), 'y'), ((1, 0), 'z'), ((0, 1), 'x'), ((1, 1), 'y')]:
+            channel.update_square(location, code)
+        channel.send_update_agent('a', {'pos': (1, 1)})
+        channel.end_step(1)
+        self.assertEqual([frame[0] for frame in wss.messages], [KEYFRAME, DELTA, KEYFRAME])
+
+        state = RenderState()
+        for frame in wss.messages:
+            state.apply(frame)
+        self.assertEqual(state.rows(), ['yzc', 'xyf'])
+        self.assertEqual(state.locations, {'a': (1, 1)})
+
+    def tearDown(self):
+        self.output.cleanup()
+        l.info('...done with test_render.')
+
+
+# Main
+# ====
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+# pylint: disable=missing-docstring, global-statement, invalid-name
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+
+
+# Imports
+# ======
+
+import os
+import random
+import tempfile
+import unittest
+
+from animatai.agents import XYEnvironment
+from gzutils.gzutils import DotDict, Logging
+
+import checkpoint
+from random_mom_and_calf_config import OPTIONS
+from respawn import RespawnScheduler
+from sea import IndexedSea, Sea, Squid
+
+
+# Setup logging
+# =============
+
+DEBUG_MODE = True
+l = Logging('test_respawn', DEBUG_MODE)
+
+
+# Unit tests
+# ==========
+
+def things(env):
+    return [(type(thing), thing.__name__, thing.location) for thing in env.things]
+
+def dues(scheduler, steps):
+    return [scheduler.due() for _ in range(0, steps)]
+
+class TestRespawn(unittest.TestCase):
+
+    def setUp(self):
+        l.info('Testing respawn...')
+
+    def test_same_as_exogenous_change(self):
+        l.info('test_same_as_exogenous_change')
+
+        options = DotDict({**OPTIONS, 'wss': None, 'exogenous_things_prob': 0.3})
+        sea, expected = Sea(options), Sea(options)
+        random.seed(1)
+        for _ in range(0, 20):
+            sea.exogenous_change()
+        random.seed(1)
+        for _ in range(0, 20):
+            XYEnvironment.exogenous_change(expected)
+        self.assertTrue(len(sea.things) > len(Sea(options).things))
+        self.assertEqual(things(sea), things(expected))
+        self.assertEqual(sea.thing_counter, expected.thing_counter)
+
+    def test_indexed(self):
+        l.info('test_indexed')
+
+        sea = IndexedSea(DotDict({**OPTIONS, 'wss': None, 'exogenous_things_prob': 1.0}))
+        sea.exogenous_change()
+        self.assertEqual(len(sea.list_things_at((2, 2), Squid)), 2)
+
+    def test_seeded(self):
+        l.info('test_seeded')
+
+        first = RespawnScheduler([], 0.1, seed=1)
+        first.BLOCK = 16
+        random.seed(1)
+        expected = dues(first, 10000)
+
+        # the same respawns whatever happens to `random`, in blocks of any size
+        random.seed(2)
+        second = RespawnScheduler([], 0.1, seed=1)
+        self.assertEqual(dues(second, 10000), expected)
+        self.assertTrue(900 < expected.count(True) < 1100)
+
+        self.assertNotEqual(dues(RespawnScheduler([], 0.1, seed=2), 10000), expected)
+        self.assertFalse(any(dues(RespawnScheduler([], 0.0, seed=1), 100)))
+        self.assertTrue(all(dues(RespawnScheduler([], 1.0, seed=1), 100)))
+
+    def test_resume_seeded(self):
+        l.info('test_resume_seeded')
+
+        options = DotDict({**OPTIONS, 'wss': None, 'exogenous_things_prob': 0.3,
+                           'respawn_seed': 3})
+        expected = Sea(options)
+        for _ in range(0, 40):
+            expected.exogenous_change()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'sea.ckpt.gz')
+            sea = Sea(options)
+            for _ in range(0, 20):
+                sea.exogenous_change()
+            checkpoint.save(path, sea, [], 20)
+
+            sea = Sea(options)
+            self.assertEqual(checkpoint.restore(path, sea, []), 20)
+            for _ in range(0, 20):
+                sea.exogenous_change()
+        self.assertEqual(things(sea), things(expected))
+
+    def tearDown(self):
+        l.info('...done with test_respawn.')
+
+
+# Main
+# ====
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+# pylint: disable=missing-docstring, global-statement, invalid-name
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+
+
+# Imports
+# ======
+
+import io
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+from gzutils.gzutils import Logging
+
+import run
+import grid
+import mom_and_calf
+from random_mom_and_calf_config import OPTIONS
+from test import TemporaryOutput
+
+
+# Setup logging
+# =============
+
+DEBUG_MODE = True
+l = Logging('test_run', DEBUG_MODE)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# Unit tests
+# ==========
+
+def python(*args):
+    return subprocess.run([sys.executable] + list(args), cwd=ROOT, check=True,
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+class TestRun(unittest.TestCase):
+
+    def setUp(self):
+        l.info('Testing run...')
+        self.output = TemporaryOutput(grid.OPTIONS, mom_and_calf.OPTIONS, OPTIONS)
+
+    def test_parse_seed(self):
+        l.info('test_parse_seed')
+
+        self.assertTrue(run.parse_seed('None') is None)
+        self.assertEqual(run.parse_seed('12'), 12)
+        self.assertEqual(run.parse_seed('abc'), 'abc')
+
+    def test_run(self):
+        l.info('test_run')
+
+        res = python('run.py', 'random_agents', '5', '1')
+        self.assertTrue(res.stderr.startswith(b'run.py: imported random_agents in '))
+
+    def test_lazy_imports(self):
+        l.info('test_lazy_imports')
+
+        code = ('import sys, grid, mom_and_calf, random_mom_and_calf_config as c;'
+                'print(grid.OPTIONS.output_path, c.OPTIONS.output_path, "numpy" in sys.modules)')
+        self.assertEqual(python('-c', code).stdout.strip(), b'None None False')
+
+    def test_batch(self):
+        l.info('test_batch')
+
+        jobs = run.read_jobs(io.StringIO('# world steps seed trials\n'
+                                         'grid 10 1\n\nmom_and_calf 10 1 2\nunknown 10\n'
+                                         'mom_and_calf 10 1\n'))
+        self.assertEqual(jobs, ['grid 10 1', 'mom_and_calf 10 1 2', 'unknown 10',
+                                'mom_and_calf 10 1'])
+
+        out = io.StringIO()
+        run.run_batch(jobs, out=out)
+        results = [json.loads(line) for line in out.getvalue().splitlines()]
+
+        self.assertEqual(results[0]['result'], {'iterations': 10})
+        self.assertEqual(results[1]['args'], [2])
+        self.assertEqual(results[1]['result']['trials'], 2)
+        self.assertTrue('error' in results[2])
+
+        # one trial by default
+        self.assertEqual(results[3]['args'], [1])
+        self.assertEqual(results[3]['result']['trials'], 1)
+
+    def test_batch_stdin(self):
+        l.info('test_batch_stdin')
+
+        res = subprocess.run([sys.executable, 'run.py', '--batch', '-', '--processes', '2'],
+                             cwd=ROOT, check=True, input=b'random_agents 5 1\nrandom_agents 5 2\n',
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        results = [json.loads(line) for line in res.stdout.decode().splitlines()]
+        self.assertEqual([r['seed'] for r in results], [1, 2])
+
+    # The jobs in the pool can't have a pool of workers of their own
+    def test_batch_workers(self):
+        l.info('test_batch_workers')
+
+        out = io.StringIO()
+        run.run_batch(['mom_and_calf 5 1 2 2', 'random_agents 5 1'], processes=2, out=out)
+        results = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertFalse('error' in results[0])
+        self.assertEqual(results[0]['result']['trials'], 2)
+
+    def tearDown(self):
+        self.output.cleanup()
+        l.info('...done with test_run.')
+
+
+# Main
+# ====
+
+if __name__ == '__main__':
+    unittest.main()
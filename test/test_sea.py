@@ -13,6 +13,7 @@ from animatai.agents import Agent, Obstacle
 from gzutils.gzutils import Logging
 
 from sea import Sea, Squid
+from test import SEA_OPTIONS
 
 
 # Setup logging
@@ -25,30 +26,6 @@ l = Logging('test_cachalot', DEBUG_MODE)
 # Unit tests
 # ==========
 
-lane = ('XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX\n' +
-        '                                                  \n' +
-        '     ssss                          ssss           \n')
-
-# the mother and calf have separate and identical lanes
-things = lane + lane + 'XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX'
-
-options = {
-    'things': things.split('\n'),
-    'width': 50,
-    'height': 7,
-    'agents': {
-        'cachelot': {
-            'sensors': [None, Squid],
-            'motors': [('eat_and_forward', ['eat', 'forward']),
-                       ('forward', ['forward']),
-                       ('dive_and_forward', ['down', 'forward']),
-                       ('up_and_forward', ['up', 'forward']),
-                       ('sing', ['sing'])
-                      ],
-        }
-    },
-}
-
 class TestCachalot(unittest.TestCase):
 
     def setUp(self):
@@ -57,7 +34,7 @@ class TestCachalot(unittest.TestCase):
     def test_add_squid(self):
         l.info('test_add_squid')
 
-        sea = Sea(options)
+        sea = Sea(SEA_OPTIONS)
 
         for i in range(5, 9):
             self.assertTrue(len(sea.list_things_at((i, 2))) == 1)
@@ -70,7 +47,7 @@ class TestCachalot(unittest.TestCase):
     def test_moving_cachalot(self):
         l.info('test_moving_cachalot')
 
-        e = Sea(options)
+        e = Sea(SEA_OPTIONS)
         a = Agent(None, 'cachelot')
         e.add_thing(a, (1, 1))
 
@@ -97,7 +74,7 @@ class TestCachalot(unittest.TestCase):
     def test_singing_cachalot(self):
         l.info('test_singing_cachalot')
 
-        e = Sea(options)
+        e = Sea(SEA_OPTIONS)
         a = Agent(None, 'cachelot')
         e.add_thing(a, (1, 1))
 
@@ -106,6 +83,56 @@ class TestCachalot(unittest.TestCase):
         self.assertTrue(len(e.list_nonspatial_at(2)) == 1)
 
 
+    def test_publish_status(self):
+        l.info('test_publish_status')
+
+        class QAgent:
+            def __init__(self):
+                self.iterations = 0
+                self.calls = 0
+
+            def Q_to_U_and_pi(self):
+                self.calls += 1
+                return {'energy': ({}, {})}
+
+        a = Agent(None, 'cachelot')
+        a.status = {'energy': 1.0}
+        a.q_agent = QAgent()
+
+        # headless, U/pi should never be calculated
+        e = Sea(SEA_OPTIONS)
+        e.add_thing(a, (1, 1))
+        for time in range(0, 4):
+            e.execute_action(a, 'forward', time)
+        self.assertTrue(a.q_agent.calls == 0)
+        self.assertTrue(e.agent_U_and_pi == {})
+
+        # publish every second step and cache U/pi until the Q-table changes
+        e = Sea({**SEA_OPTIONS, 'status_interval': 2})
+        e.add_thing(a, (1, 1))
+        for time in range(0, 4):
+            e.execute_action(a, 'forward', time)
+        self.assertTrue(a.q_agent.calls == 1)
+        a.q_agent.iterations += 1
+        e.execute_action(a, 'forward', 4)
+        self.assertTrue(a.q_agent.calls == 2)
+        self.assertTrue(e.agent_status == {'cachelot': {'energy': 1.0}})
+
+    def test_history_window(self):
+        l.info('test_history_window')
+
+        e = Sea({**SEA_OPTIONS, 'history_window': 3})
+        a = Agent(None, 'cachelot')
+        e.add_thing(a, (4, 2))
+        self.assertFalse(e.any_measurement_decreased())
+
+        for time in range(0, 6):
+            e.save_history()
+            e.execute_action(a, 'eat_and_forward', time)
+            if time > 0:
+                self.assertEqual(e.any_measurement_decreased(), time >= 2)
+        self.assertEqual(list(e.environment_history[Squid]), [14, 13, 12])
+
     def tearDown(self):
         l.info('...done with test_sea.')
 
@@ -0,0 +1,147 @@
+# pylint: disable=missing-docstring, global-statement, invalid-name
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+
+
+# Imports
+# ======
+
+import random
+import unittest
+
+import numpy as np
+
+from animatai.agents import Agent
+from gzutils.gzutils import DotDict, Logging
+
+import random_mom_and_calf
+import sea_batch
+from random_mom_and_calf_config import mom_start_pos, calf_start_pos, OPTIONS
+from sea import Sea, Song, Squid
+from sea_batch import ACTIONS, SeaBatch
+
+
+# Setup logging
+# =============
+
+DEBUG_MODE = True
+l = Logging('test_sea_batch', DEBUG_MODE)
+
+
+# Unit tests
+# ==========
+
+def batch_options(prob):
+    return DotDict({**OPTIONS, 'wss': None, 'quiet': True, 'exogenous_things_prob': prob})
+
+def squid_grid(sea):
+    grid = np.zeros((sea.height, sea.width), dtype=int)
+    for squid in sea.list_things(Squid):
+        x, y = squid.location
+        grid[y, x] += 1
+    return grid
+
+# Runs a `Sea` where the agents perform random actions and the batch (of one sea)
+# with the same actions, the seas should be the same after each step
+def compare(test, prob, steps):
+    random.seed(prob)
+    options = batch_options(prob)
+    sea = Sea(options)
+    batch = SeaBatch(options, 1, [mom_start_pos, calf_start_pos])
+    actions = [[random.randrange(len(ACTIONS)) for _ in range(0, 2)] for _ in range(0, steps)]
+    percepts = []
+
+    def program(agent):
+        def program_(percept):
+            things = [object_ for object_, _ in percept[0]]
+            percepts.append((any(isinstance(thing, Squid) for thing in things),
+                             any(isinstance(thing, Song) for thing in things)))
+            return ACTIONS[actions[sea_time[0]][agent]]
+        return program_
+
+    sea_time = [0]
+    agents = [Agent(program(0), 'mom'), Agent(program(1), 'calf')]
+    sea.add_thing(agents[0], mom_start_pos)
+    sea.add_thing(agents[1], calf_start_pos)
+
+    for time in range(0, steps):
+        squid, song = batch.percepts()
+        sea_time[0] = time
+        del percepts[:]
+        sea.step(time)
+        batch.step(np.array([actions[time]]))
+
+        test.assertEqual([tuple(p) for p in percepts],
+                         [(squid[0, i], song[0]) for i in range(0, 2)])
+        test.assertEqual([agent.location for agent in agents],
+                         [(batch.x[0, i], batch.y[0, i]) for i in range(0, 2)])
+        test.assertEqual([agent.bump for agent in agents], list(batch.bump[0]))
+        test.assertEqual([rewards['energy'] for rewards in sea.rewards], list(batch.rewards[0, :, 0]))
+        test.assertTrue((squid_grid(sea) == batch.squid[0]).all())
+
+class TestSeaBatch(unittest.TestCase):
+
+    def setUp(self):
+        l.info('Testing sea_batch...')
+
+    def test_same_as_sea(self):
+        l.info('test_same_as_sea')
+
+        compare(self, 0.0, 200)
+        compare(self, 1.0, 100)
+
+    def test_independent_seas(self):
+        l.info('test_independent_seas')
+
+        options = batch_options(0.0)
+        random.seed(1)
+        actions = np.array([[[random.randrange(len(ACTIONS)) for _ in range(0, 2)]
+                             for _ in range(0, 3)] for _ in range(0, 100)])
+        batch = SeaBatch(options, 3, [mom_start_pos, calf_start_pos])
+        singles = [SeaBatch(options, 1, [mom_start_pos, calf_start_pos]) for _ in range(0, 3)]
+        for time in range(0, 100):
+            batch.step(actions[time])
+            for i, single in enumerate(singles):
+                single.step(actions[time, i:i + 1])
+
+        for i, single in enumerate(singles):
+            self.assertTrue((batch.squid[i] == single.squid[0]).all())
+            self.assertTrue((batch.x[i] == single.x[0]).all())
+            self.assertTrue((batch.y[i] == single.y[0]).all())
+
+    def test_programs(self):
+        l.info('test_programs')
+
+        squid, song = Squid(), Song()
+        for seed in range(0, 20):
+            for things in ([], [squid], [song], [squid, song]):
+                percept = ([(thing, None) for thing in things], None)
+                random.seed(seed)
+                rand = np.array([random.random()])
+                have = np.array([squid in things]), np.array([song in things])
+
+                random.seed(seed)
+                self.assertEqual(ACTIONS[sea_batch.mom_program(have[0], have[1], rand)[0]],
+                                 random_mom_and_calf.mom_program(percept))
+                random.seed(seed)
+                self.assertEqual(ACTIONS[sea_batch.calf_program(have[0], have[1], rand)[0]],
+                                 random_mom_and_calf.calf_program(percept))
+
+    def test_seeded(self):
+        l.info('test_seeded')
+
+        first = sea_batch.random_mom_and_calf(50, 50, seed=1)
+        second = sea_batch.random_mom_and_calf(50, 50, seed=1)
+        self.assertEqual(first.as_dict(), second.as_dict())
+        self.assertTrue((first.squid == second.squid).all())
+
+    def tearDown(self):
+        l.info('...done with test_sea_batch.')
+
+
+# Main
+# ====
+
+if __name__ == '__main__':
+    unittest.main()
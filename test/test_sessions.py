@@ -0,0 +1,200 @@
+# pylint: disable=missing-docstring, global-statement, invalid-name
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+
+
+# Imports
+# ======
+
+import asyncio
+import copy
+import os
+import runpy
+import subprocess
+import sys
+import unittest
+
+from gzutils.gzutils import Logging
+
+import random_agents
+import sessions
+import worlds
+import grid
+from test import TemporaryOutput
+
+
+# Setup logging
+# =============
+
+DEBUG_MODE = True
+l = Logging('test_sessions', DEBUG_MODE)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# Unit tests
+# ==========
+
+class FakeWss:
+
+    def __init__(self):
+        self.messages = []
+
+    def send(self, msg):
+        self.messages.append(msg)
+
+    # the config is updated in place by the world
+    def send_init(self, cfg):
+        self.messages.append(('init', copy.deepcopy(cfg)))
+
+    def send_update_agent(self, agent, state):
+        self.messages.append((agent, state))
+
+    def send_print_message(self, msg):
+        self.messages.append(('print', msg))
+
+    def __getattr__(self, name):
+        return lambda *args: self.messages.append((name,) + args)
+
+class TestSessions(unittest.TestCase):
+
+    def setUp(self):
+        l.info('Testing sessions...')
+        self.output = TemporaryOutput(grid.OPTIONS)
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        self.output.cleanup()
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def test_lazy_registry(self):
+        l.info('test_lazy_registry')
+
+        self.assertTrue(worlds.is_registered('grid'))
+        self.assertFalse(worlds.is_registered('unknown'))
+        code = 'import sys, worlds; print(sorted(m for m in ("numpy", "animatai", "grid") if m in sys.modules))'
+        self.assertEqual(subprocess.check_output([sys.executable, '-c', code]).strip(), b'[]')
+
+    def test_worker(self):
+        l.info('test_worker')
+
+        expected = FakeWss()
+        random_agents.run(expected, 5, 1)
+
+        async def main():
+            wss = FakeWss()
+            await pool.start(wss, 'random_agents', 5, 1)
+            return wss
+
+        pool = sessions.WorkerPool(2)
+        wss = self.loop.run_until_complete(main())
+        self.assertEqual(wss.messages, expected.messages)
+        self.assertEqual(pool.sessions, {})
+        self.assertEqual(pool.running, 0)
+
+    def test_unknown_world(self):
+        l.info('test_unknown_world')
+
+        wss = FakeWss()
+        self.assertTrue(sessions.WorkerPool().start(wss, 'unknown', 5, 1) is None)
+        self.assertEqual(wss.messages[0][0], 'print')
+
+    def test_cancel(self):
+        l.info('test_cancel')
+
+        pool = sessions.WorkerPool(1)
+        wss = FakeWss()
+
+        async def main():
+            slow = pool.start(wss, 'grid', 10 ** 9, 1, viewer=1)
+            waiting = pool.start(FakeWss(), 'random_agents', 5, 1, viewer=2)
+            await asyncio.sleep(0.5)
+            process = pool.sessions[1, 'grid'].process
+            self.assertTrue(process.is_alive())
+            self.assertFalse(waiting.done())
+
+            # starting grid again cancels the running session
+            again = pool.start(wss, 'grid', 10, 1, viewer=1)
+            with self.assertRaises(asyncio.CancelledError):
+                await slow
+            self.assertFalse(process.is_alive())
+            await asyncio.gather(waiting, again)
+
+        self.loop.run_until_complete(main())
+        self.assertEqual(pool.sessions, {})
+        self.assertEqual(pool.running, 0)
+
+    # The server is the same object for all the connections
+    def test_shared_wss(self):
+        l.info('test_shared_wss')
+
+        pool = sessions.WorkerPool(2)
+        wss = FakeWss()
+
+        async def main():
+            first = pool.start(wss, 'random_agents', 5, 1, viewer='a')
+            second = pool.start(wss, 'random_agents', 5, 2, viewer='b')
+            anonymous = pool.start(wss, 'random_agents', 5, 3)
+            self.assertEqual(len(pool.sessions), 3)
+            await asyncio.gather(first, second, anonymous)
+
+            # cancelling a viewer leaves the sessions of the other viewers
+            slow = pool.start(wss, 'grid', 10 ** 9, 1, viewer='a')
+            other = pool.start(wss, 'grid', 10 ** 9, 1, viewer='b')
+            await asyncio.sleep(0.5)
+            pool.cancel('a')
+            with self.assertRaises(asyncio.CancelledError):
+                await slow
+            self.assertFalse(other.done())
+            self.assertEqual(list(pool.sessions), [('b', 'grid')])
+            pool.cancel_all()
+            with self.assertRaises(asyncio.CancelledError):
+                await other
+
+        self.loop.run_until_complete(main())
+        self.assertEqual(pool.sessions, {})
+        self.assertEqual(pool.running, 0)
+        self.assertEqual(len([msg for msg in wss.messages if msg[0] == 'init']), 5)
+
+    # The server in animatai calls the handler without a viewer
+    def test_handler(self):
+        l.info('test_handler')
+
+        config = runpy.run_path(os.path.join(ROOT, 'config.py.template'))
+        pool, handler = config['POOL'], config['handler']
+        wss = FakeWss()
+
+        async def main():
+            handler(wss, 'grid', 10 ** 9, None)
+            slow = pool.sessions[None, 'grid'].task
+            await asyncio.sleep(0.5)
+            process = pool.sessions[None, 'grid'].process
+            self.assertTrue(process.is_alive())
+
+            # starting grid again cancels the running session
+            handler(wss, 'grid', 10, None)
+            with self.assertRaises(asyncio.CancelledError):
+                await slow
+            self.assertFalse(process.is_alive())
+            await pool.sessions[None, 'grid'].task
+
+            # a server that knows the connections passes the viewers
+            handler(wss, 'grid', 10 ** 9, None, 'a')
+            handler(wss, 'grid', 10, None, 'b')
+            slow = pool.sessions['a', 'grid'].task
+            await pool.sessions['b', 'grid'].task
+            self.assertFalse(slow.done())
+            pool.cancel_all()
+            with self.assertRaises(asyncio.CancelledError):
+                await slow
+
+        self.loop.run_until_complete(main())
+        self.assertEqual(pool.sessions, {})
+        self.assertEqual(pool.running, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+# pylint: disable=missing-docstring, global-statement, invalid-name
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+
+
+# Imports
+# ======
+
+import asyncio
+import json
+import unittest
+
+from gzutils.gzutils import Logging
+
+import grid
+import random_agents
+from simulation import complete, complete_async
+from test import TemporaryOutput
+
+
+# Setup logging
+# =============
+
+DEBUG_MODE = True
+l = Logging('test_simulation', DEBUG_MODE)
+
+
+# Unit tests
+# ==========
+
+def run_until_complete(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+def counter(steps, log):
+    for i in range(0, steps):
+        log.append(i)
+        yield i
+    return steps
+
+class FakeWss:
+
+    def __init__(self, name, log):
+        self.name = name
+        self.log = log
+        self.messages = []
+
+    def send_init(self, cfg):
+        self.log.append((self.name, 'init'))
+        self.messages.append(json.dumps(cfg))
+
+    def send(self, msg):
+        self.log.append((self.name, 'update'))
+        self.messages.append(msg)
+
+class TestSimulation(unittest.TestCase):
+
+    def setUp(self):
+        l.info('Testing simulation...')
+        self.output = TemporaryOutput(grid.OPTIONS)
+
+    def test_complete(self):
+        l.info('test_complete')
+
+        log = []
+        self.assertEqual(complete(counter(3, log)), 3)
+        self.assertEqual(log, [0, 1, 2])
+        self.assertEqual(run_until_complete(complete_async(counter(2, log))), 2)
+
+    def test_concurrent_worlds(self):
+        l.info('test_concurrent_worlds')
+
+        log = []
+        a, b = FakeWss('a', log), FakeWss('b', log)
+
+        async def main():
+            await asyncio.gather(random_agents.run_async(a, 3, 1),
+                                 random_agents.run_async(b, 3, 2))
+
+        run_until_complete(main())
+
+        # the updates of the two worlds are interleaved
+        self.assertEqual(log, [('a', 'init'), ('a', 'update'), ('b', 'init'), ('b', 'update'),
+                               ('a', 'update'), ('b', 'update'), ('a', 'update'), ('b', 'update')])
+
+        # each world moves its own agents, the same as when it runs alone
+        for wss, seed in ((a, 1), (b, 2)):
+            alone = FakeWss('alone', [])
+            random_agents.run(alone, 3, seed)
+            self.assertEqual(wss.messages, alone.messages)
+        self.assertNotEqual(a.messages[1:], b.messages[1:])
+
+    def test_same_result(self):
+        l.info('test_same_result')
+
+        expected = grid.run(None, 30, 1).q_agent
+        q_agent = run_until_complete(grid.run_async(None, 30, 1)).q_agent
+        self.assertEqual(q_agent.iterations, expected.iterations)
+        self.assertEqual(q_agent.Q, expected.Q)
+
+    def tearDown(self):
+        self.output.cleanup()
+        l.info('...done with test_simulation.')
+
+
+# Main
+# ====
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+# pylint: disable=missing-docstring, global-statement, invalid-name
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+
+
+# Imports
+# ======
+
+import random
+import unittest
+
+from animatai.agents import Agent, Environment, Obstacle
+from gzutils.gzutils import Logging
+
+from sea import IndexedSea, Squid
+from random_mom_and_calf_config import OPTIONS
+
+
+# Setup logging
+# =============
+
+DEBUG_MODE = True
+l = Logging('test_spatial', DEBUG_MODE)
+
+
+# Unit tests
+# ==========
+
+class TestSpatial(unittest.TestCase):
+
+    def setUp(self):
+        l.info('Testing spatial...')
+
+    # compare the index with a scan of all things
+    def assertIndexed(self, e):
+        locations = set(thing.location for thing in e.things) | set(e.index)
+        for location in locations:
+            self.assertTrue(e.list_things_at(location) ==
+                            Environment.list_things_at(e, location))
+            self.assertTrue(e.list_things_at(location, Squid) ==
+                            Environment.list_things_at(e, location, Squid))
+
+    def test_index(self):
+        l.info('test_index')
+
+        e = IndexedSea({**OPTIONS, 'wss': None})
+        self.assertIndexed(e)
+        self.assertTrue(isinstance(e.list_things_at((3, 0))[0], Obstacle))
+        self.assertTrue(e.some_things_at((3, 0), Obstacle))
+        self.assertFalse(e.some_things_at((3, 1), Obstacle))
+
+    def test_moving_and_eating(self):
+        l.info('test_moving_and_eating')
+
+        random.seed(1)
+        e = IndexedSea({**OPTIONS, 'wss': None})
+        mom, calf = Agent(None, 'mom'), Agent(None, 'calf')
+        e.add_thing(mom, (0, 1))
+        e.add_thing(calf, (0, 4))
+
+        actions = ['eat_and_forward', 'forward', 'dive_and_forward', 'up_and_forward',
+                   'sing_eat_and_forward']
+        squid = len(e.list_things(Squid))
+        for time in range(0, 200):
+            for agent in [mom, calf]:
+                e.execute_action(agent, random.choice(actions), time)
+
+        # the world is a torus and the agents have passed the edge several times
+        self.assertTrue(len(e.list_things(Squid)) < squid)
+        self.assertTrue(mom in e.list_things_at(mom.location))
+        self.assertIndexed(e)
+
+        e.delete_thing(mom)
+        self.assertIndexed(e)
+
+    def tearDown(self):
+        l.info('...done with test_spatial.')
+
+
+# Main
+# ====
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+# pylint: disable=missing-docstring, global-statement, invalid-name
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+
+
+# Imports
+# ======
+
+import math
+import random
+import statistics
+import unittest
+
+from numpy import corrcoef
+from gzutils.gzutils import Logging
+
+from stats import RunningCorrelation, RunningStats
+
+
+# Setup logging
+# =============
+
+DEBUG_MODE = True
+l = Logging('test_stats', DEBUG_MODE)
+
+
+# Unit tests
+# ==========
+
+class TestStats(unittest.TestCase):
+
+    def setUp(self):
+        l.info('Testing stats...')
+        random.seed(1)
+        self.xs = [random.randint(0, 500) for _ in range(0, 100)]
+        self.ys = [x + random.randint(-100, 100) for x in self.xs]
+
+    def test_running_stats(self):
+        l.info('test_running_stats')
+
+        stats = RunningStats()
+        for x in self.xs:
+            stats.add(x)
+
+        self.assertEqual(stats.n, len(self.xs))
+        self.assertAlmostEqual(stats.mean, statistics.mean(self.xs))
+        self.assertAlmostEqual(stats.stdev(), statistics.stdev(self.xs))
+
+    def test_one_value(self):
+        l.info('test_one_value')
+
+        stats = RunningStats()
+        stats.add(3)
+        self.assertEqual(stats.mean, 3)
+        self.assertTrue(math.isnan(stats.stdev()))
+
+    def test_running_correlation(self):
+        l.info('test_running_correlation')
+
+        correlation = RunningCorrelation()
+        for x, y in zip(self.xs, self.ys):
+            correlation.add(x, y)
+
+        self.assertAlmostEqual(correlation.correlation(), corrcoef(self.xs, self.ys)[0, 1])
+
+        correlation = RunningCorrelation()
+        for x in self.xs:
+            correlation.add(x, 1)
+        self.assertTrue(math.isnan(correlation.correlation()))
+
+    def tearDown(self):
+        l.info('...done with test_stats.')
+
+
+# Main
+# ====
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+# pylint: disable=missing-docstring, global-statement, invalid-name
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+
+
+# Imports
+# ======
+
+import json
+import os
+import tempfile
+import unittest
+
+from gzutils.gzutils import Logging
+
+import grid
+import mom_and_calf
+import sweep
+from test import TemporaryOutput
+
+
+# Setup logging
+# =============
+
+DEBUG_MODE = True
+l = Logging('test_sweep', DEBUG_MODE)
+
+
+# Unit tests
+# ==========
+
+class TestSweep(unittest.TestCase):
+
+    def setUp(self):
+        l.info('Testing sweep...')
+        self.temporary_output = TemporaryOutput(mom_and_calf.OPTIONS, grid.OPTIONS)
+        self.dir = tempfile.TemporaryDirectory()
+        self.output = os.path.join(self.dir.name, 'sweep.jsonl')
+
+    def tearDown(self):
+        self.temporary_output.cleanup()
+        self.dir.cleanup()
+
+    def read_rows(self):
+        with open(self.output) as f:
+            return [json.loads(line) for line in f]
+
+    def test_configurations(self):
+        l.info('test_configurations')
+
+        configs = sweep.configurations('grid', 10, [1, 2], {'epsilon': [0.1, 0.2], 'Ne': [0, 1, 2]})
+        self.assertEqual(len(configs), 12)
+        self.assertEqual(len(set(sweep.config_key(config) for config in configs)), 12)
+
+        sample = sweep.configurations('grid', 10, [1], {'epsilon': [0.1, 0.2], 'Ne': [0, 1, 2]},
+                                      samples=4, sample_seed=1)
+        self.assertEqual(len(sample), 4)
+        self.assertEqual(sample, sweep.configurations('grid', 10, [1],
+                                                      {'epsilon': [0.1, 0.2], 'Ne': [0, 1, 2]},
+                                                      samples=4, sample_seed=1))
+
+    def test_sweep(self):
+        l.info('test_sweep')
+
+        configs = sweep.configurations('mom_and_calf', 20, [1], {'epsilon': [0.2, 0.5]})
+        self.assertEqual(sweep.sweep(configs[:1], self.output), (0, 1))
+        self.assertEqual(sweep.sweep(configs, self.output, workers=2), (1, 1))
+
+        rows = self.read_rows()
+        self.assertEqual([row['config'] for row in rows], configs)
+        self.assertTrue(all(row['seconds'] > 0 for row in rows))
+
+        # the default settings give the same result as the world itself
+        mom, calf = mom_and_calf.run_trial(None, 20, 1)
+        self.assertEqual(rows[0]['ages'], {'mom': mom['iterations'], 'calf': calf['iterations']})
+        self.assertEqual(rows[0]['U']['mom'], sweep.final_U(mom['U_and_pi']))
+        self.assertTrue(rows[1]['U']['calf'] != rows[0]['U']['calf'])
+
+    def test_cut_line(self):
+        l.info('test_cut_line')
+
+        configs = sweep.configurations('grid', 5, [1], {'delta': [0.5]})
+        with open(self.output, 'w') as f:
+            f.write('{"config": {"world"')
+        self.assertEqual(sweep.sweep(configs, self.output), (0, 1))
+
+        # the cut line is replaced by the new row
+        rows = self.read_rows()
+        self.assertEqual([row['config'] for row in rows], configs)
+        self.assertEqual(sweep.finished_configs(self.output), {sweep.config_key(configs[0])})
+        self.assertEqual(sweep.sweep(configs, self.output), (1, 0))
+
+        # only the cut line is removed, in blocks of any size
+        with open(self.output, 'a') as f:
+            f.write('{"config"')
+        sweep.drop_cut_line(self.output, block=3)
+        self.assertEqual(self.read_rows(), rows)
+        sweep.drop_cut_line(self.output, block=3)
+        self.assertEqual(self.read_rows(), rows)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+# pylint: disable=missing-docstring, global-statement, invalid-name
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+
+
+# Imports
+# ======
+
+import unittest
+
+from animatai.agents import Agent, Obstacle
+from gzutils.gzutils import DotDict, Logging
+
+from sea import CompactSea, IndexedSea, Sea, Squid
+from templates import WorldTemplate, new_env
+from test import SEA_OPTIONS
+
+
+# Setup logging
+# =============
+
+DEBUG_MODE = True
+l = Logging('test_templates', DEBUG_MODE)
+
+
+# Unit tests
+# ==========
+
+def things(env):
+    return [(type(thing), thing.__name__, thing.location) for thing in env.things]
+
+class TestTemplates(unittest.TestCase):
+
+    def setUp(self):
+        l.info('Testing templates...')
+
+    def test_same_as_parsed(self):
+        l.info('test_same_as_parsed')
+
+        for cls in (Sea, IndexedSea):
+            template = WorldTemplate(cls, DotDict(SEA_OPTIONS))
+            parsed = cls(SEA_OPTIONS)
+            stamped = template.new(DotDict(SEA_OPTIONS))
+            self.assertEqual(type(stamped), cls)
+            self.assertEqual(things(stamped), things(parsed))
+            self.assertEqual(stamped.thing_counter, parsed.thing_counter)
+            self.assertEqual(stamped.options.things, parsed.options.things)
+
+    def test_moving_cachalot(self):
+        l.info('test_moving_cachalot')
+
+        e = new_env(Sea, DotDict(SEA_OPTIONS))
+        self.assertTrue(e.obstacles is not None)
+        a = Agent(None, 'cachelot')
+        e.add_thing(a, (1, 1))
+
+        e.execute_action(a, 'dive_and_forward', 1)
+        self.assertEqual(a.location, (2, 2))
+
+        # should hit the wall
+        e.execute_action(a, 'dive_and_forward', 1)
+        self.assertEqual(a.location, (3, 2))
+
+        for _ in range(0, 50):
+            e.execute_action(a, 'forward', 1)
+        self.assertEqual(a.location, (3, 2))
+
+    def test_separate_things(self):
+        l.info('test_separate_things')
+
+        e1 = new_env(Sea, DotDict(SEA_OPTIONS))
+        e2 = new_env(Sea, DotDict(SEA_OPTIONS))
+        a = Agent(None, 'cachelot')
+        e1.add_thing(a, (5, 2))
+        e1.execute_action(a, 'eat_and_forward', 1)
+        self.assertEqual(len(e1.list_things_at((5, 2), Squid)), 0)
+        self.assertEqual(len(e2.list_things_at((5, 2), Squid)), 1)
+
+    def test_changed_obstacles(self):
+        l.info('test_changed_obstacles')
+
+        for cls in (Sea, CompactSea):
+            e1 = new_env(cls, DotDict(SEA_OPTIONS))
+            e2 = new_env(cls, DotDict(SEA_OPTIONS))
+            e1.add_thing(Obstacle('rock'), (3, 1))
+            e1.delete_thing(e1.list_things_at((0, 0), Obstacle)[0])
+            self.assertTrue(e1.some_things_at((3, 1), Obstacle))
+            self.assertFalse(e1.some_things_at((0, 0), Obstacle))
+
+            # the other environments keep the obstacles of the template
+            for e in (e2, new_env(cls, DotDict(SEA_OPTIONS))):
+                self.assertFalse(e.some_things_at((3, 1), Obstacle))
+                self.assertTrue(e.some_things_at((0, 0), Obstacle))
+
+            a = Agent(None, 'cachelot')
+            e1.add_thing(a, (2, 1))
+            e1.execute_action(a, 'forward', 1)
+            self.assertEqual(a.location, (2, 1))
+            e1.delete_thing(e1.list_things_at((3, 1), Obstacle)[0])
+            e1.execute_action(a, 'forward', 1)
+            self.assertEqual(a.location, (3, 1))
+
+    # The same layout in a larger sea
+    def test_size(self):
+        l.info('test_size')
+
+        new_env(Sea, DotDict(SEA_OPTIONS))
+        e = new_env(Sea, DotDict({**SEA_OPTIONS, 'width': 60}))
+        self.assertEqual(e.width, 60)
+        e.add_thing(Obstacle('rock'), (55, 1))
+        self.assertTrue(e.some_things_at((55, 1), Obstacle))
+        self.assertFalse(e.some_things_at((5, 2), Obstacle))
+
+        a = Agent(None, 'cachelot')
+        e.add_thing(a, (54, 1))
+        e.execute_action(a, 'forward', 1)
+        self.assertEqual(a.location, (54, 1))
+
+    def tearDown(self):
+        l.info('...done with test_templates.')
+
+
+# Main
+# ====
+
+if __name__ == '__main__':
+    unittest.main()
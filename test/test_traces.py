@@ -0,0 +1,106 @@
+# pylint: disable=missing-docstring, global-statement, invalid-name
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+
+
+# Imports
+# ======
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from gzutils.gzutils import Logging
+
+import mom_and_calf
+from random_mom_and_calf_config import OPTIONS
+from traces import Trace, TraceWriter
+
+
+# Setup logging
+# =============
+
+DEBUG_MODE = True
+l = Logging('test_traces', DEBUG_MODE)
+
+
+# Unit tests
+# ==========
+
+class Env:
+    pass
+
+class Agent:
+
+    def __init__(self, name, location, status):
+        self.__name__ = name
+        self.location = location
+        self.status = status
+
+class TestTraces(unittest.TestCase):
+
+    def setUp(self):
+        l.info('Testing traces...')
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'trace')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_write_and_read(self):
+        l.info('test_write_and_read')
+
+        env = Env()
+        env.agents = [Agent('a', (1, 2), {'energy': 1.0}), Agent('b', (3, 4), {'energy': 0.5})]
+        with TraceWriter(self.path, ['energy'], buffer_size=3) as writer:
+            env.actions, env.rewards = None, None
+            writer.record(env, 0)
+            env.actions, env.rewards = ['up', 'down'], [{'energy': 0.1}, 1]
+            writer.record(env, 1)
+            env.agents[0].location = (5, 6)
+            writer.record(env, 2)
+
+        trace = Trace(self.path)
+        self.assertEqual(len(trace), 6)
+        self.assertTrue(isinstance(trace['x'], np.memmap))
+        self.assertEqual(trace['time'].tolist(), [0, 0, 1, 1, 2, 2])
+        self.assertEqual(trace['x'][trace.agent_mask('a')].tolist(), [1, 1, 5])
+        self.assertEqual(trace.action_names().tolist(), [None, None, 'up', 'down', 'up', 'down'])
+        self.assertEqual(trace['need:energy'][trace.agent_mask('b')].tolist(), [0.5] * 3)
+        self.assertEqual(trace['reward:energy'][2], 0.1)
+        self.assertTrue(np.isnan(trace['reward:energy'][3]))
+
+    def test_unflushed_records(self):
+        l.info('test_unflushed_records')
+
+        env = Env()
+        env.agents, env.actions, env.rewards = [Agent('a', (1, 2), {})], None, None
+        writer = TraceWriter(self.path, ['energy'])
+        writer.record(env, 0)
+        self.assertEqual(len(Trace(self.path)), 0)
+        self.assertEqual(len(Trace(self.path)['x']), 0)
+        writer.close()
+        self.assertEqual(len(Trace(self.path)), 1)
+
+    def test_mom_and_calf(self):
+        l.info('test_mom_and_calf')
+
+        output_path = OPTIONS.output_path
+        OPTIONS.output_path, OPTIONS.trace = self.dir.name, True
+        try:
+            mom, _ = mom_and_calf.run_trial(None, 20, 1)
+        finally:
+            OPTIONS.output_path, OPTIONS.trace = output_path, None
+
+        trace = Trace(self.path)
+        self.assertEqual(trace.agents, ['mom', 'calf'])
+        self.assertEqual(len(trace['x'][trace.agent_mask('mom')]), mom['iterations'])
+        self.assertTrue(set(trace.action_names()) <= {'sing_eat_and_forward', 'forward',
+                                                      'dive_and_forward', 'up_and_forward',
+                                                      'eat_and_forward', None})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+# pylint: disable=missing-docstring, invalid-name
+#
+# Binary traces of simulations
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+# A trace has one record per agent and step with the time, the agent, the location
+# after the action, the action, the rewards and the needs (status) of the agent. It
+# is saved in a directory with one raw binary file per column and a JSON header
+# with the names of the agents, actions and objectives. The columns are appended
+# during the run and read back as memory mapped NumPy arrays, nothing is copied:
+#
+#```
+# with TraceWriter(path, options.objectives) as writer:
+#     traces.instrument(env, writer)
+#     env.run(steps)
+#
+# trace = Trace(path)
+# trace['x'][trace.agent_mask('mom')], trace['need:energy'], trace.action_names()
+#```
+#
+# Enable in `mom_and_calf` and `grid` with the option `trace`, the trace is saved in
+# `<output_path>/trace`. A resumed run (see `checkpoint.py`) starts a new trace.
+#
+
+import json
+import os
+
+import numpy as np
+
+
+VERSION = 1
+
+# Actions that aren't set (`None`) have the code -1
+NO_ACTION = -1
+
+BASE_COLUMNS = [('time', 'i8'), ('agent', 'u2'), ('x', 'i4'), ('y', 'i4'), ('action', 'i2')]
+
+
+def columns(objectives):
+    return (BASE_COLUMNS +
+            [('reward:' + objective, 'f8') for objective in objectives] +
+            [('need:' + objective, 'f8') for objective in objectives])
+
+def column_path(path, name):
+    return os.path.join(path, name.replace(':', '.') + '.bin')
+
+
+class TraceWriter:
+
+    # The records are buffered and written every `buffer_size` records
+    def __init__(self, path, objectives, buffer_size=8192):
+        self.path = path
+        self.objectives = list(objectives)
+        self.columns = [(name, np.dtype(dtype).newbyteorder('<'))
+                        for name, dtype in columns(self.objectives)]
+        self.buffer_size = buffer_size
+        self.buffers = {name: [] for name, _ in self.columns}
+        self.rows = 0
+
+        # names of the agents and actions: {name: code}
+        self.agents = {}
+        self.actions = {}
+
+        os.makedirs(path, exist_ok=True)
+        self.files = {name: open(column_path(path, name), 'wb') for name, _ in self.columns}
+        self.write_header()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def code(self, names, name):
+        if name is None:
+            return NO_ACTION
+        return names.setdefault(name, len(names))
+
+    # Record the state after `env.step(time)`
+    def record(self, env, time):
+        buffers = self.buffers
+        actions = env.actions or [None] * len(env.agents)
+        rewards = env.rewards or [{}] * len(env.agents)
+        for agent, action, reward in zip(env.agents, actions, rewards):
+            x, y = agent.location
+            buffers['time'].append(time)
+            buffers['agent'].append(self.code(self.agents, agent.__name__))
+            buffers['x'].append(x)
+            buffers['y'].append(y)
+            buffers['action'].append(self.code(self.actions, action))
+
+            status = getattr(agent, 'status', None) or {}
+            reward = reward if isinstance(reward, dict) else {}
+            for objective in self.objectives:
+                buffers['reward:' + objective].append(reward.get(objective, np.nan))
+                buffers['need:' + objective].append(status.get(objective, np.nan))
+
+        if len(buffers['time']) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        for name, dtype in self.columns:
+            np.array(self.buffers[name], dtype=dtype).tofile(self.files[name])
+            self.files[name].flush()
+            self.buffers[name] = []
+        self.rows = self.files['time'].tell() // self.columns[0][1].itemsize
+        self.write_header()
+
+    # The header is written after the columns, the reader ignores records
+    # that are written after the last header (after a crash for instance)
+    def write_header(self):
+        header = {
+            'version': VERSION,
+            'rows': self.rows,
+            'objectives': self.objectives,
+            'columns': [(name, dtype.str) for name, dtype in self.columns],
+            'agents': sorted(self.agents, key=self.agents.get),
+            'actions': sorted(self.actions, key=self.actions.get),
+        }
+        tmp_path = os.path.join(self.path, 'header.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(header, f)
+        os.replace(tmp_path, os.path.join(self.path, 'header.json'))
+
+    def close(self):
+        if self.files:
+            self.flush()
+            for f in self.files.values():
+                f.close()
+            self.files = None
+
+
+# Record each step of `env` with `writer`
+def instrument(env, writer):
+    step = env.step
+
+    def traced_step(time):
+        step(time)
+        writer.record(env, time)
+
+    env.step = traced_step
+    return env
+
+
+class Trace:
+
+    def __init__(self, path):
+        with open(os.path.join(path, 'header.json')) as f:
+            self.header = json.load(f)
+        if self.header['version'] != VERSION:
+            raise ValueError('unknown trace version ' + str(self.header['version']))
+
+        self.path = path
+        self.rows = self.header['rows']
+        self.objectives = self.header['objectives']
+        self.agents = self.header['agents']
+        self.actions = self.header['actions']
+        self.columns = {name: np.dtype(dtype) for name, dtype in self.header['columns']}
+
+    def __len__(self):
+        return self.rows
+
+    def __contains__(self, name):
+        return name in self.columns
+
+    # A read only array mapped to the column file
+    def __getitem__(self, name):
+        dtype = self.columns[name]
+        if self.rows == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(column_path(self.path, name), dtype=dtype, mode='r', shape=(self.rows,))
+
+    def agent_mask(self, name):
+        return self['agent'] == self.agents.index(name)
+
+    # The action names of all records, `None` for no action
+    def action_names(self):
+        # NO_ACTION (-1) is the last name
+        names = np.array(self.actions + [None], dtype=object)
+        return names[self['action']]
@@ -0,0 +1,50 @@
+# pylint: disable=missing-docstring, invalid-name
+#
+# Registry of the worlds
+#
+# Copyright (C) 2017  Jonas Colmsjö, Claes Strannegård
+#
+# The worlds are registered with the name of the module that has the `run`
+# function. The module is imported the first time the world is used, importing
+# this file is therefore fast (no NumPy, animatai etc.). Add a world with:
+#
+#```
+# worlds.register('my_world', 'my_module')
+# worlds.run('my_world', wss, steps, seed)
+#```
+#
+
+import importlib
+
+
+# {world: (module, function)}
+WORLDS = {}
+
+def register(world, module=None, function='run'):
+    WORLDS[world] = (module or world, function)
+
+def names():
+    return sorted(WORLDS)
+
+def is_registered(world):
+    return world in WORLDS
+
+# The function that runs the world, the module is imported if needed
+def load(world, function=None):
+    module, default = WORLDS[world]
+    return getattr(importlib.import_module(module), function or default)
+
+def run(world, wss=None, steps=None, seed=None):
+    return load(world)(wss, steps, seed)
+
+async def run_async(world, wss=None, steps=None, seed=None):
+    return await load(world, 'run_async')(wss, steps, seed)
+
+
+register('random_agents')
+register('random_walk')
+register('blind_dog')
+register('random_mom_and_calf')
+register('random_mom_and_calf2')
+register('mom_and_calf')
+register('grid')